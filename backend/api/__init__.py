@@ -1,2 +1,6 @@
 # @Author: cola5173
 # @Time: 2025/11/6 14:46
+from utils.import_profiler import import_profiler
+
+# `uvicorn api.app:app` 最先导入 api 包，从这里开始统计启动耗时（及可选的模块导入耗时）
+import_profiler.start()
@@ -1,7 +1,11 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routers import connection, schema, objects
+from fastapi.responses import PlainTextResponse
+from api.routers import connection, schema, objects, diagnostics
 
 from config.settings import (
     SERVER_CONFIG,
@@ -9,6 +13,14 @@ from config.settings import (
     STORAGE_CONFIG,
     DATA_CONFIG,
 )
+from config.business_setting import COMPRESSION_CONFIG, METRICS_CONFIG
+from utils.compression import CompressionMiddleware
+from utils.health_monitor import health_monitor
+from utils.http_client import client_registry
+from utils.import_profiler import import_profiler
+from utils.metrics import MetricsMiddleware, metrics_registry
+from utils.prewarm import start_prewarm
+from utils.slow_query import slow_query_log
 
 # 确保应用日志可见（在未配置处理器时设置一个默认处理器）
 root_logger = logging.getLogger()
@@ -48,10 +60,37 @@ def print_all_configs() -> None:
     logger.info("=" * 80)
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """应用生命周期：启动时初始化共享资源，关闭时释放"""
+    print_all_configs()
+    await client_registry.start()
+    await health_monitor.start()
+    # 预热最近使用的集群，在后台进行，不阻塞服务就绪
+    prewarm_task = start_prewarm()
+    import_profiler.stop()
+    import_profiler.log_report()
+    logger.info("✅ Weaviate-King API 启动完成")
+    try:
+        yield
+    finally:
+        if prewarm_task is not None and not prewarm_task.done():
+            prewarm_task.cancel()
+            try:
+                await prewarm_task
+            except asyncio.CancelledError:
+                pass
+        await health_monitor.close()
+        await client_registry.close()
+        await slow_query_log.close()
+        logger.info("👋 Weaviate-King API 已关闭")
+
+
 app = FastAPI(
     title="Weaviate-King API",
     description="Weaviate-King 后端 API",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
 # 配置 CORS
@@ -60,14 +99,22 @@ app.add_middleware(
     **CORS_CONFIG
 )
 
+# 按 Accept-Encoding 压缩较大的响应（位于指标中间件内层，指标统计压缩后的大小）
+if COMPRESSION_CONFIG["ENABLED"]:
+    app.add_middleware(CompressionMiddleware)
+
+# 记录请求耗时、响应大小与在途请求数（最外层，统计包含 CORS 等中间件的耗时）
+if METRICS_CONFIG["ENABLED"]:
+    app.add_middleware(MetricsMiddleware)
+
 # 注册路由
 app.include_router(connection.router)
 app.include_router(schema.router)
 app.include_router(objects.router)
+app.include_router(diagnostics.router)
 
 
-@app.on_event("startup")
-async def startup_event():
-    """应用启动时的事件处理"""
-    print_all_configs()
-    logger.info("✅ Weaviate-King API 启动完成")
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Prometheus 文本格式指标：API 路由延迟/响应大小/在途数，上游 Weaviate 调用延迟/错误数（按集群与路径）"""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,22 +1,28 @@
 import logging
 import uuid
 from datetime import datetime, timezone
-import os
-import json
 from typing import Dict, List
 
-import httpx
 from fastapi import APIRouter
 from models.base import Response
-from models.connect_model import TestConnectionRequest, Connections, UpdateConnectionRequest
+from models.connect_model import (
+    ClusterHealth,
+    Connections,
+    ConnectionWithHealth,
+    TestConnectionRequest,
+    UpdateConnectionRequest,
+)
 from config.business_setting import TIMEOUT_CONFIG
-from config.settings import DATA_CONFIG
+from utils.connection_store import connection_store
 from utils.connection_utils import test_connection
+from utils.health_monitor import health_monitor
+from utils.http_client import client_registry
+from utils.timing import TimedRoute
 
 CONNECTION_TEST_TIMEOUT = TIMEOUT_CONFIG["TEST_CONNECTION_TIMEOUT"]
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/connection", tags=["connection"])
+router = APIRouter(prefix="/connection", tags=["connection"], route_class=TimedRoute)
 
 
 def generate_numeric_id() -> str:
@@ -33,23 +39,16 @@ def generate_numeric_id() -> str:
 async def get_connection(conn_id: str) -> Response:
     """根据 id 查询连接配置详情。
 
-    从 `DATA_CONFIG['clusters_file']` 读取 JSON 数组，返回 `id == conn_id` 的项。
+    从连接配置存储（`DATA_CONFIG['clusters_file']` 的内存索引）中返回 `id == conn_id` 的项。
     若文件不存在或未找到对应项，返回失败消息。
     """
-    file_path = DATA_CONFIG["clusters_file"]
-    if not os.path.exists(file_path):
-        return Response(success=False, message="未找到：数据文件不存在")
-
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data: List[Dict] = json.load(f) or []
-            except json.JSONDecodeError:
-                data = []
+        if not await connection_store.exists():
+            return Response(success=False, message="未找到：数据文件不存在")
 
-        for item in data:
-            if isinstance(item, dict) and str(item.get("id", "")) == str(conn_id):
-                return Response(success=True, message="查询成功", data=item)
+        item = await connection_store.get(conn_id)
+        if item is not None:
+            return Response(success=True, message="查询成功", data=item)
 
         logger.info("查询失败 未找到指定id id=%s", conn_id)
         return Response(success=False, message="查询失败：未找到指定记录")
@@ -61,78 +60,48 @@ async def get_connection(conn_id: str) -> Response:
 async def delete_connection(conn_id: str) -> Response:
     """根据 id 删除已保存的连接配置。
 
-    从 `DATA_CONFIG['clusters_file']` 读取 JSON 数组，移除 `id == conn_id` 的项后写回。
+    从连接配置存储中移除 `id == conn_id` 的项并原子写回 `DATA_CONFIG['clusters_file']`。
     若文件不存在或未找到对应项，则返回失败消息。
     """
-    file_path = DATA_CONFIG["clusters_file"]
-    if not os.path.exists(file_path):
-        return Response(success=False, message="无可删除的数据")
-
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data: List[Dict] = json.load(f) or []
-            except json.JSONDecodeError:
-                data = []
+        if not await connection_store.exists():
+            return Response(success=False, message="无可删除的数据")
 
-        before = len(data)
-        data = [item for item in data if not (isinstance(item, dict) and item.get("id") == conn_id)]
-        after = len(data)
-
-        if before == after:
+        if not await connection_store.delete(conn_id):
             logger.warning("删除失败 未找到指定id id=%s", conn_id)
             return Response(success=False, message="删除失败：未找到指定记录")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-
-        logger.info("已删除连接配置 id=%s 剩余=%d", conn_id, after)
+        remaining = len(await connection_store.list())
+        logger.info("已删除连接配置 id=%s 剩余=%d", conn_id, remaining)
+        health_monitor.trigger()
         return Response(success=True, message="删除成功")
     except Exception as e:
         logger.exception("删除连接配置失败 错误=%s", str(e))
         return Response(success=False, message=f"删除失败: {str(e)}")
 
 
-@router.get("/list", response_model=List[Connections])
-async def list_connections() -> List[Connections]:
+@router.get("/list", response_model=List[ConnectionWithHealth])
+async def list_connections() -> List[ConnectionWithHealth]:
     """查询已保存的连接配置列表。
 
-    从 `DATA_CONFIG['clusters_file']` 读取 JSON 数组，并返回为 `Connections` 列表。
+    从连接配置存储中读取按 updatedAt 倒序（新更新的在前）排好的记录，并返回为 `ConnectionWithHealth` 列表。
+    `health` 为后台健康监控缓存的最近一次探测结果，本接口不发起上游请求。
     若文件不存在或内容为空，返回空列表。
     """
-    file_path = DATA_CONFIG["clusters_file"]
-    if not os.path.exists(file_path):
-        return []
-
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                raw = json.load(f) or []
-            except json.JSONDecodeError:
-                raw = []
-
-        # 按 updatedAt 倒序排序（新更新的在前）
-        try:
-            raw = sorted(
-                [item for item in raw if isinstance(item, dict)],
-                key=lambda x: x.get("updatedAt", ""),
-                reverse=True,
-            )
-        except Exception:
-            # 排序失败则保持原顺序
-            pass
+        raw = await connection_store.list()
 
-        results: List[Connections] = []
+        results: List[ConnectionWithHealth] = []
         for item in raw:
-            if not isinstance(item, dict):
-                continue
             try:
-                results.append(Connections(
+                health = health_monitor.get(item.get("scheme", "http"), item.get("address", ""), item.get("apiKey"))
+                results.append(ConnectionWithHealth(
                     id=item.get("id", ""),
                     name=item.get("name", ""),
                     scheme=item.get("scheme", "http"),
                     address=item.get("address", ""),
                     apiKey=item.get("apiKey", ""),
+                    health=ClusterHealth(**health) if health else ClusterHealth(),
                 ))
             except Exception:
                 # 跳过无法解析的项
@@ -151,7 +120,7 @@ async def test(
     """测试 Weaviate 连接。
 
     前端表单传入 scheme(http/https)、address(例如 127.0.0.1:8080) 和可选 apiKey。
-    逻辑：尝试访问 /v1/meta，若失败再尝试 /v1。
+    逻辑：并发检查就绪、meta、schema，总是重新探测。
     """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
 
@@ -165,8 +134,11 @@ async def test(
         headers["Authorization"] = f"Bearer {request.apiKey}"
 
     try:
-        async with httpx.AsyncClient(timeout=CONNECTION_TEST_TIMEOUT) as client:
-            ok, result, msg = await test_connection(client, base_url, headers, CONNECTION_TEST_TIMEOUT)
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            # 显式测试总是重新探测，结果写入缓存供随后的保存复用
+            ok, result, msg = await test_connection(
+                client, base_url, headers, CONNECTION_TEST_TIMEOUT, use_cache=False,
+            )
             if ok:
                 return Response(success=True, message=msg, data={
                     "name": request.name,
@@ -187,7 +159,7 @@ async def connect(request: Connections) -> Response:
     """根据传入的连接配置尝试建立连接并返回探测结果。
 
     入参为 `Connections`（id、name、scheme、address、apiKey）。
-    逻辑与测试接口一致：依次检查就绪、meta、schema。
+    逻辑与测试接口一致：并发检查就绪、meta、schema，并复用短时间内的成功探测结果。
     """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
 
@@ -201,7 +173,7 @@ async def connect(request: Connections) -> Response:
         headers["Authorization"] = f"Bearer {request.apiKey}"
 
     try:
-        async with httpx.AsyncClient(timeout=CONNECTION_TEST_TIMEOUT) as client:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             ok, result, msg = await test_connection(client, base_url, headers, CONNECTION_TEST_TIMEOUT)
             if ok:
                 return Response(success=True, message=msg, data={
@@ -225,37 +197,24 @@ async def save(
     将 `TestConnectionRequest` 内容保存到 `DATA_CONFIG['clusters_file']` 指定的 JSON 文件中。
     逻辑：按 `name` 进行简单 upsert（存在则覆盖，不存在则追加）。
     """
-    file_path = DATA_CONFIG["clusters_file"]
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    file_path = connection_store.file_path
 
-    # 读取现有列表（用于 upsert 以及继承 id/createdAt）
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data: List[Dict] = json.load(f) or []
-            except json.JSONDecodeError:
-                data = []
-    else:
-        data = []
+    # 查找是否已存在同名记录（用于 upsert 以及继承 id/createdAt）
+    try:
+        existing_item = await connection_store.get_by_name(request.name)
+    except Exception as e:
+        logger.exception("读取连接配置失败 错误=%s", str(e))
+        return Response(success=False, message=f"保存失败: {str(e)}")
 
     now_iso = datetime.now(timezone.utc).isoformat()
 
-    # 查找是否已存在同名记录
-    existing_idx = -1
-    existing_item: Dict = {}
-    for idx, item in enumerate(data):
-        if isinstance(item, dict) and item.get("name") == request.name:
-            existing_idx = idx
-            existing_item = item
-            break
-
     # 如果存在，优先沿用其 id；若 id 非纯数字则生成新的数字 ID；否则新建数字 ID
-    if existing_idx >= 0:
+    if existing_item is not None:
         old_id = str(existing_item.get("id", ""))
         record_id = old_id if old_id.isdigit() and old_id else generate_numeric_id()
     else:
         record_id = generate_numeric_id()
-    created_at = existing_item.get("createdAt") if existing_idx >= 0 else now_iso
+    created_at = existing_item.get("createdAt") if existing_item is not None else now_iso
     updated_at = now_iso
 
     record = {
@@ -270,7 +229,7 @@ async def save(
 
     try:
         # 保存前再次进行连接测试
-        async with httpx.AsyncClient(timeout=CONNECTION_TEST_TIMEOUT) as client:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             save_headers: Dict[str, str] = {}
             if request.apiKey:
                 save_headers["Authorization"] = f"Bearer {request.apiKey}"
@@ -286,13 +245,8 @@ async def save(
         )
 
         # upsert by name
-        if existing_idx >= 0:
-            data[existing_idx] = record
-        else:
-            data.append(record)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        await connection_store.upsert(record, match_name=True)
+        health_monitor.trigger()
 
         return Response(success=True, message="保存成功", data=record)
     except Exception as e:
@@ -305,29 +259,15 @@ async def update_connection(request: UpdateConnectionRequest) -> Response:
     """编辑并更新已存在的连接配置。
 
     根据 `id` 查找并更新对应记录；更新前会进行连接测试验证。
-    成功后写回 `DATA_CONFIG['clusters_file']`。
+    成功后原子写回 `DATA_CONFIG['clusters_file']`。
     """
-    file_path = DATA_CONFIG["clusters_file"]
-    if not os.path.exists(file_path):
-        return Response(success=False, message="更新失败：数据文件不存在")
-
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data: List[Dict] = json.load(f) or []
-            except json.JSONDecodeError:
-                data = []
+        if not await connection_store.exists():
+            return Response(success=False, message="更新失败：数据文件不存在")
 
         # 定位待更新记录
-        existing_idx = -1
-        existing_item: Dict = {}
-        for idx, item in enumerate(data):
-            if isinstance(item, dict) and str(item.get("id", "")) == str(request.id):
-                existing_idx = idx
-                existing_item = item
-                break
-
-        if existing_idx < 0:
+        existing_item = await connection_store.get(request.id)
+        if existing_item is None:
             logger.warning("更新失败 未找到指定id id=%s", request.id)
             return Response(success=False, message="更新失败：未找到指定记录")
 
@@ -338,7 +278,7 @@ async def update_connection(request: UpdateConnectionRequest) -> Response:
 
         base_url = f"{request.scheme}://{request.address}".rstrip("/")
         try:
-            async with httpx.AsyncClient(timeout=CONNECTION_TEST_TIMEOUT) as client:
+            async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
                 ok, _, msg = await test_connection(client, base_url, headers, CONNECTION_TEST_TIMEOUT)
                 if not ok:
                     logger.error("更新前连接测试未通过 id=%s 错误=%s", request.id, msg)
@@ -358,10 +298,8 @@ async def update_connection(request: UpdateConnectionRequest) -> Response:
             "updatedAt": now_iso,
         }
 
-        data[existing_idx] = updated_record
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        await connection_store.upsert(updated_record)
+        health_monitor.trigger()
 
         return Response(success=True, message="更新成功", data=updated_record)
     except Exception as e:
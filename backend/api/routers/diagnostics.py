@@ -0,0 +1,34 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from models.base import Response
+from config.business_setting import SLOW_QUERY_CONFIG
+from utils.slow_query import slow_query_log
+from utils.timing import TimedRoute
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"], route_class=TimedRoute)
+
+
+@router.get("/slow-queries", response_model=Response)
+async def list_slow_queries(
+        limit: int = Query(default=50, ge=1, le=1000),
+        route: Optional[str] = Query(default=None, description="按路由模板过滤，如 /objects/search"),
+) -> Response:
+    """查询慢请求记录（按时间倒序），每条包含各阶段耗时与请求摘要"""
+    items = await slow_query_log.list(limit=limit, route=route)
+    return Response(success=True, message="查询成功", data={
+        "thresholdMs": SLOW_QUERY_CONFIG["THRESHOLD_MS"],
+        "capacity": slow_query_log.capacity,
+        "file": slow_query_log.file_path,
+        "items": items,
+    })
+
+
+@router.delete("/slow-queries", response_model=Response)
+async def clear_slow_queries() -> Response:
+    """清空慢请求记录"""
+    count = await slow_query_log.clear()
+    logger.info("清空慢查询日志 数量=%d", count)
+    return Response(success=True, message="已清空", data={"cleared": count})
@@ -1,24 +1,102 @@
+import asyncio
+import json
 import logging
-from typing import Dict
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 import httpx
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 
 from models.base import Response
-from models.connect_model import ClassObjectsRequest, ClassObjectsSearchRequest, ObjectFilter
-from config.business_setting import TIMEOUT_CONFIG
+from models.connect_model import (
+    ClassObjectsRequest,
+    ClassObjectsExportRequest,
+    ClassObjectsImportRequest,
+    ClassObjectsSearchRequest,
+    FanOutSearchRequest,
+    ObjectFilter,
+    ObjectsDeleteByFilterRequest,
+    ObjectsGetManyRequest,
+    RecallBenchmarkRequest,
+    SimilaritySearchRequest,
+    VectorStatsRequest,
+)
+from config.business_setting import (
+    TIMEOUT_CONFIG,
+    DELETE_BY_FILTER_CONFIG,
+    FANOUT_SEARCH_CONFIG,
+    GET_MANY_CONFIG,
+    IMPORT_CONFIG,
+    RECALL_BENCHMARK_CONFIG,
+    SEARCH_PREFETCH_CONFIG,
+    SIMILARITY_CONFIG,
+    VECTOR_STATS_CONFIG,
+)
+from utils.batch_import import BatchImporter
+from utils.connection_store import connection_store
+from utils.http_client import client_registry, cluster_key
+from utils.json_stream import iter_json_objects
+from utils.latency import summarize_latencies
+from utils.multipart_stream import MultipartStreamReader, UploadStreamingResponse
+from utils.passthrough import open_upstream_stream, passthrough_enabled, passthrough_response
+from utils.cache_events import notify_class_changed, on_class_changed
+from utils.result_cache import normalize_filters, search_result_cache
+from utils.schema_cache import GRAPHQL_NAME, schema_cache, class_count_cache
+from utils.vector_codec import (
+    VECTOR_ENCODING_BINARY,
+    VECTOR_ENCODING_FLOAT,
+    MsgPackResponse,
+    encode_object_vectors,
+    wants_msgpack,
+)
+from utils.fast_json import EnvelopeResponse, dumps as fast_json_dumps
+from utils.timing import TimedRoute, detach_timings, note_timing, timed
 
 OBJECTS_QUERY_TIMEOUT = TIMEOUT_CONFIG["OBJECTS_QUERY_TIMEOUT"]
+BATCH_IMPORT_TIMEOUT = TIMEOUT_CONFIG["BATCH_IMPORT_TIMEOUT"]
+
+# 正在进行的搜索翻页预取：缓存键 -> 预取任务
+_search_prefetches: Dict[tuple, asyncio.Task] = {}
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/objects", tags=["objects"])
+router = APIRouter(prefix="/objects", tags=["objects"], route_class=TimedRoute)
+
+
+def _objects_response(
+    http_request: Request,
+    vector_encoding: str,
+    objects: Any,
+    message: str,
+    data: Dict[str, Any],
+):
+    """按协商的编码输出对象列表响应。
+
+    Accept 为 MessagePack 时整体返回 MessagePack，向量为原始 float32 字节；
+    否则返回 JSON，向量按 `vector_encoding` 编码（float 或 base64）。
+    两种情况都直接返回响应对象，跳过 `response_model` 对整页对象的校验与逐字段编码。
+    """
+    msgpack_requested = wants_msgpack(http_request)
+    encoding = VECTOR_ENCODING_BINARY if msgpack_requested else vector_encoding
+    if isinstance(objects, list):
+        with timed("format"):
+            encode_object_vectors(objects, encoding)
+    data["vectorEncoding"] = encoding
+    with timed("serialize"):
+        if msgpack_requested:
+            return MsgPackResponse({"success": True, "message": message, "data": data})
+        return EnvelopeResponse(True, message, data)
 
 
 @router.post("/query", response_model=Response)
-async def query_objects(request: ClassObjectsRequest) -> Response:
+async def query_objects(request: ClassObjectsRequest, http_request: Request) -> Response:
     """查询指定 className 下的对象列表。
 
     通过 Weaviate 的 /v1/objects 接口，使用 query 参数 `class`、`limit`、`after` 进行查询。
+    向量编码可协商，见 `_objects_response`。开启 `passthrough` 且为 float 编码的 JSON 响应时，
+    上游响应体不解析，原样流式写入 `data.result`（见 `utils.passthrough`）。
     """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
     objects_url = f"{base_url}/v1/objects"
@@ -30,6 +108,8 @@ async def query_objects(request: ClassObjectsRequest) -> Response:
         params["limit"] = request.limit
     if request.after:
         params["after"] = request.after
+    if request.includeVector:
+        params["include"] = "vector"
 
     headers: Dict[str, str] = {}
     if request.apiKey:
@@ -40,21 +120,32 @@ async def query_objects(request: ClassObjectsRequest) -> Response:
         request.id, request.name, request.className, objects_url, OBJECTS_QUERY_TIMEOUT,
     )
 
+    if (
+        passthrough_enabled(request.passthrough)
+        and request.vectorEncoding == VECTOR_ENCODING_FLOAT
+        and not wants_msgpack(http_request)
+    ):
+        return await _query_objects_passthrough(request, objects_url, params, headers)
+
     try:
-        async with httpx.AsyncClient(timeout=OBJECTS_QUERY_TIMEOUT) as client:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             try:
-                resp = await client.get(objects_url, params=params, headers=headers)
+                with timed("objects"):
+                    resp = await client.get(objects_url, params=params, headers=headers, timeout=OBJECTS_QUERY_TIMEOUT)
                 if resp.status_code == 200:
                     try:
-                        data = resp.json()
+                        with timed("parse"):
+                            data = resp.json()
                         logger.info(
                             "查询 objects 成功 id=%s class=%s count=%s",
                             request.id, request.className, len(data.get("objects", [])) if isinstance(data, dict) else "?",
                         )
-                        return Response(
-                            success=True,
-                            message="查询对象成功",
-                            data={
+                        return _objects_response(
+                            http_request,
+                            request.vectorEncoding,
+                            data.get("objects") if isinstance(data, dict) else None,
+                            "查询对象成功",
+                            {
                                 "id": request.id,
                                 "name": request.name,
                                 "address": f"{request.scheme}://{request.address}",
@@ -80,6 +171,238 @@ async def query_objects(request: ClassObjectsRequest) -> Response:
         return Response(success=False, message=f"查询异常: {str(e)}")
 
 
+async def _query_objects_passthrough(
+    request: ClassObjectsRequest,
+    objects_url: str,
+    params: Dict[str, Any],
+    headers: Dict[str, str],
+):
+    """透传模式的 /objects/query：上游 200 时把响应体原样作为 `data.result` 流式返回"""
+    try:
+        with timed("objects"):
+            stack, upstream = await open_upstream_stream(
+                request.scheme, request.address, request.apiKey, objects_url,
+                params=params, headers=headers, timeout=OBJECTS_QUERY_TIMEOUT,
+            )
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("查询 objects 出现未预期异常 id=%s class=%s 错误=%s", request.id, request.className, str(e))
+        return Response(success=False, message=f"查询异常: {str(e)}")
+
+    if upstream.status_code != 200:
+        await stack.aclose()
+        return Response(success=False, message=_objects_status_message(upstream.status_code))
+
+    logger.info("查询 objects 透传 id=%s class=%s", request.id, request.className)
+    return passthrough_response(
+        stack,
+        upstream,
+        "查询对象成功",
+        {
+            "id": request.id,
+            "name": request.name,
+            "address": f"{request.scheme}://{request.address}",
+            "className": request.className,
+            "vectorEncoding": VECTOR_ENCODING_FLOAT,
+        },
+        "result",
+    )
+
+
+class UpstreamStatusError(Exception):
+    """Weaviate 返回了非 200 状态码"""
+
+    def __init__(self, status_code: int, message: str) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def _objects_status_message(status_code: int) -> str:
+    if status_code == 404:
+        return "未找到该 class 或对象不存在"
+    if status_code == 401:
+        return "未授权，请检查 API Key"
+    return f"查询失败: HTTP {status_code}"
+
+
+async def _fetch_objects_page(
+    client: httpx.AsyncClient,
+    objects_url: str,
+    headers: Dict[str, str],
+    class_name: str,
+    limit: int,
+    after: Optional[str],
+    include_vector: bool,
+) -> List[Dict[str, Any]]:
+    """通过 /v1/objects 的 `after` 游标拉取一页对象"""
+    params: Dict[str, Any] = {"class": class_name, "limit": limit}
+    if after:
+        params["after"] = after
+    if include_vector:
+        params["include"] = "vector"
+    resp = await client.get(objects_url, params=params, headers=headers, timeout=OBJECTS_QUERY_TIMEOUT)
+    if resp.status_code != 200:
+        raise UpstreamStatusError(resp.status_code, _objects_status_message(resp.status_code))
+    data = resp.json()
+    objects = data.get("objects") if isinstance(data, dict) else None
+    return objects if isinstance(objects, list) else []
+
+
+def _encode_ndjson(items: List[Dict[str, Any]]) -> bytes:
+    return "".join(json.dumps(item, ensure_ascii=False) + "\n" for item in items).encode("utf-8")
+
+
+async def _export_stream(
+    request: ClassObjectsExportRequest,
+    objects_url: str,
+    headers: Dict[str, str],
+    first_page: List[Dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    """逐页输出 NDJSON；写出当前页的同时预取下一页，内存占用不超过两页。"""
+    page = first_page
+    exported = 0
+    next_task: Optional[asyncio.Task] = None
+    async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+        try:
+            while page:
+                next_task = None
+                last_id = page[-1].get("id") if isinstance(page[-1], dict) else None
+                if len(page) >= request.pageSize and last_id:
+                    next_task = asyncio.create_task(_fetch_objects_page(
+                        client, objects_url, headers, request.className,
+                        request.pageSize, last_id, request.includeVector,
+                    ))
+                yield _encode_ndjson(page)
+                exported += len(page)
+                page = await next_task if next_task is not None else []
+            logger.info("导出 objects 完成 id=%s class=%s 数量=%d", request.id, request.className, exported)
+        except UpstreamStatusError as e:
+            logger.error("导出 objects 中断 id=%s class=%s 已导出=%d 错误=%s", request.id, request.className, exported, e.message)
+            yield _encode_ndjson([{"error": e.message, "exported": exported}])
+        except httpx.TimeoutException:
+            logger.error("导出 objects 超时 id=%s class=%s 已导出=%d", request.id, request.className, exported)
+            yield _encode_ndjson([{"error": "查询超时，请稍后重试", "exported": exported}])
+        except httpx.HTTPError as e:
+            logger.error("导出 objects 连接错误 id=%s class=%s 已导出=%d 错误=%s", request.id, request.className, exported, str(e))
+            yield _encode_ndjson([{"error": f"连接失败: {str(e)}", "exported": exported}])
+        except ValueError as e:
+            logger.error("导出 objects 解析失败 id=%s class=%s 已导出=%d 错误=%s", request.id, request.className, exported, str(e))
+            yield _encode_ndjson([{"error": f"解析响应失败: {str(e)}", "exported": exported}])
+        except Exception as e:
+            logger.exception("导出 objects 出现未预期异常 id=%s class=%s 已导出=%d 错误=%s", request.id, request.className, exported, str(e))
+            yield _encode_ndjson([{"error": f"导出异常: {str(e)}", "exported": exported}])
+        finally:
+            # 客户端提前断开时取消预取
+            if next_task is not None and not next_task.done():
+                next_task.cancel()
+
+
+@router.post("/export")
+async def export_objects(request: ClassObjectsExportRequest):
+    """以 NDJSON 流导出指定 className 下的全部对象。
+
+    服务端沿 /v1/objects 的 `after` 游标逐页拉取，每行一个对象；写出当前页时预取下一页，
+    内存占用与 class 大小无关。首页失败时返回普通 `Response`，中途失败时在流末尾追加一行 `{"error": ...}`。
+    """
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    objects_url = f"{base_url}/v1/objects"
+
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    logger.info(
+        "导出 objects 开始 id=%s name=%s class=%s pageSize=%s includeVector=%s",
+        request.id, request.name, request.className, request.pageSize, request.includeVector,
+    )
+
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            first_page = await _fetch_objects_page(
+                client, objects_url, headers, request.className,
+                request.pageSize, None, request.includeVector,
+            )
+    except UpstreamStatusError as e:
+        return Response(success=False, message=e.message)
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("导出 objects 出现未预期异常 id=%s class=%s 错误=%s", request.id, request.className, str(e))
+        return Response(success=False, message=f"导出异常: {str(e)}")
+
+    return StreamingResponse(
+        _export_stream(request, objects_url, headers, first_page),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{request.className}.ndjson"'},
+    )
+
+
+async def _import_stream(request: ClassObjectsImportRequest, file: MultipartStreamReader) -> AsyncIterator[bytes]:
+    """边接收边解析上传文件并分批写入，按 NDJSON 输出进度"""
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+        importer = BatchImporter(
+            client,
+            base_url,
+            headers,
+            batch_size=request.batchSize or IMPORT_CONFIG["BATCH_SIZE"],
+            concurrency=request.concurrency or IMPORT_CONFIG["CONCURRENCY"],
+            max_retries=IMPORT_CONFIG["MAX_RETRIES"] if request.maxRetries is None else request.maxRetries,
+            retry_backoff=IMPORT_CONFIG["RETRY_BACKOFF"],
+            timeout=BATCH_IMPORT_TIMEOUT,
+            default_class=request.className,
+            max_reported_errors=IMPORT_CONFIG["MAX_REPORTED_ERRORS"],
+        )
+        try:
+            async for event in importer.run(iter_json_objects(file.read, IMPORT_CONFIG["READ_CHUNK_SIZE"])):
+                yield _encode_ndjson([event])
+        finally:
+            # 写入后通知相关 class 已变更，失效搜索结果与 schema 缓存
+            key = cluster_key(request.scheme, request.address, request.apiKey)
+            for class_name in importer.classes:
+                notify_class_changed(key, class_name)
+            logger.info(
+                "导入 objects 结束 id=%s 读取=%d 成功=%d 失败=%d 批次=%d",
+                request.id, importer.read, importer.imported, importer.failed, importer.batches,
+            )
+
+
+@router.post("/import")
+async def import_objects(http_request: Request):
+    """批量导入对象。
+
+    以 multipart 表单上传：`ClassObjectsImportRequest` 的字段 + `file`（NDJSON 或 JSON 数组文件），字段需位于 file 之前。
+    请求体不落盘：读到 file 部分即开始解析，边接收边通过 /v1/batch/objects 分批写入，
+    同时在途的批次数受 `concurrency` 限制（背压，写入跟不上时暂停接收上传），失败的批次/对象按指数退避重试。
+    响应为 NDJSON 进度流：每完成一批输出一条 `progress`，最后输出 `done`（或解析失败时的 `error`）。
+    """
+    try:
+        file = MultipartStreamReader(http_request, "file")
+        fields = await file.read_fields()
+        if not file.has_file:
+            raise ValueError("缺少上传文件 file（表单字段需位于 file 之前）")
+        request = ClassObjectsImportRequest.model_validate({k: v for k, v in fields.items() if v != ""})
+    except (ValueError, ValidationError) as e:
+        return Response(success=False, message=f"导入参数错误: {str(e)}")
+
+    logger.info(
+        "导入 objects 开始 id=%s name=%s class=%s 文件=%s",
+        request.id, request.name, request.className or "<按对象>", file.filename,
+    )
+
+    return UploadStreamingResponse(_import_stream(request, file), media_type="application/x-ndjson")
+
+
 def _to_where_operand(f: ObjectFilter):
     op = f.operator
     path = ["id"] if f.property == "id" else [f.property]
@@ -141,9 +464,118 @@ def _build_graphql_where(filters: list[ObjectFilter], logic: str | None = "And")
     return "{ operator: " + operator + " operands: [" + ", ".join(operands) + "] }"
 
 
-@router.post("/search", response_model=Response)
-async def search_objects(request: ClassObjectsSearchRequest) -> Response:
-    """基于 GraphQL where 的对象查询，支持属性过滤。"""
+def _build_where(filters: list[ObjectFilter], logic: str | None = "And") -> Dict[str, Any] | None:
+    """与 `_build_graphql_where` 相同的语义，生成 REST 接口使用的 where JSON"""
+    operands = [_to_where_operand(f) for f in filters or []]
+    if not operands:
+        return None
+    if len(operands) == 1:
+        return operands[0]
+    return {"operator": _normalize_logic(logic), "operands": operands}
+
+
+def _project_properties(requested: Optional[list[str]], selection: Optional[tuple]) -> str:
+    """根据请求的属性列表生成属性选择串；未指定时返回 schema 中的全部属性"""
+    if requested is None:
+        return selection[1] if selection else ""
+    names = [name for name in requested if isinstance(name, str) and GRAPHQL_NAME.match(name)]
+    if selection:
+        known = set(selection[0])
+        names = [name for name in names if name in known]
+    return " ".join(dict.fromkeys(names))
+
+
+def _search_status_message(status_code: int) -> str:
+    if status_code == 401:
+        return "未授权，请检查 API Key"
+    return f"查询失败: HTTP {status_code}"
+
+
+def _format_search_objects(
+    raw_objects: Any,
+    include_vector: bool,
+    include_raw: bool,
+    extra_additional: Tuple[str, ...] = (),
+) -> List[Dict[str, Any]]:
+    """把 GraphQL Get 返回的对象整理为 {id, properties, ...} 结构
+
+    `extra_additional` 中的 _additional 字段（如 distance、score）会原样提升到对象顶层。
+    """
+    formatted_objects = []
+    for item in raw_objects if isinstance(raw_objects, list) else []:
+        if not isinstance(item, dict):
+            continue
+        additional = item.get("_additional", {}) if isinstance(item.get("_additional"), dict) else {}
+        props = {
+            key: value
+            for key, value in item.items()
+            if key not in {"_additional", "__typename"}
+        }
+        formatted = {
+            "id": additional.get("id"),
+            "properties": props,
+            "creationTimeUnix": additional.get("creationTimeUnix"),
+            "lastUpdateTimeUnix": additional.get("lastUpdateTimeUnix"),
+        }
+        for name in extra_additional:
+            formatted[name] = additional.get(name)
+        if include_vector:
+            formatted["vector"] = additional.get("vector")
+        if include_raw:
+            formatted["raw"] = item
+        formatted_objects.append(formatted)
+    return formatted_objects
+
+
+async def _fetch_class_selection(
+    client: httpx.AsyncClient,
+    base_url: str,
+    headers: Dict[str, str],
+    key: Any,
+    class_name: str,
+) -> Optional[tuple]:
+    """获取 class 的 (属性列表, 属性选择串)，优先使用缓存，避免每次搜索都拉取 class schema"""
+    selection = schema_cache.get_selection(key, class_name)
+    if selection is not None:
+        return selection
+    schema_url = f"{base_url}/v1/schema/{class_name}"
+    try:
+        with timed("schema"):
+            schema_resp = await client.get(schema_url, headers=headers, timeout=OBJECTS_QUERY_TIMEOUT)
+            schema_json = schema_resp.json() if schema_resp.status_code == 200 else None
+        if schema_resp.status_code == 200:
+            if isinstance(schema_json, dict):
+                schema_cache.set_class(key, class_name, schema_json, len(schema_resp.content))
+                selection = schema_cache.set_selection(key, class_name, schema_json)
+    except Exception as schema_error:
+        logger.warning("获取 schema 属性失败 class=%s 错误=%s", class_name, str(schema_error))
+    return selection
+
+
+def _search_cache_key(key: Any, request: ClassObjectsSearchRequest, properties_selection: str) -> tuple:
+    filters_key, logic_key = normalize_filters(request.filters or [], _normalize_logic(request.logic))
+    return search_result_cache.make_key(
+        key, request.className, filters_key, logic_key, request.limit or 100, request.offset,
+        properties_selection, request.includeVector, request.includeRaw,
+    )
+
+
+# offset 分页需要确定的顺序：Weaviate 不保证未排序的 Get 在多分片间或写入前后顺序一致，
+# 按创建时间排序（新写入的对象排在末尾），id 保证同一时间戳内的顺序
+_SEARCH_SORT = '[{ path: ["_creationTimeUnix"] order: asc }, { path: ["_id"] order: asc }]'
+
+
+async def _run_search(
+    client: httpx.AsyncClient,
+    request: ClassObjectsSearchRequest,
+    wait_prefetch: bool = True,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """执行一次 GraphQL where 搜索，返回 (整理后的对象, Weaviate 原始返回)。
+
+    为判断是否有下一页，对象最多比 `limit` 多一条，由调用方截断。
+    结果按规范化后的查询条件缓存在 `search_result_cache` 中；同一页正在预取时等待预取结果。
+    非 200 响应或 GraphQL 错误抛出 `UpstreamStatusError`，网络错误按 httpx 异常抛出。
+    """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
     graphql_url = f"{base_url}/v1/graphql"
 
@@ -155,95 +587,1064 @@ async def search_objects(request: ClassObjectsSearchRequest) -> Response:
     if request.apiKey:
         schema_headers["Authorization"] = f"Bearer {request.apiKey}"
 
-    properties: list[str] = []
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+    selection = await _fetch_class_selection(client, base_url, schema_headers, key, request.className)
+    properties_selection = _project_properties(request.properties, selection)
+
+    logic = _normalize_logic(getattr(request, "logic", "And"))
+    # 多取一条用于判断是否还有下一页
+    limit_value = (request.limit or 100) + 1
+
+    cache_key = _search_cache_key(key, request, properties_selection)
+    cached = search_result_cache.get(cache_key)
+    if cached is not None:
+        logger.info("GraphQL objects 搜索 命中缓存 class=%s offset=%s", request.className, request.offset)
+        note_timing("cache", "hit")
+        return cached
+    if wait_prefetch:
+        inflight = _search_prefetches.get(cache_key)
+        if inflight is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # 预取因 class 数据变更被取消时自行查询；请求本身被取消时继续抛出
+                if not inflight.cancelled():
+                    raise
+            except Exception:
+                # 预取失败时自行查询
+                pass
+
+    additional_fields = "id creationTimeUnix lastUpdateTimeUnix"
+    if request.includeVector:
+        additional_fields += " vector"
+    selection_parts = [f"_additional {{ {additional_fields} }}"]
+    if properties_selection:
+        selection_parts.append(properties_selection)
+    selection_body = " ".join(selection_parts)
+
+    where_literal = _build_graphql_where(request.filters or [], logic)
+    where_fragment = f", where: {where_literal}" if where_literal else ""
+    offset_fragment = f", offset: {request.offset}" if request.offset else ""
+
+    query = (
+        "{ "
+        "Get { "
+        f"{request.className}(limit: {limit_value}, sort: {_SEARCH_SORT}{offset_fragment}{where_fragment}) "
+        f"{{ {selection_body} }} "
+        "} }"
+    )
+
+    body = {
+        "query": query,
+    }
+
+    with timed("graphql"):
+        resp = await client.post(graphql_url, headers=headers, json=body, timeout=OBJECTS_QUERY_TIMEOUT)
+    if resp.status_code != 200:
+        raise UpstreamStatusError(resp.status_code, _search_status_message(resp.status_code))
+    with timed("parse"):
+        data = resp.json()
+    raw_objects = (
+        data.get("data", {})
+        .get("Get", {})
+        .get(request.className, [])
+        if isinstance(data, dict)
+        else []
+    )
+    errors = data.get("errors") if isinstance(data, dict) else None
+    if errors and not raw_objects:
+        message = errors[0].get("message") if isinstance(errors, list) and isinstance(errors[0], dict) else errors
+        raise UpstreamStatusError(resp.status_code, f"查询失败: {message}")
+    with timed("format"):
+        formatted_objects = _format_search_objects(raw_objects, request.includeVector, request.includeRaw)
+    search_result_cache.set(cache_key, (formatted_objects, data), len(resp.content))
+    return formatted_objects, data
+
+
+async def _prefetch_search(request: ClassObjectsSearchRequest) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    detach_timings()
+    async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+        return await _run_search(client, request, wait_prefetch=False)
+
+
+def _prefetch_done(cache_key: tuple, task: asyncio.Task) -> None:
+    if _search_prefetches.get(cache_key) is task:
+        _search_prefetches.pop(cache_key)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("预取下一页失败 错误=%s", str(task.exception()))
+
+
+@on_class_changed
+def _cancel_search_prefetches(key: Any, class_name: str) -> None:
+    """class 数据变更后取消该 class 正在进行的预取，避免变更前的查询结果写入缓存"""
+    stale = [cache_key for cache_key in _search_prefetches if cache_key[0] == key and cache_key[1] == class_name]
+    for cache_key in stale:
+        _search_prefetches.pop(cache_key).cancel()
+    if stale:
+        logger.info("取消搜索预取 class=%s 数量=%d", class_name, len(stale))
+
+
+async def _schedule_search_prefetch(client: httpx.AsyncClient, request: ClassObjectsSearchRequest) -> None:
+    """在后台预取 `request` 对应的页，结果写入搜索结果缓存；同时进行的预取数量受限"""
+    if not SEARCH_PREFETCH_CONFIG["ENABLED"] or len(_search_prefetches) >= SEARCH_PREFETCH_CONFIG["MAX_INFLIGHT"]:
+        return
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+    selection = await _fetch_class_selection(client, base_url, headers, key, request.className)
+    cache_key = _search_cache_key(key, request, _project_properties(request.properties, selection))
+    if cache_key in search_result_cache or cache_key in _search_prefetches:
+        return
+    task = asyncio.create_task(_prefetch_search(request))
+    _search_prefetches[cache_key] = task
+    task.add_done_callback(lambda t: _prefetch_done(cache_key, t))
+
+
+@router.post("/search", response_model=Response)
+async def search_objects(request: ClassObjectsSearchRequest, http_request: Request) -> Response:
+    """基于 GraphQL where 的对象查询，支持属性过滤。
+
+    默认只返回表格需要的内容：`properties` 指定要返回的属性（默认全部），
+    `includeVector` 控制是否拉取向量，`includeRaw` 控制是否附带 Weaviate 原始返回。
+    相同查询在 `RESULT_CACHE_CONFIG['TTL']` 内直接返回缓存结果；向量编码可协商，见 `_objects_response`。
 
-    logger.info("GraphQL objects 搜索 开始 class=%s url=%s", request.className, graphql_url)
+    分页：结果按创建时间、id 升序排列（见 `_SEARCH_SORT`），按 `offset` + `limit` 翻页，
+    响应中的 `page.nextOffset` 即下一页的 offset；翻页期间删除对象会使后续页整体前移。返回一页后会在后台预取下一页，翻页时直接命中缓存。
+    注意 Weaviate 默认限制 offset + limit 不超过 QUERY_MAXIMUM_RESULTS（10000）。
+    """
+    logger.info("GraphQL objects 搜索 开始 class=%s url=%s://%s", request.className, request.scheme, request.address)
 
     try:
-        async with httpx.AsyncClient(timeout=OBJECTS_QUERY_TIMEOUT) as client:
-            schema_url = f"{base_url}/v1/schema/{request.className}"
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             try:
-                schema_resp = await client.get(schema_url, headers=schema_headers)
-                if schema_resp.status_code == 200:
-                    schema_json = schema_resp.json()
-                    raw_props = schema_json.get("properties", []) if isinstance(schema_json, dict) else []
-                    properties = [p.get("name") for p in raw_props if isinstance(p, dict) and p.get("name")]
-            except Exception as schema_error:
-                logger.warning("获取 schema 属性失败 class=%s 错误=%s", request.className, str(schema_error))
-
-            selection_parts = ["_additional { id vector creationTimeUnix lastUpdateTimeUnix }"]
-            if properties:
-                selection_parts.append(" ".join(properties))
-            selection_body = " ".join(selection_parts)
-
-            logic = _normalize_logic(getattr(request, "logic", "And"))
-            where_literal = _build_graphql_where(request.filters or [], logic)
+                formatted_objects, data = await _run_search(client, request)
+            except UpstreamStatusError as e:
+                return Response(success=False, message=e.message)
+            except ValueError as e:
+                # 响应体不是合法 JSON
+                return Response(success=False, message=f"解析响应失败: {str(e)}")
+
             limit_value = request.limit or 100
-            where_fragment = f", where: {where_literal}" if where_literal else ""
+            has_more = len(formatted_objects) > limit_value
+            if has_more:
+                await _schedule_search_prefetch(
+                    client, request.model_copy(update={"offset": request.offset + limit_value}),
+                )
 
-            query = (
-                "{ "
-                "Get { "
-                f"{request.className}(limit: {limit_value}{where_fragment}) "
-                f"{{ {selection_body} }} "
-                "} }"
+            # 缓存中的对象是共享的，编码向量前先浅拷贝
+            objects = [dict(obj) for obj in formatted_objects[:limit_value]]
+            result_data: Dict[str, Any] = {
+                "objects": objects,
+                "page": {
+                    "offset": request.offset,
+                    "limit": limit_value,
+                    "hasMore": has_more,
+                    "nextOffset": request.offset + limit_value if has_more else None,
+                },
+            }
+            if request.includeRaw:
+                result_data["raw"] = data
+            return _objects_response(
+                http_request, request.vectorEncoding, objects, "查询对象成功", result_data,
             )
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("GraphQL objects 搜索异常 class=%s 错误=%s", request.className, str(e))
+        return Response(success=False, message=f"查询异常: {str(e)}")
 
-            body = {
-                "query": query,
-            }
 
-            resp = await client.post(graphql_url, headers=headers, json=body)
-            if resp.status_code == 200:
+def _ndjson_line(item: Dict[str, Any]) -> bytes:
+    return fast_json_dumps(item) + b"\n"
+
+
+async def _fan_out_one(
+    request: FanOutSearchRequest,
+    record: Dict[str, Any],
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+) -> Dict[str, Any]:
+    """在单个集群上执行搜索，错误（含超时）写入结果而不抛出"""
+    search_request = ClassObjectsSearchRequest(
+        id=str(record.get("id", "")),
+        name=record.get("name", ""),
+        scheme=record.get("scheme") or "http",
+        address=record.get("address", ""),
+        apiKey=record.get("apiKey") or None,
+        className=request.className,
+        filters=request.filters,
+        logic=request.logic,
+        limit=request.limit,
+        offset=request.offset,
+        properties=request.properties,
+        includeVector=request.includeVector,
+    )
+    result: Dict[str, Any] = {
+        "event": "result",
+        "id": search_request.id,
+        "name": search_request.name,
+        "address": f"{search_request.scheme}://{search_request.address}",
+    }
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            async with client_registry.acquire(search_request.scheme, search_request.address, search_request.apiKey) as client:
+                formatted_objects, _ = await asyncio.wait_for(_run_search(client, search_request), timeout)
+        except asyncio.TimeoutError:
+            result["error"] = f"查询超时（超过 {timeout:g}s）"
+        except UpstreamStatusError as e:
+            result["error"] = e.message
+        except httpx.TimeoutException:
+            result["error"] = "查询超时，请稍后重试"
+        except httpx.ConnectError as e:
+            result["error"] = f"连接失败: {str(e)}"
+        except ValueError as e:
+            result["error"] = f"解析响应失败: {str(e)}"
+        except Exception as e:
+            logger.exception("多集群搜索异常 id=%s class=%s 错误=%s", search_request.id, request.className, str(e))
+            result["error"] = f"查询异常: {str(e)}"
+        result["tookMs"] = round((time.perf_counter() - started) * 1000, 3)
+
+    if "error" in result:
+        result["success"] = False
+        logger.warning("多集群搜索 失败 id=%s class=%s 错误=%s", search_request.id, request.className, result["error"])
+        return result
+
+    limit_value = request.limit or 100
+    has_more = len(formatted_objects) > limit_value
+    # 缓存中的对象是共享的，编码向量前先浅拷贝
+    objects = [dict(obj) for obj in formatted_objects[:limit_value]]
+    encode_object_vectors(objects, request.vectorEncoding)
+    result.update({
+        "success": True,
+        "objects": objects,
+        "page": {
+            "offset": request.offset,
+            "limit": limit_value,
+            "hasMore": has_more,
+            "nextOffset": request.offset + limit_value if has_more else None,
+        },
+        "vectorEncoding": request.vectorEncoding,
+    })
+    return result
+
+
+async def _fan_out_stream(
+    request: FanOutSearchRequest,
+    records: List[Dict[str, Any]],
+    missing: List[str],
+) -> AsyncIterator[bytes]:
+    """按完成顺序输出各集群结果，首尾分别为 start / done 事件"""
+    timeout = request.timeout or FANOUT_SEARCH_CONFIG["CLUSTER_TIMEOUT"]
+    started = time.perf_counter()
+    yield _ndjson_line({
+        "event": "start",
+        "className": request.className,
+        "clusters": [
+            {"id": str(r.get("id", "")), "name": r.get("name", ""), "address": f"{r.get('scheme') or 'http'}://{r.get('address', '')}"}
+            for r in records
+        ],
+        "timeout": timeout,
+    })
+    for conn_id in missing:
+        yield _ndjson_line({"event": "result", "id": conn_id, "success": False, "error": "未找到连接配置"})
+
+    semaphore = asyncio.Semaphore(max(FANOUT_SEARCH_CONFIG["MAX_CONCURRENCY"], 1))
+    tasks = [asyncio.create_task(_fan_out_one(request, record, semaphore, timeout)) for record in records]
+    succeeded = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
+            succeeded += 1 if result["success"] else 0
+            yield _ndjson_line(result)
+    finally:
+        # 客户端提前断开时取消未完成的查询
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    total_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "多集群搜索 完成 class=%s 集群数=%d 成功=%d 耗时=%.1fms",
+        request.className, len(records) + len(missing), succeeded, total_ms,
+    )
+    yield _ndjson_line({
+        "event": "done",
+        "succeeded": succeeded,
+        "failed": len(records) + len(missing) - succeeded,
+        "totalMs": round(total_ms, 3),
+    })
+
+
+@router.post("/search/fan-out")
+async def fan_out_search(request: FanOutSearchRequest):
+    """在多个已保存集群（`connectionIds`，见 clusters.json）上并发执行同一 GraphQL where 查询。
+
+    以 NDJSON 流返回：首行 `{"event": "start"}`，之后每个集群完成时立即输出一行
+    `{"event": "result", "id", "success", "objects", "page", "tookMs"}`（失败时为 `error`），
+    不等待最慢的集群；末行为 `{"event": "done"}`。单个集群超过 `timeout` 秒记为失败，不影响其他集群。
+    同时查询的集群数受 `FANOUT_SEARCH_CONFIG['MAX_CONCURRENCY']` 限制，各集群的结果缓存与 `/objects/search` 共享。
+    """
+    conn_ids = list(dict.fromkeys(str(conn_id) for conn_id in request.connectionIds))
+    if len(conn_ids) > FANOUT_SEARCH_CONFIG["MAX_CLUSTERS"]:
+        return Response(success=False, message=f"集群数量超过上限 {FANOUT_SEARCH_CONFIG['MAX_CLUSTERS']}")
+
+    records: List[Dict[str, Any]] = []
+    missing: List[str] = []
+    try:
+        for conn_id in conn_ids:
+            record = await connection_store.get(conn_id)
+            if record is None:
+                missing.append(conn_id)
+            else:
+                records.append(record)
+    except Exception as e:
+        logger.exception("读取连接配置失败 错误=%s", str(e))
+        return Response(success=False, message=f"读取连接配置失败: {str(e)}")
+    if not records:
+        return Response(success=False, message="未找到任何连接配置")
+
+    logger.info(
+        "多集群搜索 开始 class=%s 集群=%s 未找到=%s",
+        request.className, [r.get("id") for r in records], missing,
+    )
+    return StreamingResponse(
+        _fan_out_stream(request, records, missing),
+        media_type="application/x-ndjson",
+    )
+
+
+def _format_rest_object(obj: Dict[str, Any], properties: Optional[list[str]], include_vector: bool) -> Dict[str, Any]:
+    """把 /v1/objects/{class}/{id} 返回的对象整理为与 `_format_search_objects` 相同的结构"""
+    props = obj.get("properties") if isinstance(obj.get("properties"), dict) else {}
+    if properties is not None:
+        wanted = set(properties)
+        props = {key: value for key, value in props.items() if key in wanted}
+    formatted = {
+        "id": obj.get("id"),
+        "properties": props,
+        "creationTimeUnix": obj.get("creationTimeUnix"),
+        "lastUpdateTimeUnix": obj.get("lastUpdateTimeUnix"),
+    }
+    if include_vector:
+        formatted["vector"] = obj.get("vector")
+    return formatted
+
+
+async def _get_many_graphql(
+    client: httpx.AsyncClient,
+    base_url: str,
+    headers: Dict[str, str],
+    request: ObjectsGetManyRequest,
+    ids: List[str],
+    properties_selection: str,
+) -> Dict[str, Dict[str, Any]]:
+    """按 `CHUNK_SIZE` 分块执行 where id ContainsAny 查询（有限并发），返回 id -> 对象。
+
+    GraphQL 错误（如旧版本不支持 ContainsAny）与非 200 响应抛出 `UpstreamStatusError`。
+    """
+    graphql_url = f"{base_url}/v1/graphql"
+    additional_fields = "id creationTimeUnix lastUpdateTimeUnix"
+    if request.includeVector:
+        additional_fields += " vector"
+    selection_body = f"_additional {{ {additional_fields} }}"
+    if properties_selection:
+        selection_body += f" {properties_selection}"
+
+    chunk_size = max(GET_MANY_CONFIG["CHUNK_SIZE"], 1)
+    semaphore = asyncio.Semaphore(max(GET_MANY_CONFIG["GRAPHQL_CONCURRENCY"], 1))
+
+    async def run_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+        where = f'{{ path: ["id"] operator: ContainsAny valueText: {json.dumps(chunk)} }}'
+        query = f"{{ Get {{ {request.className}(limit: {len(chunk)}, where: {where}) {{ {selection_body} }} }} }}"
+        async with semaphore:
+            with timed("graphql"):
+                resp = await client.post(graphql_url, headers=headers, json={"query": query}, timeout=OBJECTS_QUERY_TIMEOUT)
+        if resp.status_code != 200:
+            raise UpstreamStatusError(resp.status_code, _search_status_message(resp.status_code))
+        with timed("parse"):
+            data = resp.json()
+        errors = data.get("errors") if isinstance(data, dict) else None
+        if errors:
+            message = errors[0].get("message") if isinstance(errors, list) and isinstance(errors[0], dict) else errors
+            raise UpstreamStatusError(resp.status_code, f"查询失败: {message}")
+        raw_objects = (data.get("data") or {}).get("Get", {}).get(request.className) if isinstance(data, dict) else None
+        with timed("format"):
+            return _format_search_objects(raw_objects, request.includeVector, False)
+
+    tasks = [asyncio.create_task(run_chunk(ids[i:i + chunk_size])) for i in range(0, len(ids), chunk_size)]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    found: Dict[str, Dict[str, Any]] = {}
+    for objects in results:
+        for obj in objects:
+            if isinstance(obj.get("id"), str):
+                found[obj["id"].lower()] = obj
+    return found
+
+
+async def _get_many_rest(
+    client: httpx.AsyncClient,
+    base_url: str,
+    headers: Dict[str, str],
+    request: ObjectsGetManyRequest,
+    ids: List[str],
+) -> Dict[str, Any]:
+    """有限并发地逐个 GET /v1/objects/{class}/{id}，返回 id -> 对象或错误信息"""
+    params = {"include": "vector"} if request.includeVector else None
+    semaphore = asyncio.Semaphore(max(GET_MANY_CONFIG["REST_CONCURRENCY"], 1))
+
+    async def fetch(object_id: str) -> Tuple[str, Any]:
+        url = f"{base_url}/v1/objects/{request.className}/{object_id}"
+        async with semaphore:
+            try:
+                with timed("objects"):
+                    resp = await client.get(url, params=params, headers=headers, timeout=OBJECTS_QUERY_TIMEOUT)
+            except httpx.TimeoutException:
+                return object_id, "查询超时，请稍后重试"
+            except httpx.HTTPError as e:
+                return object_id, f"连接失败: {str(e)}"
+        if resp.status_code == 404:
+            return object_id, "对象不存在"
+        if resp.status_code != 200:
+            return object_id, _objects_status_message(resp.status_code)
+        try:
+            obj = resp.json()
+        except ValueError as e:
+            return object_id, f"解析响应失败: {str(e)}"
+        if not isinstance(obj, dict):
+            return object_id, "解析响应失败: 返回内容不是对象"
+        return object_id, _format_rest_object(obj, request.properties, request.includeVector)
+
+    return dict(await asyncio.gather(*(fetch(object_id) for object_id in ids)))
+
+
+@router.post("/get-many", response_model=Response)
+async def get_many_objects(request: ObjectsGetManyRequest, http_request: Request) -> Response:
+    """按 id 批量获取对象，结果按 `ids` 的顺序返回。
+
+    默认（`strategy=auto`）把 id 按 `GET_MANY_CONFIG['CHUNK_SIZE']` 分块，每块一个 where id ContainsAny 的
+    GraphQL 查询，各块并发执行，延迟接近单次往返；Weaviate 不支持时（< 1.21 或返回 GraphQL 错误）
+    回退为有限并发的 GET /v1/objects/{class}/{id}。
+    `data.items` 中每项为 `{id, object}`，未找到或失败的 id 为 `{id, object: null, error}`；向量编码可协商，见 `_objects_response`。
+    """
+    if len(request.ids) > GET_MANY_CONFIG["MAX_IDS"]:
+        return Response(success=False, message=f"id 数量超过上限 {GET_MANY_CONFIG['MAX_IDS']}")
+
+    # Weaviate 返回小写 UUID，统一规范化后匹配；非法 id 不发往上游
+    normalized: Dict[str, Optional[str]] = {}
+    for raw_id in request.ids:
+        try:
+            normalized[raw_id] = str(uuid.UUID(raw_id))
+        except (ValueError, AttributeError, TypeError):
+            normalized[raw_id] = None
+    ids = list(dict.fromkeys(value for value in normalized.values() if value))
+
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    logger.info(
+        "批量获取对象 开始 id=%s class=%s 数量=%d strategy=%s",
+        request.id, request.className, len(ids), request.strategy,
+    )
+
+    strategy = request.strategy
+    found: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    started = time.perf_counter()
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            if ids and strategy in ("auto", "graphql"):
+                key = cluster_key(request.scheme, request.address, request.apiKey)
+                selection = await _fetch_class_selection(client, base_url, headers, key, request.className)
                 try:
-                    data = resp.json()
-                    raw_objects = (
-                        data.get("data", {})
-                        .get("Get", {})
-                        .get(request.className, [])
-                        if isinstance(data, dict)
-                        else []
+                    found = await _get_many_graphql(
+                        client, base_url, {**headers, "Content-Type": "application/json"}, request, ids,
+                        _project_properties(request.properties, selection),
                     )
+                    strategy = "graphql"
+                except UpstreamStatusError as e:
+                    if strategy == "graphql" or e.status_code in (401, 403):
+                        return Response(success=False, message=e.message)
+                    logger.warning("批量获取对象 GraphQL 失败，回退到逐个 GET class=%s 错误=%s", request.className, e.message)
+                    strategy = "rest"
+            if ids and strategy == "rest":
+                for object_id, value in (await _get_many_rest(client, base_url, headers, request, ids)).items():
+                    if isinstance(value, dict):
+                        found[object_id] = value
+                    else:
+                        errors[object_id] = value
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except ValueError as e:
+        return Response(success=False, message=f"解析响应失败: {str(e)}")
+    except Exception as e:
+        logger.exception("批量获取对象异常 class=%s 错误=%s", request.className, str(e))
+        return Response(success=False, message=f"查询异常: {str(e)}")
 
-                    formatted_objects = []
-                    for item in raw_objects:
-                        if not isinstance(item, dict):
-                            continue
-                        additional = item.get("_additional", {}) if isinstance(item.get("_additional"), dict) else {}
-                        props = {
-                            key: value
-                            for key, value in item.items()
-                            if key not in {"_additional", "__typename"}
-                        }
-                        formatted_objects.append(
-                            {
-                                "id": additional.get("id"),
-                                "properties": props,
-                                "vector": additional.get("vector"),
-                                "creationTimeUnix": additional.get("creationTimeUnix"),
-                                "lastUpdateTimeUnix": additional.get("lastUpdateTimeUnix"),
-                                "raw": item,
-                            }
-                        )
+    items: List[Dict[str, Any]] = []
+    for raw_id in request.ids:
+        object_id = normalized[raw_id]
+        if object_id is None:
+            items.append({"id": raw_id, "object": None, "error": "无效的 id（不是 UUID）"})
+        elif object_id in found:
+            items.append({"id": raw_id, "object": found[object_id]})
+        else:
+            items.append({"id": raw_id, "object": None, "error": errors.get(object_id, "对象不存在")})
+    missing = sum(1 for item in items if item["object"] is None)
+    took_ms = (time.perf_counter() - started) * 1000
+    logger.info(
+        "批量获取对象 完成 class=%s strategy=%s 请求=%d 找到=%d 缺失=%d 耗时=%.1fms",
+        request.className, strategy, len(request.ids), len(items) - missing, missing, took_ms,
+    )
+    return _objects_response(
+        http_request,
+        request.vectorEncoding,
+        list(found.values()),
+        "获取对象成功" if not missing else f"获取对象完成，{missing} 个未找到或失败",
+        {
+            "className": request.className,
+            "strategy": strategy,
+            "items": items,
+            "found": len(items) - missing,
+            "missing": missing,
+            "tookMs": round(took_ms, 3),
+        },
+    )
 
-                    return Response(
-                        success=True,
-                        message="查询对象成功",
-                        data={
-                            "objects": formatted_objects,
-                            "raw": data,
-                        },
-                    )
-                except Exception as e:
-                    return Response(success=False, message=f"解析响应失败: {str(e)}")
-            elif resp.status_code == 401:
-                return Response(success=False, message="未授权，请检查 API Key")
-            else:
-                return Response(success=False, message=f"查询失败: HTTP {resp.status_code}")
+
+def _batch_delete_status_message(resp: httpx.Response) -> str:
+    if resp.status_code in (401, 403):
+        return "未授权，请检查 API Key"
+    try:
+        error_list = resp.json().get("error")
+        detail = "; ".join(e.get("message", "") for e in error_list if isinstance(e, dict))
+    except (ValueError, AttributeError, TypeError):
+        detail = ""
+    return f"删除失败: HTTP {resp.status_code}" + (f" {detail}" if detail else "")
+
+
+async def _batch_delete(
+    client: httpx.AsyncClient,
+    base_url: str,
+    headers: Dict[str, str],
+    class_name: str,
+    where: Dict[str, Any],
+    dry_run: bool,
+) -> Dict[str, Any]:
+    """执行一次 DELETE /v1/batch/objects，返回 `results`（matches/limit/successful/failed）。
+
+    Weaviate 单次最多处理 QUERY_MAXIMUM_RESULTS 个匹配对象，`results.limit` 即该上限。
+    """
+    body = {"match": {"class": class_name, "where": where}, "dryRun": dry_run, "output": "minimal"}
+    with timed("delete"):
+        resp = await client.request(
+            "DELETE", f"{base_url}/v1/batch/objects", headers=headers, json=body,
+            timeout=DELETE_BY_FILTER_CONFIG["CALL_TIMEOUT"],
+        )
+    if resp.status_code != 200:
+        raise UpstreamStatusError(resp.status_code, _batch_delete_status_message(resp))
+    data = resp.json()
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, dict):
+        raise ValueError("响应缺少 results")
+    return {
+        "matches": int(results.get("matches") or 0),
+        "limit": int(results.get("limit") or DELETE_BY_FILTER_CONFIG["DEFAULT_LIMIT"]),
+        "successful": int(results.get("successful") or 0),
+        "failed": int(results.get("failed") or 0),
+    }
+
+
+async def _delete_by_filter_stream(
+    request: ObjectsDeleteByFilterRequest,
+    base_url: str,
+    headers: Dict[str, str],
+    where: Dict[str, Any],
+    preview: Dict[str, Any],
+) -> AsyncIterator[bytes]:
+    """逐轮执行批量删除（每轮最多 `limit` 个），每轮输出一行进度"""
+    started = time.perf_counter()
+    deleted = failed = rounds = 0
+
+    def event(name: str, **extra: Any) -> bytes:
+        return _ndjson_line({
+            "event": name,
+            "className": request.className,
+            "rounds": rounds,
+            "deleted": deleted,
+            "failed": failed,
+            "elapsed": round(time.perf_counter() - started, 3),
+            **extra,
+        })
+
+    yield event("start", matches=preview["matches"], limit=preview["limit"],
+                matchesCapped=preview["matches"] >= preview["limit"])
+    async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+        try:
+            while rounds < max(DELETE_BY_FILTER_CONFIG["MAX_ROUNDS"], 1):
+                results = await _batch_delete(client, base_url, headers, request.className, where, False)
+                rounds += 1
+                deleted += results["successful"]
+                failed += results["failed"]
+                yield event("progress", matches=results["matches"], successful=results["successful"],
+                            roundFailed=results["failed"])
+                # 匹配数未达上限说明已处理完全部匹配对象；一个都没删掉时继续重试也不会有进展
+                if results["matches"] < results["limit"] or not results["successful"]:
+                    break
+            yield event("done")
+        except UpstreamStatusError as e:
+            yield event("error", error=e.message)
+        except httpx.TimeoutException:
+            yield event("error", error="删除超时，可重新提交以继续删除剩余对象")
+        except httpx.HTTPError as e:
+            yield event("error", error=f"连接失败: {str(e)}")
+        except ValueError as e:
+            yield event("error", error=f"解析响应失败: {str(e)}")
+        finally:
+            if deleted:
+                notify_class_changed(cluster_key(request.scheme, request.address, request.apiKey), request.className)
+            logger.info(
+                "按条件删除对象 结束 id=%s class=%s 轮数=%d 删除=%d 失败=%d 耗时=%.1fms",
+                request.id, request.className, rounds, deleted, failed, (time.perf_counter() - started) * 1000,
+            )
+
+
+@router.post("/delete-by-filter")
+async def delete_objects_by_filter(request: ObjectsDeleteByFilterRequest):
+    """按过滤条件批量删除对象（DELETE /v1/batch/objects）。
+
+    过滤条件与 /objects/search 相同。先以 `dryRun` 统计匹配数量：`dryRun=true` 或无匹配时直接返回
+    `{matches, limit, matchesCapped}`（匹配数达到 Weaviate 单次上限 `limit` 时实际数量可能更多）。
+    否则分轮删除，每轮最多 `limit` 个对象，直到匹配数低于上限；响应为 NDJSON 进度流：
+    `start`，每轮一条 `progress`，最后为 `done` 或 `error`，大量删除不会因单个请求超时而失败。
+    """
+    where = _build_where(request.filters, request.logic)
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    headers: Dict[str, str] = {"Content-Type": "application/json"}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    logger.info(
+        "按条件删除对象 开始 id=%s name=%s class=%s dryRun=%s where=%s",
+        request.id, request.name, request.className, request.dryRun, json.dumps(where, ensure_ascii=False),
+    )
+
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            preview = await _batch_delete(client, base_url, headers, request.className, where, True)
+    except UpstreamStatusError as e:
+        return Response(success=False, message=e.message)
     except httpx.TimeoutException:
         return Response(success=False, message="查询超时，请稍后重试")
     except httpx.ConnectError as e:
         return Response(success=False, message=f"连接失败: {str(e)}")
+    except ValueError as e:
+        return Response(success=False, message=f"解析响应失败: {str(e)}")
     except Exception as e:
-        logger.exception("GraphQL objects 搜索异常 class=%s 错误=%s", request.className, str(e))
+        logger.exception("按条件删除对象 预估异常 class=%s 错误=%s", request.className, str(e))
+        return Response(success=False, message=f"删除异常: {str(e)}")
+
+    capped = preview["matches"] >= preview["limit"]
+    if request.dryRun or not preview["matches"]:
+        return Response(
+            success=True,
+            message=f"匹配{'至少' if capped else ''} {preview['matches']} 个对象"
+            + ("（未删除）" if request.dryRun and preview["matches"] else ""),
+            data={
+                "className": request.className,
+                "where": where,
+                "matches": preview["matches"],
+                "limit": preview["limit"],
+                "matchesCapped": capped,
+            },
+        )
+
+    return StreamingResponse(
+        _delete_by_filter_stream(request, base_url, headers, where, preview),
+        media_type="application/x-ndjson",
+    )
+
+
+# 相似度搜索模式 -> 返回的打分字段
+_SIMILARITY_SCORE_FIELDS = {
+    "nearVector": "distance",
+    "nearText": "distance",
+    "bm25": "score",
+    "hybrid": "score",
+}
+
+
+def _similarity_arguments(mode: str, request: SimilaritySearchRequest) -> Tuple[List[str], Optional[str]]:
+    """为每个查询生成 GraphQL 检索参数，返回 (参数列表, 错误消息)"""
+    vectors = request.vectors or []
+    texts = request.queries or []
+    search_properties = [p for p in request.searchProperties or [] if GRAPHQL_NAME.match(p)]
+    arguments: List[str] = []
+
+    if mode == "nearVector":
+        if not vectors:
+            return [], "缺少查询向量 vectors"
+        for vector in vectors:
+            parts = [f"vector: {json.dumps(vector)}"]
+            if request.distance is not None:
+                parts.append(f"distance: {request.distance}")
+            arguments.append("nearVector: { " + " ".join(parts) + " }")
+    elif mode == "nearText":
+        if not texts:
+            return [], "缺少查询文本 queries"
+        for text in texts:
+            parts = [f"concepts: {json.dumps([text], ensure_ascii=False)}"]
+            if request.distance is not None:
+                parts.append(f"distance: {request.distance}")
+            arguments.append("nearText: { " + " ".join(parts) + " }")
+    elif mode == "bm25":
+        if not texts:
+            return [], "缺少查询文本 queries"
+        for text in texts:
+            parts = [f"query: {json.dumps(text, ensure_ascii=False)}"]
+            if search_properties:
+                parts.append(f"properties: {json.dumps(search_properties)}")
+            arguments.append("bm25: { " + " ".join(parts) + " }")
+    elif mode == "hybrid":
+        if not texts:
+            return [], "缺少查询文本 queries"
+        if vectors and len(vectors) != len(texts):
+            return [], "hybrid 的 vectors 数量必须与 queries 一致"
+        for idx, text in enumerate(texts):
+            parts = [f"query: {json.dumps(text, ensure_ascii=False)}"]
+            if request.alpha is not None:
+                parts.append(f"alpha: {request.alpha}")
+            if vectors:
+                parts.append(f"vector: {json.dumps(vectors[idx])}")
+            if search_properties:
+                parts.append(f"properties: {json.dumps(search_properties)}")
+            arguments.append("hybrid: { " + " ".join(parts) + " }")
+
+    if len(arguments) > SIMILARITY_CONFIG["MAX_QUERIES"]:
+        return [], f"查询数量超过上限 {SIMILARITY_CONFIG['MAX_QUERIES']}"
+    return arguments, None
+
+
+async def _run_similarity(mode: str, request: SimilaritySearchRequest) -> Response:
+    """把多个相似度查询合并为多别名 GraphQL 文档（`q0: Class(...) q1: ...`），多个文档有限并发执行"""
+    arguments, error = _similarity_arguments(mode, request)
+    if error:
+        return Response(success=False, message=error)
+
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    graphql_url = f"{base_url}/v1/graphql"
+    headers: Dict[str, str] = {"Content-Type": "application/json"}
+    schema_headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+        schema_headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    score_field = _SIMILARITY_SCORE_FIELDS[mode]
+    chunk_size = request.queriesPerRequest or SIMILARITY_CONFIG["QUERIES_PER_REQUEST"]
+    semaphore = asyncio.Semaphore(request.concurrency or SIMILARITY_CONFIG["MAX_CONCURRENCY"])
+    results: List[Optional[Dict[str, Any]]] = [None] * len(arguments)
+
+    logger.info(
+        "相似度搜索 开始 mode=%s class=%s 查询数=%d 每请求=%d",
+        mode, request.className, len(arguments), chunk_size,
+    )
+
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            key = cluster_key(request.scheme, request.address, request.apiKey)
+            selection = await _fetch_class_selection(client, base_url, schema_headers, key, request.className)
+            properties_selection = _project_properties(request.properties, selection)
+            additional_fields = f"id {score_field}"
+            if request.includeVector:
+                additional_fields += " vector"
+            selection_body = f"_additional {{ {additional_fields} }} {properties_selection}".strip()
+
+            where_literal = _build_graphql_where(request.filters or [], _normalize_logic(request.logic))
+            where_fragment = f", where: {where_literal}" if where_literal else ""
+
+            async def run_chunk(start: int, chunk: List[str]) -> float:
+                aliases = [
+                    f"q{start + i}: {request.className}({argument}, limit: {request.limit}{where_fragment}) "
+                    f"{{ {selection_body} }}"
+                    for i, argument in enumerate(chunk)
+                ]
+                query = "{ Get { " + " ".join(aliases) + " } }"
+                indexes = range(start, start + len(chunk))
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        with timed("graphql"):
+                            resp = await client.post(graphql_url, headers=headers, json={"query": query},
+                                                     timeout=OBJECTS_QUERY_TIMEOUT)
+                        took_ms = (time.perf_counter() - started) * 1000
+                    except httpx.TimeoutException:
+                        took_ms = (time.perf_counter() - started) * 1000
+                        for idx in indexes:
+                            results[idx] = {"index": idx, "tookMs": round(took_ms, 3), "objects": [], "error": "查询超时"}
+                        return took_ms
+                    except httpx.HTTPError as e:
+                        took_ms = (time.perf_counter() - started) * 1000
+                        for idx in indexes:
+                            results[idx] = {"index": idx, "tookMs": round(took_ms, 3), "objects": [],
+                                            "error": f"连接失败: {str(e)}"}
+                        return took_ms
+
+                with timed("parse"):
+                    body = resp.json() if resp.status_code == 200 else {}
+                get_data = ((body.get("data") or {}).get("Get") or {}) if isinstance(body, dict) else {}
+                alias_errors: Dict[str, str] = {}
+                general_error = None if resp.status_code == 200 else _search_status_message(resp.status_code)
+                for err in (body.get("errors") or []) if isinstance(body, dict) else []:
+                    if not isinstance(err, dict):
+                        continue
+                    path = err.get("path") or []
+                    if len(path) >= 2:
+                        alias_errors.setdefault(str(path[1]), err.get("message", ""))
+                    else:
+                        general_error = general_error or err.get("message", "")
+                for idx in indexes:
+                    alias = f"q{idx}"
+                    raw_objects = get_data.get(alias)
+                    with timed("format"):
+                        formatted = _format_search_objects(raw_objects, request.includeVector, False, (score_field,))
+                    result: Dict[str, Any] = {"index": idx, "tookMs": round(took_ms, 3), "objects": formatted}
+                    if raw_objects is None:
+                        result["error"] = alias_errors.get(alias) or general_error or "未返回结果"
+                    results[idx] = result
+                return took_ms
+
+            started = time.perf_counter()
+            chunks = [(i, arguments[i:i + chunk_size]) for i in range(0, len(arguments), chunk_size)]
+            request_times = await asyncio.gather(*(run_chunk(start, chunk) for start, chunk in chunks))
+            total_ms = (time.perf_counter() - started) * 1000
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("相似度搜索异常 mode=%s class=%s 错误=%s", mode, request.className, str(e))
         return Response(success=False, message=f"查询异常: {str(e)}")
+
+    failed = sum(1 for r in results if r and r.get("error"))
+    logger.info(
+        "相似度搜索 完成 mode=%s class=%s 查询数=%d 失败=%d 耗时=%.1fms",
+        mode, request.className, len(arguments), failed, total_ms,
+    )
+    return EnvelopeResponse(
+        success=failed < len(results),
+        message="查询对象成功" if not failed else f"查询完成，{failed} 个查询失败",
+        data={
+            "mode": mode,
+            "className": request.className,
+            "scoreField": score_field,
+            "results": results,
+            "timing": {
+                "totalMs": round(total_ms, 3),
+                "requests": len(chunks),
+                "queriesPerRequest": chunk_size,
+                "requestMs": summarize_latencies(request_times),
+            },
+        },
+    )
+
+
+@router.post("/near-vector", response_model=Response)
+async def near_vector_search(request: SimilaritySearchRequest) -> Response:
+    """向量相似度搜索（nearVector）。
+
+    `vectors` 中的每个向量作为一个查询，多个查询合并为多别名 GraphQL 文档并有限并发执行；
+    每个结果包含 `distance` 与所在请求的耗时 `tookMs`（`queriesPerRequest=1` 时即单个查询的延迟）。
+    """
+    return await _run_similarity("nearVector", request)
+
+
+@router.post("/near-text", response_model=Response)
+async def near_text_search(request: SimilaritySearchRequest) -> Response:
+    """文本语义搜索（nearText，需要 class 配置了向量化模块），`queries` 中每条文本为一个查询"""
+    return await _run_similarity("nearText", request)
+
+
+@router.post("/bm25", response_model=Response)
+async def bm25_search(request: SimilaritySearchRequest) -> Response:
+    """关键词搜索（bm25），`queries` 中每条文本为一个查询，结果包含 `score`"""
+    return await _run_similarity("bm25", request)
+
+
+@router.post("/hybrid", response_model=Response)
+async def hybrid_search(request: SimilaritySearchRequest) -> Response:
+    """混合搜索（hybrid），`queries` 为查询文本，可选 `vectors` 与之一一对应，`alpha` 为向量检索权重"""
+    return await _run_similarity("hybrid", request)
+
+
+@router.post("/vector-stats", response_model=Response)
+async def vector_stats(request: VectorStatsRequest) -> Response:
+    """抽样统计 class 的向量健康状况。
+
+    沿 /v1/objects 游标逐页扫描（可用 `maxObjects` 限制扫描量），对向量做蓄水池抽样，
+    样本保存在预分配的 float32 数组中，内存只与 `sampleSize` 有关。返回：
+    - 扫描信息：扫描对象数、缺失向量数、维度不一致数、零向量数
+    - 样本统计：范数直方图、逐维均值/方差、方差接近 0 的“塌缩”维度
+    - 二维散点（PCA 或随机投影），供前端绘图
+    """
+    sample_size = min(
+        request.sampleSize or VECTOR_STATS_CONFIG["DEFAULT_SAMPLE_SIZE"],
+        VECTOR_STATS_CONFIG["MAX_SAMPLE_SIZE"],
+    )
+    page_size = request.pageSize or VECTOR_STATS_CONFIG["PAGE_SIZE"]
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    objects_url = f"{base_url}/v1/objects"
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    logger.info(
+        "向量统计 开始 id=%s class=%s sampleSize=%d maxObjects=%s",
+        request.id, request.className, sample_size, request.maxObjects,
+    )
+
+    # 依赖 numpy，首次使用时再导入以缩短启动时间
+    from utils.vector_stats import VectorReservoir, compute_vector_stats
+
+    reservoir = VectorReservoir(sample_size, seed=request.seed)
+    scanned = 0
+    started = time.perf_counter()
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            after: Optional[str] = None
+            while request.maxObjects is None or scanned < request.maxObjects:
+                limit = page_size if request.maxObjects is None else min(page_size, request.maxObjects - scanned)
+                page = await _fetch_objects_page(
+                    client, objects_url, headers, request.className, limit, after, True,
+                )
+                if not page:
+                    break
+                reservoir.add_page(page)
+                scanned += len(page)
+                after = page[-1].get("id") if isinstance(page[-1], dict) else None
+                if len(page) < limit or not after:
+                    break
+    except UpstreamStatusError as e:
+        return Response(success=False, message=e.message)
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("向量统计异常 id=%s class=%s 错误=%s", request.id, request.className, str(e))
+        return Response(success=False, message=f"统计异常: {str(e)}")
+    scan_ms = (time.perf_counter() - started) * 1000
+
+    if reservoir.count == 0:
+        return Response(success=False, message="未找到包含向量的对象")
+
+    # 矩阵运算在线程池中执行，避免阻塞事件循环
+    started = time.perf_counter()
+    stats = await asyncio.to_thread(
+        compute_vector_stats,
+        reservoir.sample(),
+        reservoir.sample_ids(),
+        request.bins,
+        request.projection,
+        request.seed,
+    )
+    compute_ms = (time.perf_counter() - started) * 1000
+
+    logger.info(
+        "向量统计 完成 id=%s class=%s 扫描=%d 样本=%d 维度=%d 扫描耗时=%.1fms 计算耗时=%.1fms",
+        request.id, request.className, scanned, reservoir.count, reservoir.dimension, scan_ms, compute_ms,
+    )
+    return Response(
+        success=True,
+        message="统计成功",
+        data={
+            "className": request.className,
+            "scan": {
+                "scanned": scanned,
+                "withVector": reservoir.seen,
+                "missingVector": reservoir.missing,
+                "dimensionMismatch": reservoir.mismatched,
+                "zeroVectors": reservoir.zero_vectors,
+            },
+            "sample": stats,
+            "timing": {"scanMs": round(scan_ms, 3), "computeMs": round(compute_ms, 3)},
+        },
+    )
+
+
+async def _recall_benchmark_stream(request: RecallBenchmarkRequest) -> AsyncIterator[bytes]:
+    # 依赖 numpy，首次使用时再导入以缩短启动时间
+    from utils.recall_benchmark import RecallBenchmark
+
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+        benchmark = RecallBenchmark(
+            client,
+            base_url,
+            headers,
+            request.className,
+            k=request.k,
+            query_count=min(
+                request.queryCount or RECALL_BENCHMARK_CONFIG["DEFAULT_QUERIES"],
+                RECALL_BENCHMARK_CONFIG["MAX_QUERIES"],
+            ),
+            queries=request.queries[:RECALL_BENCHMARK_CONFIG["MAX_QUERIES"]] if request.queries else None,
+            block_size=RECALL_BENCHMARK_CONFIG["BLOCK_SIZE"],
+            page_size=RECALL_BENCHMARK_CONFIG["PAGE_SIZE"],
+            concurrency=request.concurrency or RECALL_BENCHMARK_CONFIG["CONCURRENCY"],
+            timeout=OBJECTS_QUERY_TIMEOUT,
+            seed=request.seed,
+        )
+        async for event in benchmark.run():
+            if event["event"] == "done":
+                logger.info(
+                    "召回率基准 完成 id=%s class=%s k=%d 查询数=%d recall=%.4f p50=%.1fms",
+                    request.id, request.className, request.k, event["queries"],
+                    event["recall"]["mean"], event["latencyMs"]["p50"],
+                )
+            yield _encode_ndjson([event])
+
+
+@router.post("/recall-benchmark")
+async def recall_benchmark(request: RecallBenchmarkRequest):
+    """HNSW 召回率基准测试，以 NDJSON 流输出进度。
+
+    从 class 中抽样查询向量（或使用 `queries`），分块扫描全部向量用 NumPy 计算精确 top-k，
+    再与 nearVector 返回的结果对比，最后一行为 `{"event": "done", "recall": {...}, "latencyMs": {...}}`，
+    失败时为 `{"event": "error", "message": ...}`。
+    """
+    logger.info(
+        "召回率基准 开始 id=%s name=%s class=%s k=%d queryCount=%s",
+        request.id, request.name, request.className, request.k, request.queryCount,
+    )
+    return StreamingResponse(_recall_benchmark_stream(request), media_type="application/x-ndjson")
+
+
+@router.get("/cache/stats", response_model=Response)
+async def cache_stats() -> Response:
+    """查询搜索结果、schema、class 对象数量缓存的命中/未命中等统计，便于调优缓存参数"""
+    return Response(
+        success=True,
+        message="查询成功",
+        data={
+            "search": search_result_cache.stats(),
+            "schema": schema_cache.stats(),
+            "classCounts": class_count_cache.stats(),
+        },
+    )
@@ -1,24 +1,36 @@
+import asyncio
 import logging
-from typing import Dict
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from fastapi import APIRouter
 from models.base import Response
-from models.connect_model import Connections, ClassSchemaRequest
-from config.business_setting import TIMEOUT_CONFIG
+from models.connect_model import (
+    ClassSchemaRequest,
+    SchemaInvalidateRequest,
+    SchemaQueryRequest,
+    SchemaStatsRequest,
+)
+from config.business_setting import TIMEOUT_CONFIG, SCHEMA_STATS_CONFIG
+from utils.http_client import client_registry, cluster_key
+from utils.fast_json import EnvelopeResponse
+from utils.passthrough import open_upstream_stream, passthrough_enabled, passthrough_response
+from utils.schema_cache import GRAPHQL_NAME, schema_cache, class_count_cache
+from utils.timing import TimedRoute, timed
 
 SCHEMA_QUERY_TIMEOUT = TIMEOUT_CONFIG["SCHEMA_QUERY_TIMEOUT"]
 
 logger = logging.getLogger(__name__)
-router = APIRouter(prefix="/schema", tags=["schema"])
+router = APIRouter(prefix="/schema", tags=["schema"], route_class=TimedRoute)
 
 
 @router.post("/query", response_model=Response)
-async def query_schema(request: Connections) -> Response:
+async def query_schema(request: SchemaQueryRequest) -> Response:
     """查询 Weaviate 中的 schema。
 
     根据传入的连接配置（id、name、scheme、address、apiKey）查询 Weaviate 的 schema。
-    调用 Weaviate 的 /v1/schema 端点获取 schema 信息。
+    调用 Weaviate 的 /v1/schema 端点获取 schema 信息，结果按集群缓存（见 `SCHEMA_CACHE_CONFIG`）。
+    开启 `passthrough` 时未命中缓存的请求直接流式透传上游响应体，此时不写入缓存。
     """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
     schema_url = f"{base_url}/v1/schema"
@@ -28,20 +40,41 @@ async def query_schema(request: Connections) -> Response:
         request.id, request.name, schema_url, SCHEMA_QUERY_TIMEOUT,
     )
 
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+    cached = schema_cache.get_full(key)
+    if cached is not None:
+        logger.info("查询 schema 命中缓存 id=%s name=%s", request.id, request.name)
+        return EnvelopeResponse(
+            success=True,
+            message="查询 schema 成功",
+            data={
+                "id": request.id,
+                "name": request.name,
+                "address": f"{request.scheme}://{request.address}",
+                "schema": cached,
+            }
+        )
+
     headers: Dict[str, str] = {}
     if request.apiKey:
         headers["Authorization"] = f"Bearer {request.apiKey}"
 
+    if passthrough_enabled(request.passthrough):
+        return await _query_schema_passthrough(request, schema_url, headers)
+
     try:
-        async with httpx.AsyncClient(timeout=SCHEMA_QUERY_TIMEOUT) as client:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             try:
-                schema_resp = await client.get(schema_url, headers=headers)
+                with timed("schema"):
+                    schema_resp = await client.get(schema_url, headers=headers, timeout=SCHEMA_QUERY_TIMEOUT)
                 
                 if schema_resp.status_code == 200:
                     try:
-                        schema_data = schema_resp.json()
+                        with timed("parse"):
+                            schema_data = schema_resp.json()
+                        schema_cache.set_full(key, schema_data, len(schema_resp.content))
                         logger.info("查询 schema 成功 id=%s name=%s", request.id, request.name)
-                        return Response(
+                        return EnvelopeResponse(
                             success=True,
                             message="查询 schema 成功",
                             data={
@@ -98,11 +131,52 @@ async def query_schema(request: Connections) -> Response:
         )
 
 
+async def _query_schema_passthrough(request: SchemaQueryRequest, schema_url: str, headers: Dict[str, str]):
+    """透传模式的 /schema/query：上游 200 时把响应体原样作为 `data.schema` 流式返回"""
+    try:
+        with timed("schema"):
+            stack, upstream = await open_upstream_stream(
+                request.scheme, request.address, request.apiKey, schema_url,
+                headers=headers, timeout=SCHEMA_QUERY_TIMEOUT,
+            )
+    except httpx.TimeoutException:
+        logger.error("查询 schema 超时 id=%s url=%s 超时时间=%ss", request.id, schema_url, SCHEMA_QUERY_TIMEOUT)
+        return Response(success=False, message="查询超时，请检查网络连接或增加超时时间")
+    except httpx.ConnectError as e:
+        logger.error("查询 schema 连接错误 id=%s url=%s 错误=%s", request.id, schema_url, str(e))
+        return Response(success=False, message="无法连接到服务器，请检查地址和网络")
+    except Exception as e:
+        logger.exception("查询 schema 出现未预期异常 id=%s 错误=%s", request.id, str(e))
+        return Response(success=False, message=f"查询异常: {str(e)}")
+
+    if upstream.status_code != 200:
+        await stack.aclose()
+        logger.error("查询 schema 失败 状态码=%s id=%s url=%s", upstream.status_code, request.id, schema_url)
+        if upstream.status_code == 401:
+            return Response(success=False, message="查询失败: 未授权，请检查 API Key")
+        if upstream.status_code == 404:
+            return Response(success=False, message="查询失败: Schema 端点不存在")
+        return Response(success=False, message=f"查询失败: HTTP {upstream.status_code}")
+
+    logger.info("查询 schema 透传 id=%s name=%s", request.id, request.name)
+    return passthrough_response(
+        stack,
+        upstream,
+        "查询 schema 成功",
+        {
+            "id": request.id,
+            "name": request.name,
+            "address": f"{request.scheme}://{request.address}",
+        },
+        "schema",
+    )
+
+
 @router.post("/class", response_model=Response)
 async def query_class_schema(request: ClassSchemaRequest) -> Response:
     """根据 className 查询单个 class 的 schema 配置。
 
-    Weaviate 支持 GET /v1/schema/{className} 获取单个类配置。
+    Weaviate 支持 GET /v1/schema/{className} 获取单个类配置；已缓存完整 schema 时直接从中取出。
     """
     base_url = f"{request.scheme}://{request.address}".rstrip("/")
     class_name = request.className
@@ -113,17 +187,36 @@ async def query_class_schema(request: ClassSchemaRequest) -> Response:
         request.id, request.name, class_name, schema_url, SCHEMA_QUERY_TIMEOUT,
     )
 
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+    cached = schema_cache.get_class(key, class_name)
+    if cached is not None:
+        logger.info("查询 class schema 命中缓存 id=%s class=%s", request.id, class_name)
+        return Response(
+            success=True,
+            message="查询 class schema 成功",
+            data={
+                "id": request.id,
+                "name": request.name,
+                "address": f"{request.scheme}://{request.address}",
+                "className": class_name,
+                "schema": cached,
+            },
+        )
+
     headers: Dict[str, str] = {}
     if request.apiKey:
         headers["Authorization"] = f"Bearer {request.apiKey}"
 
     try:
-        async with httpx.AsyncClient(timeout=SCHEMA_QUERY_TIMEOUT) as client:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
             try:
-                resp = await client.get(schema_url, headers=headers)
+                with timed("schema"):
+                    resp = await client.get(schema_url, headers=headers, timeout=SCHEMA_QUERY_TIMEOUT)
                 if resp.status_code == 200:
                     try:
-                        class_schema = resp.json()
+                        with timed("parse"):
+                            class_schema = resp.json()
+                        schema_cache.set_class(key, class_name, class_schema, len(resp.content))
                         logger.info("查询 class schema 成功 id=%s class=%s", request.id, class_name)
                         return Response(
                             success=True,
@@ -153,3 +246,150 @@ async def query_class_schema(request: ClassSchemaRequest) -> Response:
         logger.exception("查询 class schema 出现未预期异常 id=%s class=%s 错误=%s", request.id, class_name, str(e))
         return Response(success=False, message=f"查询异常: {str(e)}")
 
+
+@router.post("/invalidate", response_model=Response)
+async def invalidate_schema_cache(request: SchemaInvalidateRequest) -> Response:
+    """失效指定集群的 schema 缓存。
+
+    传入 className 时只失效该 class（以及完整 schema），否则失效该集群的全部 schema 缓存。
+    """
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+    removed = schema_cache.invalidate(key, request.className)
+    return Response(success=True, message="缓存已失效", data={"removed": removed})
+
+
+async def _aggregate_counts(
+    client: httpx.AsyncClient,
+    graphql_url: str,
+    headers: Dict[str, str],
+    class_names: List[str],
+) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """用一个 GraphQL Aggregate 文档统计多个 class 的对象数量，返回 (数量, 错误)"""
+    selections = " ".join(f"{name} {{ meta {{ count }} }}" for name in class_names)
+    query = f"{{ Aggregate {{ {selections} }} }}"
+    counts: Dict[str, int] = {}
+    errors: Dict[str, str] = {}
+    try:
+        resp = await client.post(graphql_url, headers=headers, json={"query": query}, timeout=SCHEMA_QUERY_TIMEOUT)
+    except httpx.TimeoutException:
+        return counts, {name: "查询超时" for name in class_names}
+    except httpx.HTTPError as e:
+        return counts, {name: f"连接失败: {str(e)}" for name in class_names}
+    if resp.status_code != 200:
+        return counts, {name: f"查询失败: HTTP {resp.status_code}" for name in class_names}
+
+    try:
+        body = resp.json()
+    except ValueError as e:
+        return counts, {name: f"解析响应失败: {str(e)}" for name in class_names}
+    aggregate = ((body.get("data") or {}).get("Aggregate") or {}) if isinstance(body, dict) else {}
+    for name in class_names:
+        items = aggregate.get(name)
+        meta = items[0].get("meta") if isinstance(items, list) and items and isinstance(items[0], dict) else None
+        if isinstance(meta, dict) and isinstance(meta.get("count"), int):
+            counts[name] = meta["count"]
+    if len(counts) < len(class_names):
+        gql_errors = body.get("errors") if isinstance(body, dict) else None
+        message = "未返回统计结果"
+        if isinstance(gql_errors, list) and gql_errors and isinstance(gql_errors[0], dict):
+            message = gql_errors[0].get("message") or message
+        for name in class_names:
+            if name not in counts:
+                errors[name] = message
+    return counts, errors
+
+
+async def _list_class_names(
+    client: httpx.AsyncClient,
+    base_url: str,
+    headers: Dict[str, str],
+    key: Any,
+) -> Optional[List[str]]:
+    """从（缓存的）完整 schema 中取出全部 class 名称，失败时返回 None"""
+    schema = schema_cache.get_full(key)
+    if schema is None:
+        resp = await client.get(f"{base_url}/v1/schema", headers=headers, timeout=SCHEMA_QUERY_TIMEOUT)
+        if resp.status_code != 200:
+            return None
+        schema = resp.json()
+        schema_cache.set_full(key, schema, len(resp.content))
+    classes = schema.get("classes") if isinstance(schema, dict) else None
+    return [c["class"] for c in classes or [] if isinstance(c, dict) and c.get("class")]
+
+
+@router.post("/stats", response_model=Response)
+async def query_schema_stats(request: SchemaStatsRequest) -> Response:
+    """统计各 class 的对象数量。
+
+    未命中缓存的 class 按 `SCHEMA_STATS_CONFIG['CLASSES_PER_QUERY']` 个一组合并为一个
+    `Aggregate { <Class> { meta { count } } ... }` 文档，多组之间有限并发执行；
+    结果按集群缓存 `SCHEMA_STATS_CONFIG['TTL']` 秒，导入/删除数据后自动失效。
+    """
+    base_url = f"{request.scheme}://{request.address}".rstrip("/")
+    graphql_url = f"{base_url}/v1/graphql"
+
+    headers: Dict[str, str] = {}
+    if request.apiKey:
+        headers["Authorization"] = f"Bearer {request.apiKey}"
+
+    key = cluster_key(request.scheme, request.address, request.apiKey)
+
+    try:
+        async with client_registry.acquire(request.scheme, request.address, request.apiKey) as client:
+            class_names = request.classNames
+            if class_names is None:
+                class_names = await _list_class_names(client, base_url, headers, key)
+                if class_names is None:
+                    return Response(success=False, message="查询失败: 无法获取 schema")
+
+            counts: Dict[str, int] = {}
+            errors: Dict[str, str] = {}
+            missing: List[str] = []
+            for name in dict.fromkeys(class_names):
+                # 名称会直接拼接进 Aggregate 文档，非法名称不发往上游，避免改写查询或拖累同组的其他 class
+                if not isinstance(name, str) or not GRAPHQL_NAME.match(name):
+                    errors[name] = "无效的 class 名称"
+                    continue
+                cached = None if request.refresh else class_count_cache.get(key, name)
+                if cached is None:
+                    missing.append(name)
+                else:
+                    counts[name] = cached
+
+            cache_hits = len(counts)
+            chunk_size = max(1, SCHEMA_STATS_CONFIG["CLASSES_PER_QUERY"])
+            semaphore = asyncio.Semaphore(max(1, SCHEMA_STATS_CONFIG["MAX_CONCURRENCY"]))
+
+            async def run_chunk(chunk: List[str]) -> Tuple[Dict[str, int], Dict[str, str]]:
+                async with semaphore:
+                    return await _aggregate_counts(client, graphql_url, headers, chunk)
+
+            chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+            for chunk_counts, chunk_errors in await asyncio.gather(*(run_chunk(c) for c in chunks)):
+                for name, count in chunk_counts.items():
+                    class_count_cache.set(key, name, count)
+                counts.update(chunk_counts)
+                errors.update(chunk_errors)
+
+            logger.info(
+                "统计 class 对象数量 id=%s 总数=%d 缓存命中=%d 查询=%d 失败=%d",
+                request.id, len(class_names), cache_hits, len(missing), len(errors),
+            )
+            return Response(
+                success=True,
+                message="查询统计成功",
+                data={
+                    "id": request.id,
+                    "name": request.name,
+                    "address": f"{request.scheme}://{request.address}",
+                    "counts": counts,
+                    "errors": errors,
+                },
+            )
+    except httpx.TimeoutException:
+        return Response(success=False, message="查询超时，请稍后重试")
+    except httpx.ConnectError as e:
+        return Response(success=False, message=f"连接失败: {str(e)}")
+    except Exception as e:
+        logger.exception("统计 class 对象数量出现未预期异常 id=%s 错误=%s", request.id, str(e))
+        return Response(success=False, message=f"查询异常: {str(e)}")
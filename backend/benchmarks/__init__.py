@@ -0,0 +1 @@
+# 后端性能基准：进程内假 Weaviate、合成数据生成与压测运行器
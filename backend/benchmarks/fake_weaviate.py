@@ -0,0 +1,495 @@
+import asyncio
+import bisect
+import fnmatch
+import json
+import re
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.synthetic import SyntheticClass
+
+# GraphQL 字段：`[alias:] Name`
+_FIELD = re.compile(r"\s*(?:([_A-Za-z]\w*)\s*:\s*)?([_A-Za-z]\w*)\s*")
+_INT_ARG = r"\b{name}\s*:\s*(\d+)"
+_STRING = r'"(?:[^"\\]|\\.)*"'
+
+
+def _match_bracket(text: str, pos: int) -> int:
+    """返回与 text[pos] 处括号匹配的右括号之后的位置（跳过字符串字面量）"""
+    pairs = {"{": "}", "(": ")", "[": "]"}
+    stack = [pairs[text[pos]]]
+    i = pos + 1
+    while i < len(text) and stack:
+        ch = text[i]
+        if ch == '"':
+            i += 1
+            while i < len(text) and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+        elif ch in pairs:
+            stack.append(pairs[ch])
+        elif ch == stack[-1]:
+            stack.pop()
+        i += 1
+    return i
+
+
+def _parse_fields(text: str) -> List[Tuple[str, str, str, Optional[str]]]:
+    """解析一层 GraphQL 选择集，返回 [(别名, 字段名, 参数文本, 子选择集文本)]"""
+    fields = []
+    pos = 0
+    while pos < len(text):
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text):
+            break
+        m = _FIELD.match(text, pos)
+        if not m or m.end() == pos:
+            break
+        alias, name = m.group(1), m.group(2)
+        pos = m.end()
+        args = ""
+        if pos < len(text) and text[pos] == "(":
+            end = _match_bracket(text, pos)
+            args, pos = text[pos + 1:end - 1], end
+            while pos < len(text) and text[pos] in " \t\r\n":
+                pos += 1
+        selection = None
+        if pos < len(text) and text[pos] == "{":
+            end = _match_bracket(text, pos)
+            selection, pos = text[pos + 1:end - 1], end
+        fields.append((alias or name, name, args, selection))
+    return fields
+
+
+def _int_arg(args: str, name: str) -> Optional[int]:
+    m = re.search(_INT_ARG.format(name=name), args)
+    return int(m.group(1)) if m else None
+
+
+def _operator_arg(args: str, operator: str) -> Optional[str]:
+    """提取 `operator: { ... }` 的对象文本"""
+    m = re.search(rf"\b{operator}\s*:\s*\{{", args)
+    if not m:
+        return None
+    start = m.end() - 1
+    return args[start + 1:_match_bracket(args, start) - 1]
+
+
+def _vector_arg(text: str) -> Optional[np.ndarray]:
+    m = re.search(r"\bvector\s*:\s*(\[[^\]]*\])", text)
+    return np.asarray(json.loads(m.group(1)), dtype=np.float32) if m else None
+
+
+def _string_arg(text: str, name: str) -> Optional[str]:
+    m = re.search(rf"\b{name}\s*:\s*({_STRING})", text)
+    return json.loads(m.group(1)) if m else None
+
+
+def _float_arg(text: str, name: str) -> Optional[float]:
+    m = re.search(rf"\b{name}\s*:\s*(-?[0-9.eE+-]+)", text)
+    return float(m.group(1)) if m else None
+
+
+def _sort_arg(args: str) -> Optional[List[Dict[str, Any]]]:
+    """提取 `sort: [{ path: [...] order: asc }, ...]`（也接受单个对象）"""
+    m = re.search(r"\bsort\s*:\s*([\[{])", args)
+    if not m:
+        return None
+    start = m.start(1)
+    sort = _graphql_literal(args[start:_match_bracket(args, start)])
+    return sort if isinstance(sort, list) else [sort]
+
+
+def _sort_key(sort: List[Dict[str, Any]], obj: Dict[str, Any]) -> Tuple:
+    """只支持升序；`_id`/`_creationTimeUnix`/`_lastUpdateTimeUnix` 读取对象元数据，其余读取属性"""
+    key = []
+    for clause in sort:
+        if clause.get("order", "asc") != "asc":
+            raise ValueError("fake sort only supports order: asc")
+        name = (clause.get("path") or [None])[-1]
+        if name in ("_id", "_creationTimeUnix", "_lastUpdateTimeUnix"):
+            value = obj.get(name[1:])
+        else:
+            value = (obj.get("properties") or {}).get(name)
+        key.append((value is None, value if value is not None else 0))
+    return tuple(key)
+
+
+_LITERAL_TOKEN = re.compile(rf'\s*(?:({_STRING})|([{{}}\[\]:,])|([_A-Za-z]\w*)|(-?[0-9][0-9.eE+-]*))')
+
+
+def _graphql_literal(text: str) -> Any:
+    """把 GraphQL 输入对象字面量（如 where 参数）转换为 JSON 结构，枚举值转为字符串"""
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        m = _LITERAL_TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            if text[pos:].strip():
+                raise ValueError(f"invalid literal near: {text[pos:pos + 20]}")
+            break
+        tokens.append(m.groups())
+        pos = m.end()
+    out: List[str] = []
+    previous_ends_value = False
+    for i, (string, punct, name, number) in enumerate(tokens):
+        starts_value = punct is None or punct in "{["
+        if previous_ends_value and starts_value:
+            out.append(",")
+        if string is not None:
+            out.append(string)
+        elif number is not None:
+            out.append(number)
+        elif name is not None:
+            is_key = i + 1 < len(tokens) and tokens[i + 1][1] == ":"
+            out.append(name if not is_key and name in ("true", "false", "null") else json.dumps(name))
+        else:
+            out.append(punct)
+        previous_ends_value = punct is None or punct in "}]"
+    return json.loads("".join(out))
+
+
+def _where_matches(where: Dict[str, Any], obj: Dict[str, Any]) -> bool:
+    """按 Weaviate where 语义（子集）判断对象是否匹配"""
+    operator = where.get("operator")
+    operands = where.get("operands") or []
+    if operator == "And":
+        return all(_where_matches(o, obj) for o in operands)
+    if operator == "Or":
+        return any(_where_matches(o, obj) for o in operands)
+    if operator == "Not":
+        return not _where_matches(operands[0], obj) if operands else True
+    path = where.get("path") or []
+    name = path[-1] if path else None
+    value = obj.get("id") if name == "id" else (obj.get("properties") or {}).get(name)
+    expected = next((v for k, v in where.items() if k.startswith("value")), None)
+    if operator == "Equal":
+        return value == expected
+    if operator == "NotEqual":
+        return value != expected
+    if operator == "Like":
+        return isinstance(value, str) and fnmatch.fnmatchcase(value, str(expected))
+    if operator in ("ContainsAny", "ContainsAll"):
+        wanted = expected if isinstance(expected, list) else [expected]
+        present = value if isinstance(value, list) else [value]
+        check = any if operator == "ContainsAny" else all
+        return check(item in present for item in wanted)
+    raise ValueError(f"unsupported where operator {operator}")
+
+
+class FakeWeaviate:
+    """进程内的 Weaviate 替身，数据来自合成 class。
+
+    支持基准测试与本地调试所需的接口子集：
+    - `/v1/.well-known/ready`、`/v1/meta`、`/v1/schema`、`/v1/schema/{class}`
+    - `/v1/objects`（`class`/`limit`/`after`/`offset`/`include=vector`）与 `/v1/objects/{class}/{id}`
+    - `/v1/batch/objects` 批量写入（POST）与按 where 批量删除（DELETE，支持 dryRun，单次最多删除 `delete_limit` 个）
+    - `/v1/graphql`：`Get`（limit、offset、nearVector、bm25、hybrid，多别名）与 `Aggregate { meta { count } }`
+
+    where 支持 Equal/NotEqual/Like/ContainsAny/ContainsAll 与 And/Or/Not，sort 只支持升序；nearVector 为精确计算，可用 `recall_noise` 模拟近似索引的误差。
+    `latency` 为每个请求附加的模拟网络延迟（秒）。
+    """
+
+    def __init__(
+        self,
+        classes: Iterable[SyntheticClass],
+        latency: float = 0.0,
+        recall_noise: float = 0.0,
+        delete_limit: int = 10000,
+    ) -> None:
+        self.classes: Dict[str, SyntheticClass] = {c.name: c for c in classes}
+        self.latency = latency
+        self.recall_noise = recall_noise
+        # 对应 Weaviate 的 QUERY_MAXIMUM_RESULTS：一次批量删除最多处理的对象数
+        self.delete_limit = delete_limit
+        self.requests = 0
+        self._rng = np.random.default_rng(0)
+        self._ids: Dict[str, List[str]] = {name: [o["id"] for o in c.objects] for name, c in self.classes.items()}
+        self.app = self._build_app()
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+
+    # ---- REST ----
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Fake Weaviate")
+
+        @app.get("/v1/.well-known/ready")
+        async def ready():
+            await self._delay()
+            return {}
+
+        @app.get("/v1/.well-known/live")
+        async def live():
+            await self._delay()
+            return {}
+
+        @app.get("/v1/meta")
+        async def meta():
+            await self._delay()
+            return {"hostname": "http://[::]:8080", "version": "1.24.0-fake", "modules": {}}
+
+        @app.get("/v1/schema")
+        async def schema():
+            await self._delay()
+            return {"classes": [c.schema() for c in self.classes.values()]}
+
+        @app.get("/v1/schema/{class_name}")
+        async def class_schema(class_name: str):
+            await self._delay()
+            cls = self.classes.get(class_name)
+            if cls is None:
+                return JSONResponse({"error": [{"message": f"class {class_name} not found"}]}, status_code=404)
+            return cls.schema()
+
+        @app.get("/v1/objects")
+        async def list_objects(request: Request):
+            await self._delay()
+            params = request.query_params
+            cls = self.classes.get(params.get("class", ""))
+            if cls is None:
+                return {"objects": [], "totalResults": 0}
+            limit = int(params.get("limit", 25))
+            if params.get("after"):
+                start = bisect.bisect_right(self._ids[cls.name], params["after"])
+            else:
+                start = int(params.get("offset", 0))
+            include_vector = "vector" in params.get("include", "")
+            page = [self._rest_object(cls, i, include_vector) for i in range(start, min(start + limit, len(cls.objects)))]
+            return {"objects": page, "totalResults": len(page)}
+
+        @app.get("/v1/objects/{class_name}/{object_id}")
+        async def get_object(class_name: str, object_id: str, request: Request):
+            await self._delay()
+            cls = self.classes.get(class_name)
+            idx = cls.index_by_id.get(object_id) if cls is not None else None
+            if idx is None:
+                return JSONResponse({"error": [{"message": "not found"}]}, status_code=404)
+            return self._rest_object(cls, idx, "vector" in request.query_params.get("include", ""))
+
+        @app.post("/v1/batch/objects")
+        async def batch_objects(request: Request):
+            await self._delay()
+            body = await request.json()
+            return [self._upsert(obj) for obj in body.get("objects") or []]
+
+        @app.delete("/v1/batch/objects")
+        async def batch_delete(request: Request):
+            await self._delay()
+            body = await request.json()
+            match = body.get("match") or {}
+            cls = self.classes.get(match.get("class", ""))
+            if cls is None:
+                return JSONResponse({"error": [{"message": f"class {match.get('class')} not found"}]}, status_code=422)
+            if not isinstance(match.get("where"), dict):
+                return JSONResponse({"error": [{"message": "match.where is required"}]}, status_code=422)
+            try:
+                matched = [o["id"] for o in cls.objects if _where_matches(match["where"], o)][:self.delete_limit]
+            except ValueError as e:
+                return JSONResponse({"error": [{"message": str(e)}]}, status_code=422)
+            dry_run = bool(body.get("dryRun"))
+            if not dry_run:
+                self._remove(cls, set(matched))
+            results: Dict[str, Any] = {
+                "matches": len(matched),
+                "limit": self.delete_limit,
+                "successful": 0 if dry_run else len(matched),
+                "failed": 0,
+            }
+            output = body.get("output") or "minimal"
+            if output == "verbose":
+                status = "DRYRUN" if dry_run else "SUCCESS"
+                results["objects"] = [{"id": object_id, "status": status} for object_id in matched]
+            return {"match": match, "output": output, "dryRun": dry_run, "results": results}
+
+        @app.post("/v1/graphql")
+        async def graphql(request: Request):
+            await self._delay()
+            body = await request.json()
+            return self.execute(body.get("query", ""))
+
+        return app
+
+    def _rest_object(self, cls: SyntheticClass, idx: int, include_vector: bool) -> Dict[str, Any]:
+        obj = dict(cls.objects[idx])
+        if include_vector:
+            obj["vector"] = cls.vectors[idx].tolist()
+        return obj
+
+    def _upsert(self, obj: Dict[str, Any]) -> Dict[str, Any]:
+        cls = self.classes.get(obj.get("class", ""))
+        if cls is None:
+            return {**obj, "result": {"errors": {"error": [{"message": f"class {obj.get('class')} not found"}]}}}
+        vector = obj.get("vector")
+        if not isinstance(vector, list) or len(vector) != cls.dimension:
+            vector = self._rng.standard_normal(cls.dimension).tolist()
+        record = {k: v for k, v in obj.items() if k != "vector"}
+        record.setdefault("id", str(uuid.uuid4()))
+        idx = cls.index_by_id.get(record["id"])
+        if idx is not None:
+            cls.objects[idx] = record
+            cls.vectors[idx] = vector
+        else:
+            pos = bisect.bisect_left(self._ids[cls.name], record["id"])
+            self._ids[cls.name].insert(pos, record["id"])
+            cls.objects.insert(pos, record)
+            cls.vectors = np.insert(cls.vectors, pos, np.asarray(vector, dtype=np.float32), axis=0)
+            cls.index_by_id = {o["id"]: i for i, o in enumerate(cls.objects)}
+        return {**record, "result": {}}
+
+    def _remove(self, cls: SyntheticClass, ids: set) -> None:
+        keep = [i for i, o in enumerate(cls.objects) if o["id"] not in ids]
+        cls.objects = [cls.objects[i] for i in keep]
+        cls.vectors = cls.vectors[keep]
+        cls.index_by_id = {o["id"]: i for i, o in enumerate(cls.objects)}
+        self._ids[cls.name] = [o["id"] for o in cls.objects]
+
+    # ---- GraphQL ----
+
+    def execute(self, query: str) -> Dict[str, Any]:
+        query = query.strip()
+        if query.startswith("query"):
+            query = query[query.index("{"):]
+        if not query.startswith("{"):
+            return {"errors": [{"message": "syntax error"}]}
+        root = _parse_fields(query[1:_match_bracket(query, 0) - 1])
+        data: Dict[str, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for _, op, _, selection in root:
+            result: Dict[str, Any] = {}
+            for alias, class_name, args, sub in _parse_fields(selection or ""):
+                try:
+                    if op == "Get":
+                        result[alias] = self._get(class_name, args, sub or "")
+                    elif op == "Aggregate":
+                        result[alias] = self._aggregate(class_name)
+                    else:
+                        raise ValueError(f"unsupported operation {op}")
+                except ValueError as e:
+                    result[alias] = None
+                    errors.append({"message": str(e), "path": [op, alias]})
+            data[op] = result
+        out: Dict[str, Any] = {"data": data}
+        if errors:
+            out["errors"] = errors
+        return out
+
+    def _aggregate(self, class_name: str) -> List[Dict[str, Any]]:
+        cls = self.classes.get(class_name)
+        if cls is None:
+            raise ValueError(f"class {class_name} not found")
+        return [{"meta": {"count": len(cls.objects)}}]
+
+    def _keyword_scores(self, cls: SyntheticClass, text: str, properties: Optional[List[str]]) -> np.ndarray:
+        terms = [t for t in text.lower().split() if t]
+        props = properties or cls.properties
+        scores = np.zeros(len(cls.objects), dtype=np.float32)
+        for idx, obj in enumerate(cls.objects):
+            values = obj.get("properties") or {}
+            haystack = " ".join(str(values.get(p, "")) for p in props).lower()
+            scores[idx] = sum(haystack.count(t) for t in terms)
+        return scores
+
+    def _distances(self, cls: SyntheticClass, vector: np.ndarray) -> np.ndarray:
+        if vector.shape[0] != cls.dimension:
+            raise ValueError(f"vector lengths don't match: {vector.shape[0]} vs {cls.dimension}")
+        scores = cls.vectors @ vector
+        if cls.distance == "dot":
+            return -scores
+        if cls.distance == "l2-squared":
+            return np.einsum("ij,ij->i", cls.vectors, cls.vectors) + float(vector @ vector) - 2 * scores
+        norms = np.linalg.norm(cls.vectors, axis=1) * (np.linalg.norm(vector) or 1.0)
+        norms[norms == 0] = 1.0
+        return 1.0 - scores / norms
+
+    def _get(self, class_name: str, args: str, selection: str) -> List[Dict[str, Any]]:
+        cls = self.classes.get(class_name)
+        if cls is None:
+            raise ValueError(f"class {class_name} not found")
+        limit = _int_arg(args, "limit") or 100
+        offset = _int_arg(args, "offset") or 0
+        distances: Optional[np.ndarray] = None
+        scores: Optional[np.ndarray] = None
+
+        near_vector = _operator_arg(args, "nearVector")
+        bm25 = _operator_arg(args, "bm25")
+        hybrid = _operator_arg(args, "hybrid")
+        if _operator_arg(args, "nearText") is not None:
+            raise ValueError("nearText requires a vectorizer module, but class has vectorizer none")
+        if near_vector is not None:
+            vector = _vector_arg(near_vector)
+            if vector is None:
+                raise ValueError("nearVector requires a vector")
+            distances = self._distances(cls, vector)
+            order = np.argsort(distances, kind="stable")
+            max_distance = _float_arg(near_vector, "distance")
+            if max_distance is not None:
+                order = order[distances[order] <= max_distance]
+            order = order[:offset + limit]
+            if self.recall_noise > 0 and len(order):
+                # 按比例把部分结果替换为随机对象，模拟 HNSW 的召回损失
+                swap = self._rng.random(len(order)) < self.recall_noise
+                order = np.where(swap, self._rng.integers(len(cls.objects), size=len(order)), order)
+        elif bm25 is not None or hybrid is not None:
+            operand = bm25 if bm25 is not None else hybrid
+            props_match = re.search(r"\bproperties\s*:\s*(\[[^\]]*\])", operand)
+            props = json.loads(props_match.group(1)) if props_match else None
+            scores = self._keyword_scores(cls, _string_arg(operand, "query") or "", props)
+            if hybrid is not None:
+                vector = _vector_arg(hybrid)
+                if vector is not None:
+                    alpha = _float_arg(hybrid, "alpha")
+                    alpha = 0.75 if alpha is None else alpha
+                    peak = float(scores.max()) or 1.0
+                    scores = alpha * (1.0 - self._distances(cls, vector)) + (1 - alpha) * scores / peak
+            order = np.argsort(-scores, kind="stable")
+            if bm25 is not None:
+                order = order[scores[order] > 0]
+        else:
+            order = np.arange(len(cls.objects))
+
+        where = _operator_arg(args, "where")
+        if where is not None:
+            condition = _graphql_literal("{" + where + "}")
+            order = np.asarray(
+                [idx for idx in order.tolist() if _where_matches(condition, cls.objects[idx])], dtype=np.int64,
+            )
+
+        sort = _sort_arg(args)
+        if sort:
+            order = np.asarray(sorted(order.tolist(), key=lambda idx: _sort_key(sort, cls.objects[idx])), dtype=np.int64)
+
+        fields = _parse_fields(selection)
+        properties = [name for _, name, _, _ in fields if name != "_additional"]
+        additional = next((sub for _, name, _, sub in fields if name == "_additional"), None)
+        additional_fields = [name for _, name, _, _ in _parse_fields(additional or "")]
+
+        items = []
+        for idx in order[offset:offset + limit].tolist():
+            obj = cls.objects[idx]
+            values = obj.get("properties") or {}
+            item: Dict[str, Any] = {name: values.get(name) for name in properties}
+            if additional is not None:
+                extra: Dict[str, Any] = {}
+                for name in additional_fields:
+                    if name == "id":
+                        extra["id"] = obj["id"]
+                    elif name == "vector":
+                        extra["vector"] = cls.vectors[idx].tolist()
+                    elif name == "distance":
+                        extra["distance"] = float(distances[idx]) if distances is not None else None
+                    elif name == "score":
+                        extra["score"] = str(float(scores[idx])) if scores is not None else None
+                    elif name in ("creationTimeUnix", "lastUpdateTimeUnix"):
+                        extra[name] = str(obj.get(name, ""))
+                item["_additional"] = extra
+            items.append(item)
+        return items
+
@@ -0,0 +1,374 @@
+"""
+后端性能基准运行器
+
+在同一进程内启动假 Weaviate（合成数据）与 Weaviate-King API，两者都通过 httpx.ASGITransport 挂载，
+按不同并发度压测各个路由，统计 p50/p99 延迟、吞吐量与峰值 RSS，结果写入 JSON 便于跟踪性能回归。
+
+用法（在 backend 目录下）：
+    python -m benchmarks.runner --objects 2000 --dim 128 --concurrency 1,8,32 --output bench.json
+    python -m benchmarks.runner --baseline bench.json          # 与上次结果对比
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+# 允许在 backend 目录外以脚本方式运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.fake_weaviate import FakeWeaviate  # noqa: E402
+from benchmarks.synthetic import WORDS, SyntheticClass, generate_classes  # noqa: E402
+from utils.latency import summarize_latencies  # noqa: E402
+
+logger = logging.getLogger("weaviate_king.benchmarks")
+
+# 假 Weaviate 的地址（请求经 ASGITransport 转发，不会真正发起网络连接）
+FAKE_ADDRESS = "weaviate.bench:8080"
+
+
+class Scenario:
+    """一个压测场景：请求路径、请求体生成函数，以及可选的单独请求数"""
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        body: Callable[[int], Dict[str, Any]],
+        stream: bool = False,
+        requests: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.body = body
+        self.stream = stream
+        self.requests = requests
+
+
+class RssSampler:
+    """后台线程定期采样进程 RSS，记录采样期间的峰值（字节）"""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self._interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.start_rss = 0
+        self.peak = 0
+
+    def __enter__(self) -> "RssSampler":
+        self.start_rss = self.peak = current_rss()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, current_rss())
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self._interval):
+            self.peak = max(self.peak, current_rss())
+
+
+def current_rss() -> int:
+    """当前进程常驻内存（字节）；无 /proc 时退化为历史峰值 ru_maxrss"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 单位为字节，Linux 为 KB
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def _mb(value: int) -> float:
+    return round(value / (1024 * 1024), 2)
+
+
+def build_scenarios(classes: List[SyntheticClass], page_size: int = 50) -> List[Scenario]:
+    """为每个路由构造请求体；请求参数随序号变化，避免全部命中结果缓存"""
+    conn = {"id": "bench", "name": "bench", "scheme": "http", "address": FAKE_ADDRESS, "apiKey": ""}
+    size = len(classes[0].objects)
+
+    def cls(i: int) -> SyntheticClass:
+        return classes[i % len(classes)]
+
+    def query_vector(i: int) -> List[float]:
+        c = cls(i)
+        return c.vectors[(i * 7919) % len(c.objects)].tolist()
+
+    def words(i: int) -> str:
+        return f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7) % len(WORDS)]}"
+
+    return [
+        Scenario("connection.test", "/connection/test", lambda i: {
+            "name": "bench", "scheme": "http", "address": FAKE_ADDRESS,
+        }),
+        Scenario("schema.query", "/schema/query", lambda i: dict(conn)),
+        Scenario("schema.class", "/schema/class", lambda i: {**conn, "className": cls(i).name}),
+        Scenario("schema.stats", "/schema/stats", lambda i: {**conn, "refresh": i % 2 == 0}),
+        Scenario("objects.query", "/objects/query", lambda i: {
+            **conn, "className": cls(i).name, "limit": 100,
+        }),
+        Scenario("objects.query.vector", "/objects/query", lambda i: {
+            **conn, "className": cls(i).name, "limit": 100, "includeVector": True, "vectorEncoding": "base64",
+        }),
+        Scenario("objects.query.passthrough", "/objects/query", lambda i: {
+            **conn, "className": cls(i).name, "limit": 100, "includeVector": True, "passthrough": True,
+        }),
+        Scenario("objects.search", "/objects/search", lambda i: {
+            **conn, "className": cls(i).name, "limit": page_size,
+            "offset": (i * page_size) % max(size - page_size, 1),
+        }),
+        Scenario("objects.near-vector", "/objects/near-vector", lambda i: {
+            **conn, "className": cls(i).name, "vectors": [query_vector(i)], "limit": 10,
+        }),
+        Scenario("objects.bm25", "/objects/bm25", lambda i: {
+            **conn, "className": cls(i).name, "queries": [words(i)], "limit": 10,
+        }),
+        Scenario("objects.hybrid", "/objects/hybrid", lambda i: {
+            **conn, "className": cls(i).name, "queries": [words(i)], "vectors": [query_vector(i)],
+            "alpha": 0.5, "limit": 10,
+        }),
+        Scenario("objects.vector-stats", "/objects/vector-stats", lambda i: {
+            **conn, "className": cls(i).name, "sampleSize": 500, "seed": i,
+        }, requests=10),
+        Scenario("objects.export", "/objects/export", lambda i: {
+            **conn, "className": cls(i).name, "pageSize": 500,
+        }, stream=True, requests=10),
+    ]
+
+
+def _response_ok(scenario: Scenario, resp: httpx.Response) -> bool:
+    if resp.status_code != 200:
+        return False
+    if scenario.stream:
+        lines = resp.content.rstrip(b"\n").rsplit(b"\n", 1)
+        try:
+            last = json.loads(lines[-1]) if lines and lines[-1] else {}
+        except ValueError:
+            return False
+        return not (isinstance(last, dict) and (last.get("error") or last.get("event") == "error"))
+    body = resp.json()
+    return not isinstance(body, dict) or body.get("success", True) is not False
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    concurrency: int,
+    requests: int,
+) -> Dict[str, Any]:
+    """以固定并发度发送 `requests` 个请求，返回延迟分布、吞吐量与内存占用"""
+    # 预热一次（建立连接、填充 schema 缓存），不计入统计
+    await client.post(scenario.path, json=scenario.body(0))
+
+    latencies: List[float] = []
+    errors = 0
+    sequence = iter(range(1, requests + 1))
+    response_bytes = 0
+
+    async def worker() -> None:
+        nonlocal errors, response_bytes
+        for i in sequence:
+            started = time.perf_counter()
+            try:
+                resp = await client.post(scenario.path, json=scenario.body(i))
+                ok = _response_ok(scenario, resp)
+                response_bytes += len(resp.content)
+            except Exception as e:
+                logger.warning("请求失败 场景=%s 错误=%s", scenario.name, str(e))
+                ok = False
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not ok:
+                errors += 1
+
+    with RssSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    return {
+        "endpoint": scenario.name,
+        "path": scenario.path,
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "latencyMs": summarize_latencies(latencies),
+        "throughput": round(requests / wall, 2) if wall > 0 else 0.0,
+        "avgResponseBytes": response_bytes // max(requests, 1),
+        "peakRssMb": _mb(rss.peak),
+        "rssDeltaMb": _mb(rss.peak - rss.start_rss),
+    }
+
+
+async def run_recall(fake: FakeWeaviate, class_name: str, k: int, queries: int, seed: int) -> Dict[str, Any]:
+    """对假 Weaviate 运行召回率基准（nearVector 结果按 `recall_noise` 注入误差）"""
+    from utils.recall_benchmark import RecallBenchmark
+
+    base_url = f"http://{FAKE_ADDRESS}"
+    transport = httpx.ASGITransport(app=fake.app)
+    async with httpx.AsyncClient(transport=transport) as client:
+        benchmark = RecallBenchmark(client, base_url, {}, class_name, k=k, query_count=queries, seed=seed)
+        result: Dict[str, Any] = {}
+        async for event in benchmark.run():
+            if event["event"] in ("done", "error"):
+                result = event
+        return result
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    # 在导入应用前隔离数据/日志目录，避免读写真实的 clusters.json
+    workdir = tempfile.mkdtemp(prefix="weaviate-king-bench-")
+    os.environ["DATA_DIR"] = os.path.join(workdir, "data")
+    os.environ["LOG_DIR"] = os.path.join(workdir, "logs")
+    from api.app import app
+    from utils.http_client import client_registry
+
+    logger.info("生成合成数据 classes=%d objects=%d dim=%d", args.classes, args.objects, args.dim)
+    classes = generate_classes(
+        args.classes, args.objects, args.properties, args.property_width, args.dim, seed=args.seed,
+    )
+    fake = FakeWeaviate(classes, latency=args.latency / 1000.0, recall_noise=args.recall_noise)
+
+    scenarios = build_scenarios(classes)
+    if args.scenarios:
+        wanted = set(args.scenarios.split(","))
+        scenarios = [s for s in scenarios if s.name in wanted]
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    results: List[Dict[str, Any]] = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        # 应用内所有集群客户端都转发到假 Weaviate
+        await client_registry.set_transport_factory(lambda: httpx.ASGITransport(app=fake.app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+            for scenario in scenarios:
+                for concurrency in levels:
+                    requests = scenario.requests or args.requests
+                    result = await run_scenario(client, scenario, concurrency, max(requests, concurrency))
+                    results.append(result)
+                    print(_format_row(result), flush=True)
+
+    recall = None
+    if args.recall_queries > 0:
+        recall = await run_recall(fake, classes[0].name, args.recall_k, args.recall_queries, args.seed)
+        if recall.get("event") == "done":
+            print(
+                f"recall@{recall['k']}: mean={recall['recall']['mean']} min={recall['recall']['min']} "
+                f"p50={recall['latencyMs']['p50']}ms p99={recall['latencyMs']['p99']}ms",
+                flush=True,
+            )
+
+    return {
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "cpuCount": os.cpu_count(),
+        },
+        "config": {
+            "classes": args.classes,
+            "objects": args.objects,
+            "properties": args.properties,
+            "propertyWidth": args.property_width,
+            "dim": args.dim,
+            "concurrency": levels,
+            "requests": args.requests,
+            "upstreamLatencyMs": args.latency,
+            "seed": args.seed,
+        },
+        "results": results,
+        "recall": recall,
+    }
+
+
+def _format_row(result: Dict[str, Any]) -> str:
+    latency = result["latencyMs"]
+    return (
+        f"{result['endpoint']:<24} c={result['concurrency']:<4} n={result['requests']:<5} "
+        f"p50={latency['p50']:>9.2f}ms p99={latency['p99']:>9.2f}ms "
+        f"rps={result['throughput']:>9.2f} err={result['errors']:<3} peakRss={result['peakRssMb']}MB"
+    )
+
+
+def compare_with_baseline(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """按 (endpoint, concurrency) 对比两次结果，返回 p50/p99/吞吐量的变化比例"""
+    previous = {(r["endpoint"], r["concurrency"]): r for r in baseline.get("results", [])}
+    changes = []
+    for result in current["results"]:
+        old = previous.get((result["endpoint"], result["concurrency"]))
+        if old is None:
+            continue
+
+        def ratio(new: float, before: float) -> Optional[float]:
+            return round((new - before) / before, 4) if before else None
+
+        changes.append({
+            "endpoint": result["endpoint"],
+            "concurrency": result["concurrency"],
+            "p50": ratio(result["latencyMs"]["p50"], old["latencyMs"]["p50"]),
+            "p99": ratio(result["latencyMs"]["p99"], old["latencyMs"]["p99"]),
+            "throughput": ratio(result["throughput"], old["throughput"]),
+        })
+    return changes
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Weaviate-King 后端性能基准")
+    parser.add_argument("--classes", type=int, default=2, help="合成 class 数量")
+    parser.add_argument("--objects", type=int, default=2000, help="每个 class 的对象数")
+    parser.add_argument("--properties", type=int, default=4, help="每个对象的属性数")
+    parser.add_argument("--property-width", type=int, default=64, help="每个属性的文本长度（字符）")
+    parser.add_argument("--dim", type=int, default=128, help="向量维度")
+    parser.add_argument("--concurrency", default="1,8,32", help="并发度列表，逗号分隔")
+    parser.add_argument("--requests", type=int, default=200, help="每个场景每个并发度的请求数")
+    parser.add_argument("--scenarios", default="", help="只运行指定场景，逗号分隔（默认全部）")
+    parser.add_argument("--latency", type=float, default=0.0, help="假 Weaviate 每个请求附加的延迟（毫秒）")
+    parser.add_argument("--recall-queries", type=int, default=50, help="召回率基准的查询数，0 表示跳过")
+    parser.add_argument("--recall-k", type=int, default=10, help="召回率基准的 k")
+    parser.add_argument("--recall-noise", type=float, default=0.05, help="假 nearVector 结果被随机替换的比例")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--output", default="benchmark-results.json", help="结果 JSON 文件路径")
+    parser.add_argument("--baseline", default=None, help="用于对比的历史结果 JSON 文件")
+    parser.add_argument("--verbose", action="store_true", help="输出应用 INFO 日志")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s | %(levelname)s | %(name)s | %(message)s",
+    )
+    report = asyncio.run(run_benchmarks(args))
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["baselineComparison"] = compare_with_baseline(report, json.load(f))
+        for change in report["baselineComparison"]:
+            print(
+                f"{change['endpoint']:<24} c={change['concurrency']:<4} "
+                f"p50={change['p50']} p99={change['p99']} throughput={change['throughput']}"
+            )
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
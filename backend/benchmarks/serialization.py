@@ -0,0 +1,114 @@
+"""
+响应序列化微基准
+
+对比同一页对象数据的两种输出路径：
+- model：路由返回 `models.base.Response`，由 FastAPI 按 `response_model` 校验并编码后以 JSONResponse 输出
+- envelope：路由直接返回 `utils.fast_json.EnvelopeResponse`（orjson，跳过逐字段校验）
+
+用法（在 backend 目录下）：
+    python -m benchmarks.serialization --objects 1000 --dim 768 --repeat 20
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+# 允许在 backend 目录外以脚本方式运行
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import generate_class  # noqa: E402
+from models.base import Response  # noqa: E402
+from utils.fast_json import EnvelopeResponse  # noqa: E402
+from utils.latency import summarize_latencies  # noqa: E402
+
+
+def build_page(objects: int, dim: int, property_width: int, seed: int) -> Dict[str, Any]:
+    """构造与 /objects/query 成功响应相同结构的 data（向量为 JSON 浮点数组）"""
+    synthetic = generate_class("Bench", objects, property_width=property_width, vector_dim=dim, seed=seed)
+    page = [
+        {**obj, "vector": vector.tolist()}
+        for obj, vector in zip(synthetic.objects, synthetic.vectors)
+    ]
+    return {
+        "id": "bench",
+        "name": "bench",
+        "address": "http://weaviate.bench:8080",
+        "className": synthetic.name,
+        "result": {"objects": page},
+        "vectorEncoding": "float",
+    }
+
+
+async def _model_path(data: Dict[str, Any]) -> bytes:
+    """与 FastAPI 处理 `response_model=Response` 路由返回值的步骤一致"""
+    field = _RESPONSE_ROUTE.response_field
+    content = await serialize_response(
+        field=field, response_content=Response(success=True, message="查询对象成功", data=data),
+    )
+    return JSONResponse(content).body
+
+
+async def _envelope_path(data: Dict[str, Any]) -> bytes:
+    return EnvelopeResponse(True, "查询对象成功", data).body
+
+
+async def _endpoint() -> Response:
+    return Response(success=True, message="")
+
+
+# 仅用于生成与业务路由相同的 response_field
+_RESPONSE_ROUTE = APIRoute("/bench", _endpoint, response_model=Response)
+
+
+async def _measure(fn: Callable[[Dict[str, Any]], Awaitable[bytes]], data: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    await fn(data)  # 预热
+    times: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = await fn(data)
+        times.append((time.perf_counter() - started) * 1000)
+        size = len(body)
+    return {"bytes": size, "latencyMs": summarize_latencies(times)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    data = build_page(args.objects, args.dim, args.property_width, args.seed)
+    model = await _measure(_model_path, data, args.repeat)
+    envelope = await _measure(_envelope_path, data, args.repeat)
+    speedup = model["latencyMs"]["p50"] / envelope["latencyMs"]["p50"] if envelope["latencyMs"]["p50"] else None
+    return {
+        "objects": args.objects,
+        "dim": args.dim,
+        "model": model,
+        "envelope": envelope,
+        "speedupP50": round(speedup, 2) if speedup else None,
+    }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="响应序列化微基准")
+    parser.add_argument("--objects", type=int, default=1000, help="一页的对象数")
+    parser.add_argument("--dim", type=int, default=768, help="向量维度")
+    parser.add_argument("--property-width", type=int, default=64, help="每个属性的文本长度（字符）")
+    parser.add_argument("--repeat", type=int, default=20, help="每种路径的重复次数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    for name in ("model", "envelope"):
+        latency = report[name]["latencyMs"]
+        print(f"{name:<10} p50={latency['p50']:.2f}ms p99={latency['p99']:.2f}ms size={report[name]['bytes']}")
+    print(f"envelope 相对 model 的 p50 加速比: {report['speedupP50']}x")
+
+
+if __name__ == "__main__":
+    main()
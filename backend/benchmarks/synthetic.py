@@ -0,0 +1,107 @@
+import uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 合成文本使用的词表（bm25 / hybrid 查询也从中取词）
+WORDS = (
+    "vector", "index", "graph", "search", "query", "cluster", "shard", "replica", "tenant", "schema",
+    "object", "property", "filter", "hybrid", "keyword", "distance", "cosine", "neighbor", "layer", "memory",
+)
+
+
+class SyntheticClass:
+    """一个合成 class：schema 定义、对象列表与 float32 向量矩阵（行与对象一一对应）"""
+
+    def __init__(
+        self,
+        name: str,
+        properties: List[str],
+        objects: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        distance: str = "cosine",
+    ) -> None:
+        self.name = name
+        self.properties = properties
+        self.objects = objects
+        self.vectors = vectors
+        self.distance = distance
+        self.index_by_id = {obj["id"]: idx for idx, obj in enumerate(objects)}
+
+    @property
+    def dimension(self) -> int:
+        return int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0
+
+    def schema(self) -> Dict[str, Any]:
+        """与 Weaviate /v1/schema/{className} 返回格式一致的 class 定义"""
+        return {
+            "class": self.name,
+            "vectorizer": "none",
+            "properties": [{"name": name, "dataType": ["text"]} for name in self.properties],
+            "vectorIndexType": "hnsw",
+            "vectorIndexConfig": {
+                "distance": self.distance,
+                "ef": -1,
+                "efConstruction": 128,
+                "maxConnections": 32,
+            },
+        }
+
+
+def _text(rng: np.random.Generator, width: int) -> str:
+    """生成约 `width` 个字符的随机文本"""
+    words: List[str] = []
+    length = 0
+    while length < width:
+        word = WORDS[int(rng.integers(len(WORDS)))]
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:width]
+
+
+def generate_class(
+    name: str,
+    object_count: int,
+    property_count: int = 4,
+    property_width: int = 64,
+    vector_dim: int = 128,
+    distance: str = "cosine",
+    seed: Optional[int] = None,
+) -> SyntheticClass:
+    """生成一个合成 class。
+
+    向量为标准正态分布的 float32（可复现，取决于 `seed`），对象 id 由 seed 与序号确定，
+    按 id 升序排列以匹配 /v1/objects `after` 游标的遍历顺序。
+    """
+    rng = np.random.default_rng(seed)
+    properties = [f"prop{i}" for i in range(property_count)]
+    vectors = rng.standard_normal((object_count, vector_dim)).astype(np.float32)
+    namespace = uuid.UUID(int=seed or 0)
+    objects: List[Dict[str, Any]] = []
+    for idx in range(object_count):
+        objects.append({
+            "class": name,
+            "id": str(uuid.uuid5(namespace, f"{name}-{idx}")),
+            "properties": {prop: _text(rng, property_width) for prop in properties},
+            "creationTimeUnix": 1700000000000 + idx,
+            "lastUpdateTimeUnix": 1700000000000 + idx,
+        })
+    order = sorted(range(object_count), key=lambda i: objects[i]["id"])
+    return SyntheticClass(name, properties, [objects[i] for i in order], vectors[order], distance)
+
+
+def generate_classes(
+    class_count: int,
+    object_count: int,
+    property_count: int = 4,
+    property_width: int = 64,
+    vector_dim: int = 128,
+    seed: int = 0,
+) -> List[SyntheticClass]:
+    """生成 `class_count` 个结构相同的合成 class（Bench0、Bench1 ...）"""
+    return [
+        generate_class(
+            f"Bench{i}", object_count, property_count, property_width, vector_dim, seed=seed + i,
+        )
+        for i in range(class_count)
+    ]
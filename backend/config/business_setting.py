@@ -9,4 +9,222 @@ TIMEOUT_CONFIG = {
     "SCHEMA_QUERY_TIMEOUT": float(os.getenv("SCHEMA_QUERY_TIMEOUT", "30.0")),
     # Objects 查询 HTTP 客户端超时时间（秒）
     "OBJECTS_QUERY_TIMEOUT": float(os.getenv("OBJECTS_QUERY_TIMEOUT", "30.0")),
-}
\ No newline at end of file
+    # 批量写入（/v1/batch/objects）单次请求超时时间（秒）
+    "BATCH_IMPORT_TIMEOUT": float(os.getenv("BATCH_IMPORT_TIMEOUT", "120.0")),
+}
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    """读取布尔型环境变量（1/true/yes/on 视为开启）"""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+# HTTP 客户端连接池配置（按集群复用长连接）
+HTTP_CLIENT_CONFIG = {
+    # 单个集群客户端允许的最大并发连接数
+    "MAX_CONNECTIONS": int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+    # 单个集群客户端保留的最大空闲 keep-alive 连接数
+    "MAX_KEEPALIVE_CONNECTIONS": int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    # 空闲 keep-alive 连接的保留时间（秒）
+    "KEEPALIVE_EXPIRY": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30.0")),
+    # 是否启用 HTTP/2（需要安装 h2，未安装时自动回退到 HTTP/1.1）
+    "HTTP2": _env_flag("HTTP_ENABLE_HTTP2"),
+    # 客户端闲置超过该时间（秒）后被关闭回收
+    "IDLE_CLIENT_TTL": float(os.getenv("HTTP_IDLE_CLIENT_TTL", "300.0")),
+    # 闲置客户端回收任务的执行间隔（秒）
+    "IDLE_REAP_INTERVAL": float(os.getenv("HTTP_IDLE_REAP_INTERVAL", "60.0")),
+}
+
+# 指标采集配置（/metrics）
+METRICS_CONFIG = {
+    # 是否记录 API 路由与上游 Weaviate 调用指标
+    "ENABLED": _env_flag("METRICS_ENABLED", "true"),
+}
+
+# 请求耗时分解与慢查询日志配置
+SLOW_QUERY_CONFIG = {
+    # 是否在响应中返回 Server-Timing 头
+    "SERVER_TIMING": _env_flag("SERVER_TIMING_ENABLED", "true"),
+    # 总耗时超过该值（毫秒）的请求写入慢查询日志
+    "THRESHOLD_MS": float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "1000")),
+    # 环形缓冲区保留的最大条数
+    "CAPACITY": int(os.getenv("SLOW_QUERY_CAPACITY", "200")),
+    # 持久化文件名（位于 STORAGE_CONFIG['LOG_DIR'] 下）
+    "FILE_NAME": os.getenv("SLOW_QUERY_FILE", "slow_queries.json"),
+}
+
+# 连接探测结果缓存配置
+PROBE_CACHE_CONFIG = {
+    # 成功探测结果的缓存时间（秒），connect/save/update 在此期间复用结果，<= 0 表示不缓存
+    "TTL": float(os.getenv("PROBE_CACHE_TTL", "15.0")),
+}
+
+# Schema 缓存配置（按集群缓存完整 schema 与单个 class 的 schema）
+SCHEMA_CACHE_CONFIG = {
+    # 缓存有效期（秒），<= 0 表示不缓存
+    "TTL": float(os.getenv("SCHEMA_CACHE_TTL", "60.0")),
+    # 缓存占用的最大字节数，超出后按 LRU 淘汰
+    "MAX_BYTES": int(os.getenv("SCHEMA_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    # 缓存的最大条目数
+    "MAX_ENTRIES": int(os.getenv("SCHEMA_CACHE_MAX_ENTRIES", "4096")),
+}
+
+# 批量导入配置（/objects/import）
+IMPORT_CONFIG = {
+    # 默认每批写入的对象数量
+    "BATCH_SIZE": int(os.getenv("IMPORT_BATCH_SIZE", "100")),
+    # 默认同时在途的批次数
+    "CONCURRENCY": int(os.getenv("IMPORT_CONCURRENCY", "4")),
+    # 默认失败重试次数（整批请求失败或单个对象写入失败）
+    "MAX_RETRIES": int(os.getenv("IMPORT_MAX_RETRIES", "3")),
+    # 重试退避基数（秒），第 n 次重试等待 base * 2^(n-1)
+    "RETRY_BACKOFF": float(os.getenv("IMPORT_RETRY_BACKOFF", "0.5")),
+    # 读取上传文件的块大小（字节）
+    "READ_CHUNK_SIZE": int(os.getenv("IMPORT_READ_CHUNK_SIZE", str(1024 * 1024))),
+    # 进度结果中最多返回的失败明细条数
+    "MAX_REPORTED_ERRORS": int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", "50")),
+}
+
+# /objects/search 结果缓存配置
+RESULT_CACHE_CONFIG = {
+    # 单个结果的缓存有效期（秒），<= 0 表示不缓存
+    "TTL": float(os.getenv("RESULT_CACHE_TTL", "30.0")),
+    # 缓存占用的最大字节数（按 Weaviate 响应体大小计算），超出后按 LRU 淘汰
+    "MAX_BYTES": int(os.getenv("RESULT_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+    # 缓存的最大条目数
+    "MAX_ENTRIES": int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "1024")),
+}
+
+# /objects/search 翻页预取配置
+SEARCH_PREFETCH_CONFIG = {
+    # 返回一页后是否在后台预取下一页（预取结果写入搜索结果缓存）
+    "ENABLED": _env_flag("SEARCH_PREFETCH_ENABLED", "true"),
+    # 同时进行的预取任务上限
+    "MAX_INFLIGHT": int(os.getenv("SEARCH_PREFETCH_MAX_INFLIGHT", "8")),
+}
+
+# class 对象数量统计配置（/schema/stats）
+SCHEMA_STATS_CONFIG = {
+    # 对象数量缓存有效期（秒），<= 0 表示不缓存
+    "TTL": float(os.getenv("SCHEMA_STATS_TTL", "60.0")),
+    # 单个 GraphQL Aggregate 文档中合并查询的 class 数量
+    "CLASSES_PER_QUERY": int(os.getenv("SCHEMA_STATS_CLASSES_PER_QUERY", "50")),
+    # 同时进行的 Aggregate 请求数
+    "MAX_CONCURRENCY": int(os.getenv("SCHEMA_STATS_MAX_CONCURRENCY", "4")),
+}
+
+# 相似度搜索配置（nearVector / nearText / bm25 / hybrid）
+SIMILARITY_CONFIG = {
+    # 单个 GraphQL 文档中合并的查询数（多别名），为 1 时每个查询单独请求、单独计时
+    "QUERIES_PER_REQUEST": int(os.getenv("SIMILARITY_QUERIES_PER_REQUEST", "20")),
+    # 同时在途的 GraphQL 请求数
+    "MAX_CONCURRENCY": int(os.getenv("SIMILARITY_MAX_CONCURRENCY", "4")),
+    # 单次请求允许的最大查询数
+    "MAX_QUERIES": int(os.getenv("SIMILARITY_MAX_QUERIES", "1000")),
+}
+
+# 向量统计分析配置（/objects/vector-stats）
+VECTOR_STATS_CONFIG = {
+    # 默认抽样数量与上限（样本内存约为 数量 × 维度 × 4 字节）
+    "DEFAULT_SAMPLE_SIZE": int(os.getenv("VECTOR_STATS_DEFAULT_SAMPLE_SIZE", "2000")),
+    "MAX_SAMPLE_SIZE": int(os.getenv("VECTOR_STATS_MAX_SAMPLE_SIZE", "50000")),
+    # 沿 /v1/objects 游标扫描时每页拉取的对象数
+    "PAGE_SIZE": int(os.getenv("VECTOR_STATS_PAGE_SIZE", "500")),
+}
+
+# HNSW 召回率基准配置（/objects/recall-benchmark）
+RECALL_BENCHMARK_CONFIG = {
+    # 默认查询数量与上限
+    "DEFAULT_QUERIES": int(os.getenv("RECALL_BENCHMARK_DEFAULT_QUERIES", "100")),
+    "MAX_QUERIES": int(os.getenv("RECALL_BENCHMARK_MAX_QUERIES", "2000")),
+    # 精确 top-k 计算时每块的向量数（块内存约为 数量 × 维度 × 4 字节）
+    "BLOCK_SIZE": int(os.getenv("RECALL_BENCHMARK_BLOCK_SIZE", "10000")),
+    # 沿 /v1/objects 游标扫描时每页拉取的对象数
+    "PAGE_SIZE": int(os.getenv("RECALL_BENCHMARK_PAGE_SIZE", "500")),
+    # 同时在途的 nearVector 查询数
+    "CONCURRENCY": int(os.getenv("RECALL_BENCHMARK_CONCURRENCY", "4")),
+}
+
+# 上游响应透传：直接把 Weaviate 返回的字节写入响应信封，不解析也不重新序列化
+PASSTHROUGH_CONFIG = {
+    # 请求未指定 passthrough 时的默认值
+    "ENABLED": _env_flag("RESPONSE_PASSTHROUGH", "false"),
+    # 写给客户端的单个分块大小（字节）
+    "CHUNK_SIZE": int(os.getenv("PASSTHROUGH_CHUNK_SIZE", str(64 * 1024))),
+}
+
+# 响应压缩（按 Accept-Encoding 协商 zstd / gzip）
+COMPRESSION_CONFIG = {
+    # 是否启用响应压缩
+    "ENABLED": _env_flag("RESPONSE_COMPRESSION", "true"),
+    # 非流式响应小于该字节数时不压缩
+    "MIN_SIZE": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+    # 单次压缩的数据达到该字节数时放到线程池执行，避免阻塞事件循环
+    "OFFLOAD_SIZE": int(os.getenv("COMPRESSION_OFFLOAD_SIZE", str(256 * 1024))),
+    # gzip 压缩级别（1-9）
+    "GZIP_LEVEL": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+    # zstd 压缩级别（需要安装 zstandard，未安装时只协商 gzip）
+    "ZSTD_LEVEL": int(os.getenv("COMPRESSION_ZSTD_LEVEL", "3")),
+}
+
+# 启动配置（桌面端 sidecar 冷启动）
+STARTUP_CONFIG = {
+    # 启动后在后台预热最近使用的集群（解析 DNS、建立连接并缓存探测结果），不阻塞服务就绪
+    "PREWARM_ENABLED": _env_flag("STARTUP_PREWARM", "true"),
+    # 预热的集群数量（按 updatedAt 倒序）
+    "PREWARM_CLUSTERS": int(os.getenv("STARTUP_PREWARM_CLUSTERS", "3")),
+    # 单个集群预热的超时时间（秒）
+    "PREWARM_TIMEOUT": float(os.getenv("STARTUP_PREWARM_TIMEOUT", "5.0")),
+    # 是否统计启动阶段各模块的导入耗时并输出到日志
+    "PROFILE_IMPORTS": _env_flag("STARTUP_PROFILE_IMPORTS"),
+    # 导入耗时日志输出的模块数量
+    "PROFILE_TOP": int(os.getenv("STARTUP_PROFILE_TOP", "20")),
+}
+
+# 集群健康监控（后台定期探测已保存的集群，结果在 /connection/list 中返回）
+HEALTH_MONITOR_CONFIG = {
+    # 是否启用后台健康监控
+    "ENABLED": _env_flag("HEALTH_MONITOR_ENABLED", "true"),
+    # 可达集群的探测间隔（秒）
+    "INTERVAL": float(os.getenv("HEALTH_MONITOR_INTERVAL", "60.0")),
+    # 同时进行的探测数
+    "CONCURRENCY": int(os.getenv("HEALTH_MONITOR_CONCURRENCY", "4")),
+    # 单次探测超时时间（秒）
+    "TIMEOUT": float(os.getenv("HEALTH_MONITOR_TIMEOUT", "5.0")),
+    # 不可达集群的退避上限（秒），连续失败时间隔按 INTERVAL 翻倍直到该值
+    "MAX_BACKOFF": float(os.getenv("HEALTH_MONITOR_MAX_BACKOFF", "900.0")),
+    # 探测间隔的随机抖动比例（0.2 表示 ±20%），避免所有集群同时探测
+    "JITTER": float(os.getenv("HEALTH_MONITOR_JITTER", "0.2")),
+}
+
+# 多集群并发搜索（/objects/search/fan-out）
+FANOUT_SEARCH_CONFIG = {
+    # 单个集群的默认超时时间（秒），超时的集群返回错误，不影响其他集群
+    "CLUSTER_TIMEOUT": float(os.getenv("FANOUT_CLUSTER_TIMEOUT", "15.0")),
+    # 单次请求允许的最大集群数
+    "MAX_CLUSTERS": int(os.getenv("FANOUT_MAX_CLUSTERS", "32")),
+    # 同时查询的集群数
+    "MAX_CONCURRENCY": int(os.getenv("FANOUT_MAX_CONCURRENCY", "8")),
+}
+
+# 按 id 批量获取对象（/objects/get-many）
+GET_MANY_CONFIG = {
+    # 单次请求允许的最大 id 数
+    "MAX_IDS": int(os.getenv("GET_MANY_MAX_IDS", "1000")),
+    # 每个 GraphQL 查询（where id ContainsAny）包含的 id 数
+    "CHUNK_SIZE": int(os.getenv("GET_MANY_CHUNK_SIZE", "100")),
+    # 同时在途的 GraphQL 查询数
+    "GRAPHQL_CONCURRENCY": int(os.getenv("GET_MANY_GRAPHQL_CONCURRENCY", "4")),
+    # 回退到逐个 GET /v1/objects/{class}/{id} 时的并发数
+    "REST_CONCURRENCY": int(os.getenv("GET_MANY_REST_CONCURRENCY", "16")),
+}
+
+# 按过滤条件批量删除对象（/objects/delete-by-filter）
+DELETE_BY_FILTER_CONFIG = {
+    # 单次批量删除请求的超时时间（秒），一次最多删除 Weaviate 的 QUERY_MAXIMUM_RESULTS 个对象
+    "CALL_TIMEOUT": float(os.getenv("DELETE_BY_FILTER_CALL_TIMEOUT", "120.0")),
+    # 上游响应未返回 results.limit 时假定的单次删除上限（Weaviate 默认 QUERY_MAXIMUM_RESULTS）
+    "DEFAULT_LIMIT": int(os.getenv("DELETE_BY_FILTER_DEFAULT_LIMIT", "10000")),
+    # 最多执行的删除轮数，防止持续写入的数据导致删除无法结束
+    "MAX_ROUNDS": int(os.getenv("DELETE_BY_FILTER_MAX_ROUNDS", "1000")),
+}
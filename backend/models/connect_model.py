@@ -28,6 +28,28 @@ class Connections(BaseModel):
     apiKey: str
 
 
+class ClusterHealth(BaseModel):
+    """集群健康状态（后台监控最近一次探测 /v1/meta 的结果）"""
+    status: str = Field(default="unknown", description="up | down | unknown（尚未探测或未启用监控）")
+    latencyMs: Optional[float] = Field(default=None, description="最近一次探测的延迟（毫秒）")
+    version: Optional[str] = Field(default=None, description="Weaviate 版本")
+    checkedAt: Optional[str] = Field(default=None, description="最近一次探测时间（UTC ISO 8601）")
+    error: Optional[str] = Field(default=None, description="不可达原因")
+    consecutiveFailures: int = Field(default=0, description="连续失败次数")
+
+
+class ConnectionWithHealth(Connections):
+    """连接配置及其健康状态"""
+    health: ClusterHealth = Field(default_factory=ClusterHealth)
+
+
+class SchemaQueryRequest(Connections):
+    """查询集群完整 schema"""
+    passthrough: Optional[bool] = Field(
+        default=None, description="是否直接透传 Weaviate 返回的字节（不解析），为空时使用 PASSTHROUGH_CONFIG 默认值",
+    )
+
+
 class ClassSchemaRequest(BaseModel):
     """请求某个 class 的 Schema 详情"""
     id: str
@@ -38,6 +60,27 @@ class ClassSchemaRequest(BaseModel):
     className: str = Field(..., description="要查询的 class 名称")
 
 
+class SchemaInvalidateRequest(BaseModel):
+    """失效 schema 缓存请求"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: Optional[str] = Field(default=None, description="要失效的 class 名称，为空则失效整个集群")
+
+
+class SchemaStatsRequest(BaseModel):
+    """查询各 class 对象数量请求"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    classNames: Optional[list[str]] = Field(default=None, description="要统计的 class 名称，为空则统计全部 class")
+    refresh: bool = Field(default=False, description="是否忽略缓存重新统计")
+
+
 class ClassObjectsRequest(BaseModel):
     """请求某个 class 下的对象列表"""
     id: str
@@ -48,6 +91,40 @@ class ClassObjectsRequest(BaseModel):
     className: str = Field(..., description="要查询的 class 名称")
     limit: Optional[int] = Field(default=100, ge=1, le=1000, description="返回的最大对象数量")
     after: Optional[str] = Field(default=None, description="分页游标（上一次返回的最后一个对象的 id）")
+    includeVector: bool = Field(default=False, description="是否返回向量")
+    vectorEncoding: str = Field(
+        default="float", pattern=r"^(float|base64)$",
+        description="向量编码: float（JSON 数组）| base64（小端 float32）；Accept 为 MessagePack 时返回原始 float32 字节",
+    )
+    passthrough: Optional[bool] = Field(
+        default=None,
+        description="是否直接透传 Weaviate 返回的字节（不解析），为空时使用 PASSTHROUGH_CONFIG 默认值；仅对 float 编码的 JSON 响应生效",
+    )
+
+
+class ClassObjectsExportRequest(BaseModel):
+    """导出某个 class 下的全部对象（NDJSON 流）"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(..., description="要导出的 class 名称")
+    pageSize: int = Field(default=500, ge=1, le=10000, description="每次向 Weaviate 拉取的对象数量")
+    includeVector: bool = Field(default=False, description="是否导出向量")
+
+
+class ClassObjectsImportRequest(BaseModel):
+    """批量导入对象（multipart 表单字段，文件为 NDJSON 或 JSON 数组）"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: Optional[str] = Field(default=None, description="对象未指定 class 时使用的 class 名称")
+    batchSize: Optional[int] = Field(default=None, ge=1, le=1000, description="每批写入的对象数量")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=32, description="同时在途的批次数")
+    maxRetries: Optional[int] = Field(default=None, ge=0, le=10, description="失败重试次数")
 
 
 class ObjectFilter(BaseModel):
@@ -68,3 +145,114 @@ class ClassObjectsSearchRequest(BaseModel):
     filters: Optional[list[ObjectFilter]] = Field(default=None, description="过滤条件数组")
     logic: str = Field(default="And", description="过滤条件之间的逻辑关系: And | Or")
     limit: Optional[int] = Field(default=100, ge=1, le=1000)
+    offset: int = Field(default=0, ge=0, description="分页偏移量（上一页响应中的 nextOffset）")
+    properties: Optional[list[str]] = Field(default=None, description="要返回的属性名，为空则返回 schema 中的全部属性")
+    includeVector: bool = Field(default=False, description="是否返回向量")
+    includeRaw: bool = Field(default=False, description="是否附带 Weaviate 原始返回内容")
+    vectorEncoding: str = Field(
+        default="float", pattern=r"^(float|base64)$",
+        description="向量编码: float（JSON 数组）| base64（小端 float32）；Accept 为 MessagePack 时返回原始 float32 字节",
+    )
+
+
+class ObjectsGetManyRequest(BaseModel):
+    """按 id 批量获取对象"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(..., description="对象所在的 class 名称")
+    ids: list[str] = Field(..., min_length=1, description="对象 id 列表，结果按此顺序返回")
+    properties: Optional[list[str]] = Field(default=None, description="要返回的属性名，为空则返回全部属性")
+    includeVector: bool = Field(default=False, description="是否返回向量")
+    vectorEncoding: str = Field(
+        default="float", pattern=r"^(float|base64)$",
+        description="向量编码: float（JSON 数组）| base64（小端 float32）；Accept 为 MessagePack 时返回原始 float32 字节",
+    )
+    strategy: str = Field(
+        default="auto", pattern=r"^(auto|graphql|rest)$",
+        description="获取方式: graphql（where id ContainsAny）| rest（并发 GET）| auto（GraphQL 失败时回退到 rest）",
+    )
+
+
+class ObjectsDeleteByFilterRequest(BaseModel):
+    """按过滤条件批量删除对象"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(..., description="对象所在的 class 名称")
+    filters: list[ObjectFilter] = Field(..., min_length=1, description="过滤条件数组，不允许为空（避免误删整个 class）")
+    logic: str = Field(default="And", description="过滤条件之间的逻辑关系: And | Or")
+    dryRun: bool = Field(default=False, description="只统计匹配数量，不删除")
+
+
+class FanOutSearchRequest(BaseModel):
+    """在多个已保存集群上执行同一 GraphQL where 查询（NDJSON 流）"""
+    connectionIds: list[str] = Field(..., min_length=1, description="clusters.json 中的连接 id")
+    className: str = Field(...)
+    filters: Optional[list[ObjectFilter]] = Field(default=None, description="过滤条件数组")
+    logic: str = Field(default="And", description="过滤条件之间的逻辑关系: And | Or")
+    limit: Optional[int] = Field(default=100, ge=1, le=1000)
+    offset: int = Field(default=0, ge=0, description="分页偏移量")
+    properties: Optional[list[str]] = Field(default=None, description="要返回的属性名，为空则返回 schema 中的全部属性")
+    includeVector: bool = Field(default=False, description="是否返回向量")
+    vectorEncoding: str = Field(default="float", pattern=r"^(float|base64)$", description="向量编码: float | base64")
+    timeout: Optional[float] = Field(
+        default=None, gt=0, le=300, description="单个集群的超时时间（秒），为空时使用 FANOUT_SEARCH_CONFIG 默认值",
+    )
+
+
+class SimilaritySearchRequest(BaseModel):
+    """相似度搜索请求（nearVector / nearText / bm25 / hybrid），支持一次提交多个查询"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(...)
+    vectors: Optional[list[list[float]]] = Field(default=None, description="查询向量列表（nearVector，hybrid 可选）")
+    queries: Optional[list[str]] = Field(default=None, description="查询文本列表（nearText / bm25 / hybrid）")
+    limit: int = Field(default=10, ge=1, le=1000, description="每个查询返回的对象数量")
+    distance: Optional[float] = Field(default=None, description="最大距离阈值（nearVector / nearText）")
+    alpha: Optional[float] = Field(default=None, ge=0, le=1, description="hybrid 中向量检索的权重")
+    searchProperties: Optional[list[str]] = Field(default=None, description="bm25 / hybrid 检索的属性")
+    filters: Optional[list[ObjectFilter]] = Field(default=None, description="过滤条件数组")
+    logic: str = Field(default="And", description="过滤条件之间的逻辑关系: And | Or")
+    properties: Optional[list[str]] = Field(default=None, description="要返回的属性名，为空则返回 schema 中的全部属性")
+    includeVector: bool = Field(default=False, description="是否返回向量")
+    queriesPerRequest: Optional[int] = Field(default=None, ge=1, le=200, description="单个 GraphQL 文档合并的查询数")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=32, description="同时在途的 GraphQL 请求数")
+
+
+class VectorStatsRequest(BaseModel):
+    """抽样统计某个 class 的向量分布（范数、逐维统计、二维投影）"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(..., description="要统计的 class 名称")
+    sampleSize: Optional[int] = Field(default=None, ge=1, description="蓄水池抽样数量，默认取配置值")
+    maxObjects: Optional[int] = Field(default=None, ge=1, description="最多扫描的对象数，为空表示扫描整个 class")
+    pageSize: Optional[int] = Field(default=None, ge=1, le=10000, description="每次向 Weaviate 拉取的对象数量")
+    bins: int = Field(default=30, ge=1, le=500, description="范数直方图的分桶数")
+    projection: str = Field(default="pca", pattern=r"^(pca|random)$", description="二维投影方式")
+    seed: Optional[int] = Field(default=None, description="随机种子，便于复现抽样与投影结果")
+
+
+class RecallBenchmarkRequest(BaseModel):
+    """HNSW 召回率基准：精确 top-k 对比 nearVector 结果"""
+    id: str
+    name: str
+    scheme: str = Field(default="http", pattern=r"^(http|https)$")
+    address: str
+    apiKey: Optional[str] = Field(default=None)
+    className: str = Field(..., description="要测试的 class 名称")
+    k: int = Field(default=10, ge=1, le=1000, description="recall@k 中的 k")
+    queryCount: Optional[int] = Field(default=None, ge=1, description="从 class 中抽样的查询数量")
+    queries: Optional[list[list[float]]] = Field(default=None, description="指定查询向量，为空时从 class 中抽样")
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64, description="同时在途的 nearVector 查询数")
+    seed: Optional[int] = Field(default=None, description="抽样随机种子")
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# (对象, 失败原因)
+_Failure = Tuple[Dict[str, Any], str]
+
+# 单个对象错误信息中表示暂时性故障的关键字，只有这类错误才会重试；
+# 校验失败等确定性错误重试也不会成功
+_TRANSIENT_ITEM_ERRORS = (
+    "timeout",
+    "timed out",
+    "deadline exceeded",
+    "connection refused",
+    "connection reset",
+    "unavailable",
+    "too many requests",
+    "resource exhausted",
+)
+
+
+def _item_error(item: Any) -> Optional[str]:
+    """提取 /v1/batch/objects 响应中单个对象的错误信息"""
+    if not isinstance(item, dict):
+        return None
+    result = item.get("result")
+    errors = result.get("errors") if isinstance(result, dict) else None
+    error_list = errors.get("error") if isinstance(errors, dict) else None
+    if not error_list:
+        return None
+    messages = [e.get("message", "") for e in error_list if isinstance(e, dict)]
+    return "; ".join(m for m in messages if m) or "未知错误"
+
+
+def _is_transient(message: str) -> bool:
+    lowered = message.lower()
+    return any(keyword in lowered for keyword in _TRANSIENT_ITEM_ERRORS)
+
+
+class BatchImporter:
+    """通过 /v1/batch/objects 分批并发写入对象。
+
+    - 每 `batch_size` 个对象组成一批，最多 `concurrency` 批同时在途，超出时暂停读取（背压）
+    - 整批请求失败（超时/连接错误/429/5xx）或单个对象出现暂时性错误时按指数退避重试，
+      其余单个对象错误及响应中缺少结果的对象直接记为失败
+    - `run()` 每完成一批产出一条进度事件，最后产出汇总事件
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        headers: Dict[str, str],
+        batch_size: int,
+        concurrency: int,
+        max_retries: int,
+        retry_backoff: float,
+        timeout: float,
+        default_class: Optional[str] = None,
+        max_reported_errors: int = 50,
+    ) -> None:
+        self._client = client
+        self._url = f"{base_url}/v1/batch/objects"
+        self._headers = headers
+        self._batch_size = batch_size
+        self._concurrency = concurrency
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._timeout = timeout
+        self._default_class = default_class
+        self._max_reported_errors = max_reported_errors
+        self._started = time.perf_counter()
+        self.read = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.classes: Set[str] = set()
+        # 在途批次 -> 该批的对象，批次异常结束时据此计入失败
+        self._inflight: Dict[asyncio.Task, List[Dict[str, Any]]] = {}
+
+    def _record_failure(self, obj: Any, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self._max_reported_errors:
+            error: Dict[str, Any] = {"error": message}
+            if isinstance(obj, dict):
+                error["id"] = obj.get("id")
+                error["class"] = obj.get("class")
+            self.errors.append(error)
+
+    def _event(self, event: str, **extra: Any) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        data = {
+            "event": event,
+            "read": self.read,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "elapsed": round(elapsed, 3),
+            "objectsPerSecond": round(self.imported / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+        data.update(extra)
+        return data
+
+    async def _send(self, objects: List[Dict[str, Any]]) -> Tuple[int, List[_Failure]]:
+        """写入一批对象，返回 (成功数量, 最终失败的对象)"""
+        remaining = objects
+        messages: List[str] = []
+        failed: List[_Failure] = []
+        succeeded = 0
+        for attempt in range(self._max_retries + 1):
+            if attempt:
+                self.retries += 1
+                await asyncio.sleep(self._retry_backoff * (2 ** (attempt - 1)))
+            try:
+                resp = await self._client.post(
+                    self._url, json={"objects": remaining}, headers=self._headers, timeout=self._timeout,
+                )
+            except httpx.TimeoutException:
+                messages = ["写入超时"] * len(remaining)
+                continue
+            except httpx.HTTPError as e:
+                messages = [f"连接失败: {str(e)}"] * len(remaining)
+                continue
+
+            if resp.status_code == 200:
+                try:
+                    results = resp.json()
+                except ValueError:
+                    results = None
+                if not isinstance(results, list):
+                    results = []
+                retryable: List[_Failure] = []
+                for idx, obj in enumerate(remaining):
+                    if idx >= len(results):
+                        # 无法确认是否已写入，不重试以免重复写入无 id 的对象
+                        failed.append((obj, "响应中缺少该对象的写入结果"))
+                        continue
+                    message = _item_error(results[idx])
+                    if message is None:
+                        succeeded += 1
+                    elif _is_transient(message):
+                        retryable.append((obj, message))
+                    else:
+                        failed.append((obj, message))
+                remaining = [obj for obj, _ in retryable]
+                messages = [message for _, message in retryable]
+                if not remaining:
+                    break
+            elif resp.status_code == 429 or resp.status_code >= 500:
+                messages = [f"写入失败: HTTP {resp.status_code}"] * len(remaining)
+            else:
+                # 4xx（除 429）重试无意义
+                messages = [f"写入失败: HTTP {resp.status_code} {resp.text[:200]}"] * len(remaining)
+                break
+        return succeeded, failed + list(zip(remaining, messages))
+
+    def _submit(self, batch: List[Dict[str, Any]]) -> asyncio.Task:
+        task = asyncio.create_task(self._send(batch))
+        self._inflight[task] = batch
+        return task
+
+    def _collect(self, task: "asyncio.Task[Tuple[int, List[_Failure]]]") -> None:
+        self.batches += 1
+        batch = self._inflight.pop(task, [])
+        try:
+            succeeded, failures = task.result()
+        except Exception as e:
+            logger.exception("批量写入出现未预期异常 错误=%s", str(e))
+            for obj in batch:
+                self._record_failure(obj, f"写入异常: {str(e) or type(e).__name__}")
+            return
+        self.imported += succeeded
+        for obj, message in failures:
+            self._record_failure(obj, message)
+
+    async def run(self, objects: AsyncIterator[Any]) -> AsyncIterator[Dict[str, Any]]:
+        pending: Set[asyncio.Task] = set()
+        batch: List[Dict[str, Any]] = []
+        error: Optional[str] = None
+        try:
+            try:
+                async for obj in objects:
+                    self.read += 1
+                    if not isinstance(obj, dict):
+                        self._record_failure(obj, f"第 {self.read} 个元素不是 JSON 对象")
+                        continue
+                    if self._default_class and not obj.get("class"):
+                        obj["class"] = self._default_class
+                    if obj.get("class"):
+                        self.classes.add(obj["class"])
+                    batch.append(obj)
+                    if len(batch) < self._batch_size:
+                        continue
+                    # 背压：在途批次达到上限时等待至少一批完成再继续读取
+                    while len(pending) >= self._concurrency:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            self._collect(task)
+                        yield self._event("progress")
+                    pending.add(self._submit(batch))
+                    batch = []
+            except ValueError as e:
+                error = str(e)
+                logger.error("解析导入数据失败 已读取=%d 错误=%s", self.read, error)
+            if batch:
+                pending.add(self._submit(batch))
+                batch = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    self._collect(task)
+                yield self._event("progress")
+            if error is not None:
+                yield self._event("error", message=error, errors=self.errors)
+            else:
+                yield self._event("done", errors=self.errors)
+        finally:
+            # 客户端提前断开时取消在途批次
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,133 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def estimate_size(value: Any) -> int:
+    """粗略估算缓存值占用的字节数（按 JSON 序列化长度计算）"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return 0
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: Any, size: int, expires_at: float) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+class TTLCache:
+    """带过期时间与内存上限的 LRU 缓存。
+
+    - 每个条目有独立的过期时间（默认 `ttl` 秒）
+    - 总字节数超过 `max_bytes` 或条目数超过 `max_entries` 时按最近最少使用淘汰
+    - 记录命中/未命中/淘汰计数，便于调优
+    """
+
+    def __init__(self, ttl: float, max_bytes: int, max_entries: Optional[int] = None) -> None:
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.expires_at > time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self.peek(key, default)
+        self.record(value is not default)
+        return value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """与 `get` 相同但不计入命中/未命中，供一次逻辑查找需要读取多个条目的调用方使用"""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return default
+        self._data.move_to_end(key)
+        return entry.value
+
+    def record(self, hit: bool) -> None:
+        """记录一次逻辑查找的结果（配合 `peek` 使用）"""
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def set(self, key: Hashable, value: Any, size: Optional[int] = None, ttl: Optional[float] = None) -> bool:
+        """写入缓存，返回是否成功写入（超过总容量的单个条目不缓存）"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return False
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            self._remove(key)
+            return False
+        self._remove(key)
+        self._data[key] = _Entry(value, size, time.monotonic() + ttl)
+        self._bytes += size
+        self._evict()
+        return True
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._remove(key)
+        return entry.value if entry is not None else None
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """删除键满足 predicate 的全部条目，返回删除数量"""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "maxEntries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hitRatio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> Optional[_Entry]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        return entry
+
+    def _evict(self) -> None:
+        while self._data and (
+            self._bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._data) > self.max_entries)
+        ):
+            _, entry = self._data.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
@@ -0,0 +1,25 @@
+import logging
+from typing import Callable, List
+
+from utils.http_client import ClusterKey
+
+logger = logging.getLogger(__name__)
+
+ClassChangedListener = Callable[[ClusterKey, str], None]
+
+_listeners: List[ClassChangedListener] = []
+
+
+def on_class_changed(listener: ClassChangedListener) -> ClassChangedListener:
+    """注册 class 数据变更监听（导入、删除等写操作完成后触发），可作为装饰器使用"""
+    _listeners.append(listener)
+    return listener
+
+
+def notify_class_changed(key: ClusterKey, class_name: str) -> None:
+    """通知某个集群下的 class 数据已变更，依次调用各监听以失效相关缓存"""
+    for listener in _listeners:
+        try:
+            listener(key, class_name)
+        except Exception as e:
+            logger.exception("处理 class 变更通知失败 class=%s 错误=%s", class_name, str(e))
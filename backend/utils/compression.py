@@ -0,0 +1,159 @@
+import asyncio
+import importlib
+import importlib.util
+import zlib
+from typing import Any, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.business_setting import COMPRESSION_CONFIG
+
+# zstandard 为可选依赖，未安装时只协商 gzip
+_zstd = importlib.import_module("zstandard") if importlib.util.find_spec("zstandard") else None
+
+# 协商时同等权重下的优先顺序
+SUPPORTED_ENCODINGS = ("zstd", "gzip") if _zstd is not None else ("gzip",)
+
+# msgpack 响应主要是原始 float32 向量字节，压缩率很低却要付出压缩开销，不在此列
+_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "text/",
+)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """按 Accept-Encoding（含 q 值与 `*`）选择压缩算法，无可用算法时返回 None"""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class _GzipEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        # 非最后一块使用 SYNC_FLUSH，保证流式响应（NDJSON 进度等）的每一块都能被客户端立即解码
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _ZstdEncoder:
+    def __init__(self, level: int) -> None:
+        self._compressor = _zstd.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(
+            _zstd.COMPRESSOBJ_FLUSH_FINISH if final else _zstd.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+
+def _new_encoder(encoding: str) -> Any:
+    if encoding == "zstd":
+        return _ZstdEncoder(COMPRESSION_CONFIG["ZSTD_LEVEL"])
+    return _GzipEncoder(COMPRESSION_CONFIG["GZIP_LEVEL"])
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    if status in (204, 304) or "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    if not content_type.startswith(_COMPRESSIBLE_TYPES):
+        return False
+    length = headers.get("content-length")
+    return length is None or not length.isdigit() or int(length) >= COMPRESSION_CONFIG["MIN_SIZE"]
+
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 协商的响应压缩（zstd 优先，其次 gzip）。
+
+    纯 ASGI 中间件，与 Starlette 的 GZipMiddleware 相比：
+    - 流式响应逐块压缩并 flush，不缓冲，NDJSON 进度与透传响应照常边到边发
+    - 非流式响应小于 `MIN_SIZE` 时原样返回
+    - 单块数据达到 `OFFLOAD_SIZE` 时在线程池中压缩（zlib/zstd 压缩期间释放 GIL），
+      大对象页或导出不会阻塞其他请求
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Dict[str, Any]] = None
+        encoder: Any = None
+        bypass = False
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal start_message, encoder, bypass
+            if message["type"] == "http.response.start":
+                # 等到第一个响应体分片再决定是否压缩
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or bypass:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = MutableHeaders(scope=start_message)
+                if not _compressible(start_message["status"], headers) or (
+                    not more_body and len(body) < COMPRESSION_CONFIG["MIN_SIZE"]
+                ):
+                    bypass = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = _new_encoder(encoding)
+                if "content-length" in headers:
+                    del headers["content-length"]
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more_body:
+                    data = await self._compress(encoder, body, True)
+                    headers["Content-Length"] = str(len(data))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": data})
+                    return
+                await send(start_message)
+
+            data = await self._compress(encoder, body, not more_body)
+            if data or not more_body:
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    async def _compress(encoder: Any, data: bytes, final: bool) -> bytes:
+        if len(data) >= COMPRESSION_CONFIG["OFFLOAD_SIZE"]:
+            return await asyncio.to_thread(encoder.compress, data, final)
+        return encoder.compress(data, final)
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import DATA_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# 文件签名 (mtime_ns, size)，用于判断文件是否被外部修改
+_FileSignature = Tuple[int, int]
+
+
+def _stat_file(path: str) -> Optional[_FileSignature]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_file(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f) or []
+        except json.JSONDecodeError:
+            data = []
+    if not isinstance(data, list):
+        return []
+    return [item for item in data if isinstance(item, dict)]
+
+
+def _write_file_atomic(path: str, records: List[Dict]) -> Optional[_FileSignature]:
+    """先写临时文件再原子替换，避免写入中途崩溃导致文件损坏"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".clusters-", suffix=".json.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return _stat_file(path)
+
+
+class ConnectionStore:
+    """已保存连接配置（clusters.json）的内存索引。
+
+    - 按 id、name 建立字典索引，并维护按 updatedAt 倒序排好的列表
+    - 仅在文件 mtime/大小变化时重新加载，兼容外部手动修改
+    - 写入通过临时文件 + rename 原子完成，所有磁盘 IO 都在线程池中执行，不阻塞事件循环
+
+    返回的记录为内部数据，调用方不要原地修改。
+    """
+
+    def __init__(self, file_path: str) -> None:
+        self._path = file_path
+        self._lock = asyncio.Lock()
+        self._signature: Optional[_FileSignature] = None
+        self._loaded = False
+        self._records: List[Dict] = []
+        self._by_id: Dict[str, Dict] = {}
+        self._by_name: Dict[str, Dict] = {}
+        self._sorted: List[Dict] = []
+
+    @property
+    def file_path(self) -> str:
+        return self._path
+
+    def _rebuild_index(self, records: List[Dict]) -> None:
+        self._records = records
+        self._by_id = {}
+        self._by_name = {}
+        # 与原先的线性查找保持一致：同 id/name 以文件中第一条为准
+        for item in records:
+            self._by_id.setdefault(str(item.get("id", "")), item)
+            name = item.get("name")
+            if name is not None:
+                self._by_name.setdefault(name, item)
+        self._sorted = sorted(records, key=lambda x: str(x.get("updatedAt", "")), reverse=True)
+
+    async def _refresh(self) -> bool:
+        """文件变化时重新加载，返回数据文件是否存在"""
+        signature = await asyncio.to_thread(_stat_file, self._path)
+        if signature is None:
+            if self._records or not self._loaded:
+                self._rebuild_index([])
+            self._signature = None
+            self._loaded = True
+            return False
+        if not self._loaded or signature != self._signature:
+            records = await asyncio.to_thread(_read_file, self._path)
+            self._rebuild_index(records)
+            self._signature = signature
+            self._loaded = True
+            logger.info("加载连接配置 文件=%s 数量=%d", self._path, len(records))
+        return True
+
+    async def _persist(self, records: List[Dict]) -> None:
+        self._signature = await asyncio.to_thread(_write_file_atomic, self._path, records)
+        self._rebuild_index(records)
+
+    async def exists(self) -> bool:
+        async with self._lock:
+            return await self._refresh()
+
+    async def get(self, conn_id: str) -> Optional[Dict]:
+        async with self._lock:
+            await self._refresh()
+            return self._by_id.get(str(conn_id))
+
+    async def get_by_name(self, name: str) -> Optional[Dict]:
+        async with self._lock:
+            await self._refresh()
+            return self._by_name.get(name)
+
+    async def list(self) -> List[Dict]:
+        """按 updatedAt 倒序返回全部记录"""
+        async with self._lock:
+            await self._refresh()
+            return list(self._sorted)
+
+    async def upsert(self, record: Dict, match_name: bool = False) -> Dict:
+        """写入记录：按 id 覆盖已存在的记录；`match_name=True` 时按 name 匹配覆盖，否则追加。"""
+        async with self._lock:
+            await self._refresh()
+            if match_name:
+                existing = self._by_name.get(record.get("name"))
+            else:
+                existing = self._by_id.get(str(record.get("id", "")))
+            records = list(self._records)
+            if existing is not None:
+                idx = next(i for i, item in enumerate(records) if item is existing)
+                records[idx] = record
+            else:
+                records.append(record)
+            await self._persist(records)
+            return record
+
+    async def delete(self, conn_id: str) -> bool:
+        """删除指定 id 的全部记录，返回是否删除了记录"""
+        async with self._lock:
+            await self._refresh()
+            if str(conn_id) not in self._by_id:
+                return False
+            records = [item for item in self._records if str(item.get("id", "")) != str(conn_id)]
+            await self._persist(records)
+            return True
+
+
+# 全局共享连接配置存储
+connection_store = ConnectionStore(DATA_CONFIG["clusters_file"])
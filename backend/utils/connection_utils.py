@@ -1,96 +1,132 @@
+# @Author: cola5173
+# @Time: 2025/11/6 16:34
+import asyncio
 import logging
-from typing import Dict, Tuple, Any
+import time
+from typing import Dict, Tuple, Any, Optional
 
 import httpx
 
+from config.business_setting import PROBE_CACHE_CONFIG
+
 
 logger = logging.getLogger(__name__)
 
+# 探测项名称 -> (路径, 日志中的检查名称)
+_PROBES: Dict[str, Tuple[str, str]] = {
+    "ready": ("/v1/.well-known/ready", "连接就绪检查"),
+    "meta": ("/v1/meta", "连接 meta 检查"),
+    "schema": ("/v1/schema", "连接 schema 检查"),
+}
+
+# 成功探测结果缓存：(base_url, Authorization) -> (过期时间, 结果数据)
+_probe_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+
+
+def _probe_cache_key(base_url: str, headers: Dict[str, str]) -> Tuple[str, str]:
+    return base_url.rstrip("/"), headers.get("Authorization", "")
+
+
+def get_cached_probe(base_url: str, headers: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    """返回未过期的成功探测结果，不存在或已过期时返回 None。"""
+    key = _probe_cache_key(base_url, headers)
+    cached = _probe_cache.get(key)
+    if cached is None:
+        return None
+    expires_at, result = cached
+    if expires_at <= time.monotonic():
+        _probe_cache.pop(key, None)
+        return None
+    return result
+
+
+def invalidate_probe_cache(base_url: Optional[str] = None) -> None:
+    """清除探测结果缓存；指定 base_url 时只清除该集群的缓存。"""
+    if base_url is None:
+        _probe_cache.clear()
+        return
+    base_url = base_url.rstrip("/")
+    for key in [k for k in _probe_cache if k[0] == base_url]:
+        _probe_cache.pop(key, None)
+
 
 async def test_connection(
     client: httpx.AsyncClient,
     base_url: str,
     headers: Dict[str, str],
     timeout_seconds: float,
+    use_cache: bool = True,
 ) -> Tuple[bool, Dict[str, Any], str]:
     """测试 Weaviate 连接可用性。
 
+    并发执行就绪、meta、schema 三项探测，任一探测失败即取消其余探测并返回。
+    成功结果会在 `PROBE_CACHE_CONFIG['TTL']` 内缓存，`use_cache=True` 时直接复用。
+
     返回: (是否成功, 结果数据, 失败消息)
     结果数据包含 probe 和 meta 信息。
     """
-    # 1) 就绪检查
-    ready_url = f"{base_url}/v1/.well-known/ready"
-    try:
-        ready_resp = await client.get(ready_url, headers=headers)
-        ready_ok = ready_resp.status_code == 200
-        if ready_ok:
-            logger.info("连接就绪检查通过 路径=%s", ready_url)
-        else:
-            logger.error("连接就绪检查失败 路径=%s 状态码=%s", ready_url, ready_resp.status_code)
-    except httpx.TimeoutException:
-        logger.error("连接就绪检查超时 url=%s 超时时间=%ss", ready_url, timeout_seconds)
-        return False, {}, "连接超时，请检查地址是否正确"
-    except httpx.ConnectError as e:
-        logger.error("连接就绪检查连接错误 url=%s 错误=%s", ready_url, str(e))
-        return False, {}, "无法连接到服务器，请检查地址和网络"
-    except Exception as e:
-        logger.exception("连接就绪检查发生错误 url=%s 错误=%s", ready_url, str(e))
-        return False, {}, f"连接测试失败: {str(e)}"
-
-    # 2) meta 检查
-    meta_url = f"{base_url}/v1/meta"
+    base_url = base_url.rstrip("/")
+    if use_cache:
+        cached = get_cached_probe(base_url, headers)
+        if cached is not None:
+            logger.info("复用连接探测缓存 url=%s", base_url)
+            return True, cached, "连接测试成功"
+
+    urls = {name: f"{base_url}{path}" for name, (path, _) in _PROBES.items()}
+    tasks = {
+        asyncio.create_task(client.get(url, headers=headers, timeout=timeout_seconds)): name
+        for name, url in urls.items()
+    }
     meta_info: Dict[str, Any] = {}
+    pending = set(tasks)
     try:
-        meta_resp = await client.get(meta_url, headers=headers)
-        if meta_resp.status_code == 200:
-            try:
-                meta_json = meta_resp.json()
-            except Exception:
-                meta_json = None
-            meta_info = meta_json or {}
-            logger.info("连接 meta 检查通过 路径=%s", meta_url)
-        else:
-            logger.error("连接 meta 检查失败 路径=%s 状态码=%s", meta_url, meta_resp.status_code)
-    except httpx.TimeoutException:
-        logger.error("连接 meta 检查超时 url=%s 超时时间=%ss", meta_url, timeout_seconds)
-        return False, {}, "连接超时，请检查地址是否正确"
-    except httpx.ConnectError as e:
-        logger.error("连接 meta 检查连接错误 url=%s 错误=%s", meta_url, str(e))
-        return False, {}, "无法连接到服务器，请检查地址和网络"
-    except Exception as e:
-        logger.exception("连接 meta 检查发生错误 url=%s 错误=%s", meta_url, str(e))
-        return False, {}, f"连接测试失败: {str(e)}"
-
-    # 3) schema 检查
-    schema_url = f"{base_url}/v1/schema"
-    schema_ok = False
-    try:
-        schema_resp = await client.get(schema_url, headers=headers)
-        if schema_resp.status_code == 200:
-            schema_ok = True
-            logger.info("连接 schema 检查通过 路径=%s", schema_url)
-        else:
-            logger.error("连接 schema 检查失败 路径=%s 状态码=%s", schema_url, schema_resp.status_code)
-    except httpx.TimeoutException:
-        logger.error("连接 schema 检查超时 url=%s 超时时间=%ss", schema_url, timeout_seconds)
-        return False, {}, "连接超时，请检查地址是否正确"
-    except httpx.ConnectError as e:
-        logger.error("连接 schema 检查连接错误 url=%s 错误=%s", schema_url, str(e))
-        return False, {}, "无法连接到服务器，请检查地址和网络"
-    except Exception as e:
-        logger.exception("连接 schema 检查发生错误 url=%s 错误=%s", schema_url, str(e))
-        return False, {}, f"连接测试失败: {str(e)}"
-
-    if ready_ok and schema_ok:
-        return True, {
-            "probe": {
-                "ready": ready_url,
-                "meta": meta_url,
-                "schema": schema_url,
-            },
-            "meta": meta_info,
-        }, "连接测试成功"
-
-    return False, {}, "连接失败: 服务未就绪或无权访问 schema"
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                url = urls[name]
+                label = _PROBES[name][1]
+                try:
+                    resp = task.result()
+                except httpx.TimeoutException:
+                    logger.error("%s超时 url=%s 超时时间=%ss", label, url, timeout_seconds)
+                    return False, {}, "连接超时，请检查地址是否正确"
+                except httpx.ConnectError as e:
+                    logger.error("%s连接错误 url=%s 错误=%s", label, url, str(e))
+                    return False, {}, "无法连接到服务器，请检查地址和网络"
+                except Exception as e:
+                    logger.exception("%s发生错误 url=%s 错误=%s", label, url, str(e))
+                    return False, {}, f"连接测试失败: {str(e)}"
+
+                if resp.status_code != 200:
+                    logger.error("%s失败 路径=%s 状态码=%s", label, url, resp.status_code)
+                    if name == "meta":
+                        # meta 不可用不影响连接判定
+                        continue
+                    return False, {}, "连接失败: 服务未就绪或无权访问 schema"
 
+                logger.info("%s通过 路径=%s", label, url)
+                if name == "meta":
+                    try:
+                        meta_info = resp.json() or {}
+                    except Exception:
+                        meta_info = {}
+    finally:
+        # 提前返回时取消仍在进行的探测
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
+    result = {
+        "probe": {
+            "ready": urls["ready"],
+            "meta": urls["meta"],
+            "schema": urls["schema"],
+        },
+        "meta": meta_info,
+    }
+    ttl = PROBE_CACHE_CONFIG["TTL"]
+    if ttl > 0:
+        _probe_cache[_probe_cache_key(base_url, headers)] = (time.monotonic() + ttl, result)
+    return True, result, "连接测试成功"
@@ -0,0 +1,52 @@
+import json
+from typing import Any, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response as StarletteResponse
+
+from models.base import Response
+
+# 非字符串键（如 int）转为字符串；numpy 数组/标量直接序列化
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    """orjson 无法直接序列化的类型（pydantic 模型、bytes、Decimal 等）交给 FastAPI 的编码器"""
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """把内容序列化为 JSON 字节；超出 64 位的整数等 orjson 不支持的情况退回标准库"""
+    try:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class EnvelopeResponse(StarletteResponse):
+    """与 `models.base.Response` 结构相同（`{success, message, data}`）的 JSON 响应。
+
+    路由直接返回该对象时 FastAPI 不再按 `response_model` 校验，也不经过 `jsonable_encoder`
+    逐字段转换，`data` 由 orjson 一次性写出。用于对象列表、schema 等大响应；
+    `data` 只应包含 JSON 原生类型（上游解析结果、dict/list/str/数字）。
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        success: bool,
+        message: str,
+        data: Optional[Any] = None,
+        status_code: int = 200,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__({"success": success, "message": message, "data": data}, status_code=status_code, **kwargs)
+
+    @classmethod
+    def from_model(cls, result: Response, **kwargs: Any) -> "EnvelopeResponse":
+        return cls(result.success, result.message, result.data, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import httpx
+
+from config.business_setting import HEALTH_MONITOR_CONFIG
+from utils.connection_store import connection_store
+from utils.http_client import ClusterKey, client_registry, cluster_key
+
+logger = logging.getLogger(__name__)
+
+HEALTH_UP = "up"
+HEALTH_DOWN = "down"
+HEALTH_UNKNOWN = "unknown"
+
+
+class ClusterHealthMonitor:
+    """已保存集群的后台健康监控。
+
+    - 后台任务按集群各自的下次探测时间调度，同时进行的探测数不超过 `CONCURRENCY`
+    - 每次探测只请求 /v1/meta，记录状态、延迟与 Weaviate 版本；探测不会让闲置的集群客户端保持活跃
+    - 可达集群每 `INTERVAL` 秒探测一次；不可达集群按连续失败次数指数退避（上限 `MAX_BACKOFF`），
+      间隔都带随机抖动，避免大量集群在同一时刻探测
+    - 结果只保存在内存中，`get()` 不发起任何上游请求
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+        self._config = config or HEALTH_MONITOR_CONFIG
+        self._health: Dict[ClusterKey, Dict[str, Any]] = {}
+        self._failures: Dict[ClusterKey, int] = {}
+        self._next_check: Dict[ClusterKey, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._rng = random.Random()
+
+    def get(self, scheme: str, address: str, api_key: Optional[str]) -> Optional[Dict[str, Any]]:
+        """返回集群最近一次探测结果，尚未探测时返回 None"""
+        return self._health.get(cluster_key(scheme, address, api_key))
+
+    def trigger(self) -> None:
+        """唤醒后台任务立即处理到期的集群（新保存的集群视为到期）"""
+        self._wakeup.set()
+
+    def _next_delay(self, failures: int) -> float:
+        interval = self._config["INTERVAL"]
+        if failures:
+            interval = min(interval * 2 ** (failures - 1), max(self._config["MAX_BACKOFF"], interval))
+        jitter = self._config["JITTER"]
+        return interval * self._rng.uniform(1 - jitter, 1 + jitter)
+
+    async def check(self, scheme: str, address: str, api_key: Optional[str]) -> Dict[str, Any]:
+        """探测一个集群并更新缓存的状态"""
+        key = cluster_key(scheme, address, api_key)
+        base_url = f"{key[0]}://{key[1]}"
+        headers: Dict[str, str] = {}
+        if key[2]:
+            headers["Authorization"] = f"Bearer {key[2]}"
+
+        status, error, version, latency_ms = HEALTH_DOWN, None, None, None
+        started = time.perf_counter()
+        try:
+            # 不刷新共享客户端的闲置时间，长期不用的集群连接池仍会被回收
+            async with client_registry.acquire_background(scheme, address, api_key) as client:
+                resp = await client.get(f"{base_url}/v1/meta", headers=headers, timeout=self._config["TIMEOUT"])
+            latency_ms = round((time.perf_counter() - started) * 1000, 3)
+            if resp.status_code == 200:
+                status = HEALTH_UP
+                try:
+                    meta = resp.json()
+                except ValueError:
+                    meta = None
+                if isinstance(meta, dict):
+                    version = meta.get("version")
+            elif resp.status_code in (401, 403):
+                error = "未授权，请检查 API Key"
+            else:
+                error = f"HTTP {resp.status_code}"
+        except httpx.TimeoutException:
+            error = "探测超时"
+        except httpx.HTTPError as e:
+            error = f"无法连接: {str(e) or type(e).__name__}"
+        except Exception as e:
+            # 地址无效等（如 httpx.InvalidURL、URL 解析的 ValueError）同样记为不可达并退避
+            error = f"探测失败: {str(e) or type(e).__name__}"
+
+        failures = 0 if status == HEALTH_UP else self._failures.get(key, 0) + 1
+        previous = self._health.get(key)
+        health = {
+            "status": status,
+            "latencyMs": latency_ms,
+            # 不可达时保留上次获取到的版本
+            "version": version or (previous or {}).get("version"),
+            "checkedAt": datetime.now(timezone.utc).isoformat(),
+            "error": error,
+            "consecutiveFailures": failures,
+        }
+        self._health[key] = health
+        self._failures[key] = failures
+        self._next_check[key] = time.monotonic() + self._next_delay(failures)
+
+        if previous is None or previous["status"] != status:
+            if status == HEALTH_UP:
+                logger.info("集群健康状态 可达 url=%s 延迟=%.1fms 版本=%s", base_url, latency_ms, version)
+            else:
+                logger.warning("集群健康状态 不可达 url=%s 原因=%s", base_url, error)
+        return health
+
+    async def run_once(self) -> int:
+        """探测所有到期的已保存集群，返回本轮探测数量"""
+        clusters: Dict[ClusterKey, Dict] = {}
+        for item in await connection_store.list():
+            if item.get("address"):
+                clusters.setdefault(cluster_key(item.get("scheme"), item.get("address"), item.get("apiKey")), item)
+
+        # 清理已删除（或地址已修改）的集群
+        for key in [k for k in self._health if k not in clusters]:
+            self._health.pop(key, None)
+            self._failures.pop(key, None)
+            self._next_check.pop(key, None)
+
+        now = time.monotonic()
+        due = [key for key in clusters if self._next_check.get(key, 0.0) <= now]
+        if not due:
+            return 0
+        semaphore = asyncio.Semaphore(max(self._config["CONCURRENCY"], 1))
+
+        async def probe(key: ClusterKey) -> None:
+            async with semaphore:
+                await self.check(key[0], key[1], key[2])
+
+        await asyncio.gather(*(probe(key) for key in due))
+        return len(due)
+
+    async def _loop(self) -> None:
+        interval = self._config["INTERVAL"]
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.exception("集群健康探测失败 错误=%s", str(e))
+            # 睡到最近一个集群到期，最长 INTERVAL（以便发现新保存的集群），保存连接时会被提前唤醒
+            now = time.monotonic()
+            upcoming = min(self._next_check.values(), default=now + interval)
+            delay = min(max(upcoming - now, 1.0), interval)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def start(self) -> None:
+        """启动后台监控任务（在应用 lifespan 启动阶段调用）"""
+        if not self._config["ENABLED"]:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def close(self) -> None:
+        """停止后台监控任务（在应用 lifespan 关闭阶段调用）"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 全局集群健康监控
+health_monitor = ClusterHealthMonitor()
@@ -0,0 +1,176 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from config.business_setting import HTTP_CLIENT_CONFIG, METRICS_CONFIG
+from utils.metrics import InstrumentedTransport
+
+logger = logging.getLogger(__name__)
+
+ClusterKey = Tuple[str, str, str]
+
+
+def cluster_key(scheme: str, address: str, api_key: Optional[str]) -> ClusterKey:
+    """生成集群标识 (scheme, address, apiKey)，用于客户端与各类缓存的键。"""
+    return (scheme or "http", (address or "").rstrip("/"), api_key or "")
+
+
+class _ClientEntry:
+    """注册表中的单个客户端及其使用状态"""
+
+    __slots__ = ("client", "last_used", "in_use")
+
+    def __init__(self, client: httpx.AsyncClient) -> None:
+        self.client = client
+        self.last_used = time.monotonic()
+        self.in_use = 0
+
+
+class ClusterClientRegistry:
+    """按集群复用的长连接 httpx.AsyncClient 注册表。
+
+    以 (scheme, address, apiKey) 为键缓存客户端，复用 keep-alive 连接池，
+    避免每次请求都重新建立 TCP/TLS 连接；闲置超过 `IDLE_CLIENT_TTL` 的客户端由后台任务关闭。
+    """
+
+    def __init__(
+        self,
+        config: Optional[Dict] = None,
+        transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]] = None,
+    ) -> None:
+        self._config = dict(HTTP_CLIENT_CONFIG if config is None else config)
+        self._transport_factory = transport_factory
+        self._clients: Dict[ClusterKey, _ClientEntry] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        self._http2 = bool(self._config.get("HTTP2"))
+        self._instrument = METRICS_CONFIG["ENABLED"]
+        if self._http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("未安装 h2，HTTP/2 已禁用，回退到 HTTP/1.1")
+            self._http2 = False
+
+    def _create_client(self, key: ClusterKey) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self._config["MAX_CONNECTIONS"],
+            max_keepalive_connections=self._config["MAX_KEEPALIVE_CONNECTIONS"],
+            keepalive_expiry=self._config["KEEPALIVE_EXPIRY"],
+        )
+        if self._transport_factory is not None:
+            transport = self._transport_factory()
+        else:
+            transport = httpx.AsyncHTTPTransport(limits=limits, http2=self._http2)
+        if self._instrument:
+            # 按集群记录上游请求指标（标签不含 apiKey）
+            transport = InstrumentedTransport(transport, f"{key[0]}://{key[1]}")
+        return httpx.AsyncClient(transport=transport, limits=limits, http2=self._http2)
+
+    def get(self, scheme: str, address: str, api_key: Optional[str]) -> httpx.AsyncClient:
+        """获取（必要时创建）指定集群的共享客户端。
+
+        返回的客户端由注册表统一管理，调用方不要关闭它；请求超时请在每次调用时单独传入。
+        """
+        key = cluster_key(scheme, address, api_key)
+        entry = self._clients.get(key)
+        if entry is None or entry.client.is_closed:
+            entry = _ClientEntry(self._create_client(key))
+            self._clients[key] = entry
+            logger.info("创建集群 HTTP 客户端 url=%s://%s http2=%s", key[0], key[1], self._http2)
+        entry.last_used = time.monotonic()
+        return entry.client
+
+    async def set_transport_factory(
+        self, transport_factory: Optional[Callable[[], httpx.AsyncBaseTransport]],
+    ) -> None:
+        """替换之后创建的客户端所用的底层传输（如基准测试中挂载进程内 ASGI 应用），已有客户端会被关闭"""
+        self._transport_factory = transport_factory
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for entry in clients:
+            await entry.client.aclose()
+
+    @asynccontextmanager
+    async def acquire(self, scheme: str, address: str, api_key: Optional[str]) -> AsyncIterator[httpx.AsyncClient]:
+        """在使用期间持有客户端，防止其被闲置回收任务关闭；退出时不会关闭客户端。"""
+        key = cluster_key(scheme, address, api_key)
+        client = self.get(scheme, address, api_key)
+        entry = self._clients[key]
+        entry.in_use += 1
+        try:
+            yield client
+        finally:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def acquire_background(
+        self, scheme: str, address: str, api_key: Optional[str],
+    ) -> AsyncIterator[httpx.AsyncClient]:
+        """供后台任务（如健康探测）使用：不刷新闲置时间，不影响闲置客户端的回收。
+
+        集群已有共享客户端时复用其连接池；否则使用一个临时客户端，退出时关闭，不放入注册表。
+        """
+        key = cluster_key(scheme, address, api_key)
+        entry = self._clients.get(key)
+        if entry is None or entry.client.is_closed:
+            client = self._create_client(key)
+            try:
+                yield client
+            finally:
+                await client.aclose()
+            return
+        entry.in_use += 1
+        try:
+            yield entry.client
+        finally:
+            entry.in_use -= 1
+
+    async def close_idle(self, max_idle: Optional[float] = None) -> int:
+        """关闭闲置超过 `max_idle` 秒且当前未被使用的客户端，返回关闭数量。"""
+        ttl = self._config["IDLE_CLIENT_TTL"] if max_idle is None else max_idle
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._clients.items()
+            if entry.in_use == 0 and now - entry.last_used >= ttl
+        ]
+        for key in expired:
+            entry = self._clients.pop(key)
+            await entry.client.aclose()
+            logger.info("关闭闲置集群 HTTP 客户端 url=%s://%s", key[0], key[1])
+        return len(expired)
+
+    async def _reap_loop(self) -> None:
+        interval = self._config["IDLE_REAP_INTERVAL"]
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.close_idle()
+            except Exception as e:
+                logger.exception("回收闲置 HTTP 客户端失败 错误=%s", str(e))
+
+    async def start(self) -> None:
+        """启动闲置客户端回收任务（在应用 lifespan 启动阶段调用）"""
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+
+    async def close(self) -> None:
+        """停止回收任务并关闭全部客户端（在应用 lifespan 关闭阶段调用）"""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+            self._reaper = None
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for entry in clients:
+            await entry.client.aclose()
+        logger.info("已关闭全部集群 HTTP 客户端 数量=%d", len(clients))
+
+
+# 全局共享注册表
+client_registry = ClusterClientRegistry()
@@ -0,0 +1,83 @@
+import builtins
+import logging
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.business_setting import STARTUP_CONFIG
+
+logger = logging.getLogger("weaviate_king")
+
+
+class ImportProfiler:
+    """统计启动阶段的耗时。
+
+    `start()` 记录起点；开启 `STARTUP_PROFILE_IMPORTS` 时临时替换 `builtins.__import__`，
+    记录主线程中每个模块首次导入的累计耗时与自身耗时（扣除其中嵌套导入的部分），
+    效果类似 `python -X importtime`，但只输出最慢的若干个模块。`stop()` 恢复原函数。
+    """
+
+    def __init__(self) -> None:
+        self._started: Optional[float] = None
+        self._original: Any = None
+        self._thread: Optional[int] = None
+        self._stack: List[float] = []
+        # 模块名 -> (累计耗时, 自身耗时)，单位秒
+        self.records: Dict[str, Tuple[float, float]] = {}
+
+    @property
+    def active(self) -> bool:
+        return self._original is not None
+
+    def start(self, profile: Optional[bool] = None) -> None:
+        if self._started is None:
+            self._started = time.perf_counter()
+        if profile is None:
+            profile = STARTUP_CONFIG["PROFILE_IMPORTS"]
+        if profile and not self.active:
+            self._original = builtins.__import__
+            self._thread = threading.get_ident()
+            builtins.__import__ = self._import
+
+    def stop(self) -> None:
+        if self.active:
+            builtins.__import__ = self._original
+            self._original = None
+
+    def elapsed_ms(self) -> float:
+        """距 `start()` 的耗时（毫秒），未启动时为 0"""
+        return (time.perf_counter() - self._started) * 1000 if self._started is not None else 0.0
+
+    def _import(self, name: str, globals: Any = None, locals: Any = None, fromlist: Any = (), level: int = 0) -> Any:
+        original = self._original
+        # 相对导入、已加载模块与其他线程中的导入直接放行
+        if level or name in sys.modules or threading.get_ident() != self._thread:
+            return original(name, globals, locals, fromlist, level)
+        started = time.perf_counter()
+        self._stack.append(0.0)
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            self.records.setdefault(name, (elapsed, elapsed - children))
+
+    def top(self, count: int) -> List[Tuple[str, float, float]]:
+        """按自身耗时倒序返回 (模块名, 累计毫秒, 自身毫秒)"""
+        items = sorted(self.records.items(), key=lambda item: item[1][1], reverse=True)[:count]
+        return [(name, cumulative * 1000, own * 1000) for name, (cumulative, own) in items]
+
+    def log_report(self) -> None:
+        logger.info("⏱️ 启动耗时: %.1fms（自 api 包导入起）", self.elapsed_ms())
+        if not self.records:
+            return
+        logger.info("⏱️ 模块导入耗时 Top %d（自身 / 累计）:", STARTUP_CONFIG["PROFILE_TOP"])
+        for name, cumulative, own in self.top(STARTUP_CONFIG["PROFILE_TOP"]):
+            logger.info("   %8.1fms / %8.1fms  %s", own, cumulative, name)
+
+
+# 全局启动耗时统计（在 api/__init__.py 中启动）
+import_profiler = ImportProfiler()
@@ -0,0 +1,133 @@
+import codecs
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONStreamError(ValueError):
+    """上传内容无法解析为 NDJSON 或 JSON 数组"""
+
+
+class _Buffer:
+    """按块读取并增量解码 UTF-8 的文本缓冲区"""
+
+    def __init__(self, read: Callable[[int], Awaitable[bytes]], chunk_size: int) -> None:
+        self._read = read
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self) -> bool:
+        """读取下一块追加到缓冲区，已到达末尾时返回 False"""
+        if self.eof:
+            return False
+        chunk = await self._read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            self.text += self._decoder.decode(b"", final=True)
+            return False
+        self.text += self._decoder.decode(chunk)
+        return True
+
+    def compact(self) -> None:
+        """丢弃已消费部分，避免缓冲区无限增长"""
+        if self.pos > self.chunk_size:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+
+    async def skip_whitespace(self) -> bool:
+        """跳过空白字符，返回之后是否还有内容"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return True
+            self.text, self.pos = "", 0
+            if not await self.fill():
+                return False
+
+
+async def iter_json_objects(
+    read: Callable[[int], Awaitable[bytes]],
+    chunk_size: int = 1024 * 1024,
+) -> AsyncIterator[Any]:
+    """从异步字节流中逐个解析 JSON 值。
+
+    支持两种格式（按第一个非空白字符自动识别）：
+    - JSON 数组：`[ {...}, {...} ]`，增量解析数组元素
+    - NDJSON：每行一个 JSON 值，空行会被忽略
+
+    内存占用约为一个读取块加上当前正在解析的单个元素。
+    """
+    buf = _Buffer(read, chunk_size)
+    if not await buf.skip_whitespace():
+        return
+    if buf.text[buf.pos] == "﻿":
+        buf.pos += 1
+        if not await buf.skip_whitespace():
+            return
+
+    if buf.text[buf.pos] == "[":
+        buf.pos += 1
+        async for value in _iter_array(buf):
+            yield value
+    else:
+        async for value in _iter_lines(buf):
+            yield value
+
+
+async def _iter_array(buf: _Buffer) -> AsyncIterator[Any]:
+    decoder = json.JSONDecoder()
+    expect_value = True
+    index = 0
+    while True:
+        if not await buf.skip_whitespace():
+            raise JSONStreamError("JSON 数组未正确结束")
+        ch = buf.text[buf.pos]
+        if ch == "]":
+            return
+        if ch == ",":
+            if expect_value:
+                raise JSONStreamError(f"JSON 数组格式错误: 第 {index + 1} 个元素前出现多余的逗号")
+            buf.pos += 1
+            expect_value = True
+            continue
+        if not expect_value:
+            raise JSONStreamError(f"JSON 数组格式错误: 第 {index + 1} 个元素前缺少逗号")
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf.text, buf.pos)
+                break
+            except json.JSONDecodeError as e:
+                # 当前元素可能尚未读完，继续读取后重试
+                if not await buf.fill():
+                    raise JSONStreamError(f"第 {index + 1} 个元素 JSON 解析失败: {e.msg}") from e
+        yield value
+        index += 1
+        expect_value = False
+        buf.pos = end
+        buf.compact()
+
+
+async def _iter_lines(buf: _Buffer) -> AsyncIterator[Any]:
+    line_no = 0
+    while True:
+        idx = buf.text.find("\n", buf.pos)
+        if idx < 0:
+            if await buf.fill():
+                continue
+            line, buf.pos = buf.text[buf.pos:], len(buf.text)
+        else:
+            line, buf.pos = buf.text[buf.pos:idx], idx + 1
+        line_no += 1
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise JSONStreamError(f"第 {line_no} 行 JSON 解析失败: {e.msg}") from e
+        if idx < 0:
+            return
+        buf.compact()
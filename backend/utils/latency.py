@@ -0,0 +1,25 @@
+import math
+from typing import Dict, Iterable, Sequence
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """最近秩法计算百分位数，`sorted_values` 需已升序排列"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return float(sorted_values[min(rank, len(sorted_values)) - 1])
+
+
+def summarize_latencies(values_ms: Iterable[float]) -> Dict[str, float]:
+    """汇总一组耗时（毫秒）：次数、均值、p50/p90/p99、最大值"""
+    ordered = sorted(values_ms)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(percentile(ordered, 50), 3),
+        "p90": round(percentile(ordered, 90), 3),
+        "p99": round(percentile(ordered, 99), 3),
+        "max": round(ordered[-1], 3),
+    }
@@ -0,0 +1,359 @@
+import bisect
+import math
+import time
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import httpx
+from starlette.routing import Match
+
+# 延迟直方图分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 响应大小直方图分桶（字节）
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+_LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _key(self, labels: Dict[str, Any]) -> _LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """可增可减的瞬时值（如在途请求数）"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self, size: int) -> None:
+        self.buckets = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """分桶直方图，输出格式与 Prometheus histogram 一致（累计桶 + _sum + _count）"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, label_names)
+        self.bounds = tuple(sorted(buckets))
+        self._series: Dict[_LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _HistogramSeries(len(self.bounds) + 1)
+        series.buckets[bisect.bisect_left(self.bounds, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return series.count if series is not None else 0
+
+    def samples(self) -> Iterable[str]:
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, hits in zip(self.bounds + (math.inf,), series.buckets):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}"
+            labels = _format_labels(self.label_names, key)
+            yield f"{self.name}_sum{labels} {_format_value(series.total)}"
+            yield f"{self.name}_count{labels} {series.count}"
+
+
+class MetricsRegistry:
+    """指标注册表，`render()` 输出 Prometheus 文本格式（text/plain; version=0.0.4）。
+
+    指标只在事件循环线程中更新，不加锁。
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"指标已存在: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, label_names))
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, label_names))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, label_names, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# 全局指标注册表
+metrics_registry = MetricsRegistry()
+
+# ---- API 路由指标 ----
+HTTP_REQUESTS = metrics_registry.counter(
+    "weaviate_king_http_requests_total", "API 请求总数", ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = metrics_registry.histogram(
+    "weaviate_king_http_request_duration_seconds", "API 请求耗时（含流式响应写出）", ("method", "route"),
+)
+HTTP_RESPONSE_SIZE = metrics_registry.histogram(
+    "weaviate_king_http_response_size_bytes", "API 响应体大小", ("method", "route"), SIZE_BUCKETS,
+)
+HTTP_IN_FLIGHT = metrics_registry.gauge(
+    "weaviate_king_http_requests_in_flight", "正在处理的 API 请求数", ("method", "route"),
+)
+
+# ---- 上游 Weaviate 调用指标 ----
+UPSTREAM_REQUESTS = metrics_registry.counter(
+    "weaviate_king_upstream_requests_total", "发往 Weaviate 的请求总数", ("cluster", "method", "path", "status"),
+)
+UPSTREAM_DURATION = metrics_registry.histogram(
+    "weaviate_king_upstream_request_duration_seconds", "Weaviate 请求耗时（含响应体读取）", ("cluster", "method", "path"),
+)
+UPSTREAM_RESPONSE_SIZE = metrics_registry.histogram(
+    "weaviate_king_upstream_response_size_bytes", "Weaviate 响应体大小", ("cluster", "path"), SIZE_BUCKETS,
+)
+UPSTREAM_ERRORS = metrics_registry.counter(
+    "weaviate_king_upstream_errors_total", "Weaviate 请求失败次数（timeout / connect / other）", ("cluster", "path", "kind"),
+)
+UPSTREAM_IN_FLIGHT = metrics_registry.gauge(
+    "weaviate_king_upstream_requests_in_flight", "正在进行的 Weaviate 请求数", ("cluster",),
+)
+
+# 未匹配任何路由的请求统一记为该值，避免任意路径造成标签基数膨胀
+UNMATCHED_ROUTE = "<unmatched>"
+
+# 三段式的固定上游路径，其余路径第三段起视为参数
+_STATIC_UPSTREAM_PATHS = {
+    "/v1/batch/objects",
+    "/v1/batch/references",
+    "/v1/.well-known/ready",
+    "/v1/.well-known/live",
+    "/v1/.well-known/openid-configuration",
+}
+
+
+def normalize_upstream_path(path: str) -> str:
+    """把上游路径归一化为低基数的标签，如 `/v1/schema/Article` -> `/v1/schema/{param}`"""
+    path = "/" + path.strip("/")
+    if path in _STATIC_UPSTREAM_PATHS:
+        return path
+    segments = path.strip("/").split("/")
+    if len(segments) <= 2:
+        return path
+    return "/" + "/".join(segments[:2] + ["{param}"] * (len(segments) - 2))
+
+
+def _route_template(scope: Dict[str, Any]) -> str:
+    """按应用路由表匹配出路由模板（如 `/connection/get/{conn_id}`）"""
+    app = scope.get("app")
+    routes = getattr(getattr(app, "router", None), "routes", None) or []
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_ROUTE)
+    return UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """记录每个 API 请求的耗时、响应大小、状态码与在途数量。
+
+    纯 ASGI 中间件：不缓冲响应，耗时记到最后一个响应体分片写出为止，流式接口也能正确统计。
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "")
+        route = _route_template(scope)
+        status = "500"
+        size = 0
+        started = time.perf_counter()
+        HTTP_IN_FLIGHT.inc(method=method, route=route)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec(method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, method=method, route=route)
+            HTTP_RESPONSE_SIZE.observe(size, method=method, route=route)
+
+
+class _MeasuredStream(httpx.AsyncByteStream):
+    """包装上游响应体，在读取完毕（关闭）时记录总耗时与字节数"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Any) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._size = 0
+        self._closed = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._size += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._on_close(self._size)
+        await self._stream.aclose()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """为上游 Weaviate 请求记录指标的传输层包装，按集群与归一化路径分组"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, cluster: str) -> None:
+        self._transport = transport
+        self._cluster = cluster
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        cluster = self._cluster
+        method = request.method
+        path = normalize_upstream_path(request.url.path)
+        started = time.perf_counter()
+        UPSTREAM_IN_FLIGHT.inc(cluster=cluster)
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            UPSTREAM_IN_FLIGHT.dec(cluster=cluster)
+            if isinstance(e, httpx.TimeoutException):
+                kind = "timeout"
+            elif isinstance(e, httpx.ConnectError):
+                kind = "connect"
+            else:
+                kind = "other"
+            UPSTREAM_ERRORS.inc(cluster=cluster, path=path, kind=kind)
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, cluster=cluster, method=method, path=path)
+            raise
+
+        status = str(response.status_code)
+
+        def on_close(size: int) -> None:
+            UPSTREAM_IN_FLIGHT.dec(cluster=cluster)
+            UPSTREAM_REQUESTS.inc(cluster=cluster, method=method, path=path, status=status)
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, cluster=cluster, method=method, path=path)
+            UPSTREAM_RESPONSE_SIZE.observe(size, cluster=cluster, path=path)
+
+        response.stream = _MeasuredStream(response.stream, on_close)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
@@ -0,0 +1,140 @@
+from typing import Any, AsyncIterator, Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+try:
+    import python_multipart as multipart
+    from python_multipart.multipart import parse_options_header
+except ModuleNotFoundError:  # python-multipart < 0.0.13 的包名为 multipart
+    import multipart
+    from multipart.multipart import parse_options_header
+
+# 单个普通表单字段的最大字节数
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class MultipartStreamReader:
+    """边接收边解析 multipart/form-data 请求体，不把上传内容落盘。
+
+    普通表单字段收集到 `fields`；名为 `file_field` 的文件部分通过 `read()` 按需读取，
+    读取时才从连接上接收下一段请求体，解析与写入可以在上传过程中进行。
+    表单字段需位于文件部分之前（浏览器 FormData 按 append 顺序发送），文件之后的字段会被忽略。
+    """
+
+    def __init__(self, request: Request, file_field: str = "file") -> None:
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if content_type != b"multipart/form-data" or not boundary:
+            raise ValueError("请求需为 multipart/form-data")
+        self.fields: Dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self._file_field = file_field
+        self._stream: AsyncIterator[bytes] = request.stream().__aiter__()
+        self._pending = bytearray()
+        self._eof = False
+        self._file_started = False
+        self._file_done = False
+
+        self._header_field = bytearray()
+        self._header_value = bytearray()
+        self._part_name: Optional[str] = None
+        self._part_is_file = False
+        self._part_value = bytearray()
+        self._parser = multipart.MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    @property
+    def has_file(self) -> bool:
+        return self._file_started
+
+    # ---- 解析回调（在 parser.write 中同步调用） ----
+
+    def _on_part_begin(self) -> None:
+        self._part_name = None
+        self._part_is_file = False
+        self._part_value.clear()
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        if bytes(self._header_field).lower() == b"content-disposition":
+            _, options = parse_options_header(bytes(self._header_value))
+            name = options.get(b"name")
+            self._part_name = name.decode("utf-8", "replace") if name is not None else None
+            filename = options.get(b"filename")
+            if self._part_name == self._file_field and filename is not None and not self._file_started:
+                self._part_is_file = True
+                self.filename = filename.decode("utf-8", "replace")
+        self._header_field.clear()
+        self._header_value.clear()
+
+    def _on_headers_finished(self) -> None:
+        if self._part_is_file:
+            self._file_started = True
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._part_is_file:
+            self._pending += data[start:end]
+        elif self._part_name is not None and not self._file_started:
+            self._part_value += data[start:end]
+            if len(self._part_value) > MAX_FIELD_SIZE:
+                raise ValueError(f"表单字段 {self._part_name} 过大")
+
+    def _on_part_end(self) -> None:
+        if self._part_is_file:
+            self._file_done = True
+        elif self._part_name is not None and not self._file_started:
+            self.fields[self._part_name] = self._part_value.decode("utf-8", "replace")
+
+    # ---- 读取 ----
+
+    async def _feed(self) -> None:
+        try:
+            chunk = await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._eof = True
+            self._parser.finalize()
+            return
+        if chunk:
+            self._parser.write(chunk)
+
+    async def read_fields(self) -> Dict[str, str]:
+        """接收请求体直到文件部分开始（或请求体结束），返回此前的表单字段"""
+        while not self._file_started and not self._eof:
+            await self._feed()
+        return self.fields
+
+    async def read(self, size: int = -1) -> bytes:
+        """读取文件部分的下一段字节，文件结束后返回 b""；签名与 UploadFile.read 兼容"""
+        while not self._pending and not self._file_done and not self._eof:
+            await self._feed()
+        if size is None or size < 0:
+            size = len(self._pending)
+        data = bytes(self._pending[:size])
+        del self._pending[:size]
+        return data
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """请求体尚未读完时使用的流式响应。
+
+    StreamingResponse 会另起任务调用 `receive()` 监听断开，与读取请求体争抢消息；
+    这里只输出响应，客户端断开由读取请求体时抛出的 ClientDisconnect 感知。
+    """
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,111 @@
+import logging
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
+
+import httpx
+from fastapi.responses import StreamingResponse
+
+from config.business_setting import PASSTHROUGH_CONFIG
+from utils.fast_json import dumps
+from utils.http_client import client_registry
+
+logger = logging.getLogger(__name__)
+
+
+def passthrough_enabled(requested: Optional[bool]) -> bool:
+    return PASSTHROUGH_CONFIG["ENABLED"] if requested is None else requested
+
+
+async def open_upstream_stream(
+    scheme: str,
+    address: str,
+    api_key: Optional[str],
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[AsyncExitStack, httpx.Response]:
+    """以流式方式发起 GET，只读取状态码与响应头，响应体留给调用方。
+
+    返回的 `AsyncExitStack` 持有集群客户端与上游响应，调用方负责关闭（出错时此处已关闭）。
+    """
+    stack = AsyncExitStack()
+    try:
+        client = await stack.enter_async_context(client_registry.acquire(scheme, address, api_key))
+        upstream = await stack.enter_async_context(
+            client.stream("GET", url, params=params, headers=headers, timeout=timeout)
+        )
+    except BaseException:
+        await stack.aclose()
+        raise
+    return stack, upstream
+
+
+def _envelope_parts(message: str, data: Dict[str, Any], key: str) -> Tuple[bytes, bytes]:
+    """返回 `{success, message, data: {...data, key: <上游字节>}}` 在上游字节前后的部分"""
+    head = dumps({"success": True, "message": message, "data": data})
+    # head 以 `}}` 结尾，去掉后追加 `key` 字段
+    prefix = head[:-2] + (b"," if data else b"") + dumps(key) + b":"
+    return prefix, b"}}"
+
+
+async def _envelope_stream(
+    stack: AsyncExitStack,
+    upstream: httpx.Response,
+    prefix: bytes,
+    suffix: bytes,
+) -> AsyncIterator[bytes]:
+    written = 0
+    try:
+        yield prefix
+        async for chunk in upstream.aiter_bytes(PASSTHROUGH_CONFIG["CHUNK_SIZE"]):
+            written += len(chunk)
+            yield chunk
+        if not written:
+            yield b"null"
+        yield suffix
+    except httpx.HTTPError as e:
+        # 响应头已发出，只能中断输出；客户端会收到不完整的 JSON
+        logger.error("透传上游响应中断 url=%s 已写出=%d 错误=%s", upstream.request.url, written, str(e))
+        raise
+    finally:
+        await stack.aclose()
+
+
+class _PassthroughResponse(StreamingResponse):
+    """发送结束后关闭上游连接的 StreamingResponse。
+
+    响应体生成器未开始迭代时（客户端在首字节前断开、发送响应头失败等）其 finally 不会执行，
+    这里在 `__call__` 结束时兜底关闭；`AsyncExitStack.aclose` 重复调用是安全的。
+    """
+
+    def __init__(self, stack: AsyncExitStack, content: AsyncIterator[bytes], **kwargs: Any) -> None:
+        super().__init__(content, **kwargs)
+        self._stack = stack
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self._stack.aclose()
+
+
+def passthrough_response(
+    stack: AsyncExitStack,
+    upstream: httpx.Response,
+    message: str,
+    data: Dict[str, Any],
+    key: str,
+) -> StreamingResponse:
+    """把上游响应体原样嵌入响应信封的 `data[key]`，按块转发，不解析 JSON。
+
+    内存占用约为一个分块，首字节在上游开始返回时即可发出；上游的 Content-Encoding
+    由 `aiter_bytes` 解码。流结束或客户端断开时关闭上游响应并释放集群客户端。
+    """
+    prefix, suffix = _envelope_parts(message, data, key)
+    return _PassthroughResponse(
+        stack,
+        _envelope_stream(stack, upstream, prefix, suffix),
+        media_type="application/json",
+    )
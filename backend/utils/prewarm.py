@@ -0,0 +1,63 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config.business_setting import STARTUP_CONFIG
+from utils.connection_store import connection_store
+from utils.connection_utils import test_connection
+from utils.http_client import client_registry
+
+logger = logging.getLogger(__name__)
+
+
+async def _prewarm_cluster(item: Dict, timeout: float) -> bool:
+    scheme = item.get("scheme") or "http"
+    address = item.get("address") or ""
+    api_key = item.get("apiKey") or ""
+    base_url = f"{scheme}://{address}".rstrip("/")
+    headers: Dict[str, str] = {}
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    started = time.perf_counter()
+    try:
+        async with client_registry.acquire(scheme, address, api_key) as client:
+            ok, _, msg = await asyncio.wait_for(
+                test_connection(client, base_url, headers, timeout, use_cache=False), timeout,
+            )
+    except asyncio.TimeoutError:
+        ok, msg = False, "预热超时"
+    except Exception as e:
+        ok, msg = False, str(e)
+    logger.info(
+        "预热集群 %s name=%s url=%s 耗时=%.1fms%s",
+        "完成" if ok else "失败", item.get("name"), base_url,
+        (time.perf_counter() - started) * 1000, "" if ok else f" 原因={msg}",
+    )
+    return ok
+
+
+async def prewarm_recent_clusters(count: Optional[int] = None, timeout: Optional[float] = None) -> int:
+    """并发预热最近使用（updatedAt 最新）的若干个集群，返回成功数量。
+
+    对每个集群执行一次与 /connection/connect 相同的探测：解析 DNS、建立 TCP/TLS 连接并放入
+    连接池，成功结果写入探测缓存，用户打开集群时的首个请求不再承担建连开销。
+    """
+    count = STARTUP_CONFIG["PREWARM_CLUSTERS"] if count is None else count
+    timeout = STARTUP_CONFIG["PREWARM_TIMEOUT"] if timeout is None else timeout
+    try:
+        records: List[Dict] = [item for item in await connection_store.list() if item.get("address")][:count]
+    except Exception as e:
+        logger.warning("读取连接配置失败，跳过预热 错误=%s", str(e))
+        return 0
+    if not records:
+        return 0
+    results = await asyncio.gather(*(_prewarm_cluster(item, timeout) for item in records))
+    return sum(1 for ok in results if ok)
+
+
+def start_prewarm() -> Optional[asyncio.Task]:
+    """在后台启动预热任务（未开启时返回 None），由应用 lifespan 在关闭时取消"""
+    if not STARTUP_CONFIG["PREWARM_ENABLED"] or STARTUP_CONFIG["PREWARM_CLUSTERS"] <= 0:
+        return None
+    return asyncio.create_task(prewarm_recent_clusters())
@@ -0,0 +1,285 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from utils.latency import summarize_latencies
+from utils.vector_stats import VectorReservoir
+
+logger = logging.getLogger(__name__)
+
+DISTANCE_COSINE = "cosine"
+DISTANCE_DOT = "dot"
+DISTANCE_L2 = "l2-squared"
+SUPPORTED_DISTANCES = (DISTANCE_COSINE, DISTANCE_DOT, DISTANCE_L2)
+
+
+class RecallBenchmarkError(Exception):
+    """基准测试无法继续（上游返回错误、class 不支持等）"""
+
+
+class ExactTopK:
+    """分块暴力计算精确 top-k。
+
+    每次传入一块向量（b × d），与全部查询（q × d）做一次矩阵乘法得到距离，
+    再与当前 top-k 合并后用 argpartition 截断，内存占用为 O(q × (k + b))。
+    距离定义与 Weaviate 一致：cosine = 1 - cos，dot = -q·x，l2-squared = |q - x|²。
+    """
+
+    def __init__(self, queries: np.ndarray, k: int, distance: str) -> None:
+        if distance not in SUPPORTED_DISTANCES:
+            raise RecallBenchmarkError(f"不支持的距离类型: {distance}")
+        self.k = k
+        self.distance = distance
+        self._queries = queries.astype(np.float32, copy=False)
+        if distance == DISTANCE_COSINE:
+            self._queries = _normalize_rows(self._queries)
+        self._query_sq = np.einsum("ij,ij->i", self._queries, self._queries)
+        q = queries.shape[0]
+        self._best_dist = np.full((q, 0), np.inf, dtype=np.float32)
+        self._best_idx = np.empty((q, 0), dtype=np.int64)
+        self._offset = 0
+        self.ids: List[Optional[str]] = []
+
+    def add_block(self, block: np.ndarray, ids: List[Optional[str]]) -> None:
+        if block.shape[0] == 0:
+            return
+        if self.distance == DISTANCE_COSINE:
+            block = _normalize_rows(block)
+        scores = self._queries @ block.T
+        if self.distance == DISTANCE_COSINE:
+            dist = 1.0 - scores
+        elif self.distance == DISTANCE_DOT:
+            dist = -scores
+        else:
+            block_sq = np.einsum("ij,ij->i", block, block)
+            dist = self._query_sq[:, None] + block_sq[None, :] - 2.0 * scores
+        indexes = np.broadcast_to(
+            np.arange(self._offset, self._offset + block.shape[0], dtype=np.int64), dist.shape,
+        )
+        merged_dist = np.concatenate([self._best_dist, dist.astype(np.float32, copy=False)], axis=1)
+        merged_idx = np.concatenate([self._best_idx, indexes], axis=1)
+        if merged_dist.shape[1] > self.k:
+            keep = np.argpartition(merged_dist, self.k - 1, axis=1)[:, :self.k]
+            merged_dist = np.take_along_axis(merged_dist, keep, axis=1)
+            merged_idx = np.take_along_axis(merged_idx, keep, axis=1)
+        self._best_dist, self._best_idx = merged_dist, merged_idx
+        self._offset += block.shape[0]
+        self.ids.extend(ids)
+
+    def result(self) -> List[List[Optional[str]]]:
+        """返回每个查询按距离升序排列的 top-k 对象 id"""
+        order = np.argsort(self._best_dist, axis=1, kind="stable")
+        best = np.take_along_axis(self._best_idx, order, axis=1)
+        return [[self.ids[i] for i in row] for row in best.tolist()]
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class RecallBenchmark:
+    """HNSW 召回率基准：精确 top-k（NumPy 暴力计算）对比 Weaviate nearVector 结果。
+
+    步骤：
+    1. 读取 class 的 vectorIndexConfig（距离类型、ef、maxConnections 等）
+    2. 未指定查询向量时，沿 /v1/objects 游标扫描并蓄水池抽样 `query_count` 个对象向量作为查询
+    3. 再次扫描全部向量，按 `block_size` 分块计算精确 top-k
+    4. 逐个发送 nearVector 查询（有限并发），记录延迟并计算 recall@k
+
+    `client` 由调用方注入，可以是连接真实集群的客户端，也可以是挂在本地假 Weaviate 上的客户端。
+    `run()` 产出进度事件，最后产出 done 或 error 事件。
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        base_url: str,
+        headers: Dict[str, str],
+        class_name: str,
+        k: int = 10,
+        query_count: int = 100,
+        queries: Optional[List[List[float]]] = None,
+        block_size: int = 10000,
+        page_size: int = 500,
+        concurrency: int = 4,
+        timeout: float = 30.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self._client = client
+        self._base_url = base_url.rstrip("/")
+        self._headers = headers
+        self._class_name = class_name
+        self._k = k
+        self._query_count = query_count
+        self._queries = queries
+        self._block_size = block_size
+        self._page_size = page_size
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._seed = seed
+        self._started = time.perf_counter()
+        self.scanned = 0
+
+    def _event(self, event: str, **extra: Any) -> Dict[str, Any]:
+        data = {"event": event, "elapsed": round(time.perf_counter() - self._started, 3)}
+        data.update(extra)
+        return data
+
+    async def _index_config(self) -> Dict[str, Any]:
+        resp = await self._client.get(
+            f"{self._base_url}/v1/schema/{self._class_name}", headers=self._headers, timeout=self._timeout,
+        )
+        if resp.status_code != 200:
+            raise RecallBenchmarkError(f"获取 class 定义失败: HTTP {resp.status_code}")
+        body = resp.json()
+        config = body.get("vectorIndexConfig") if isinstance(body, dict) else None
+        return config if isinstance(config, dict) else {}
+
+    async def _pages(self) -> AsyncIterator[List[Dict[str, Any]]]:
+        """沿 `after` 游标逐页读取带向量的对象"""
+        after: Optional[str] = None
+        while True:
+            params: Dict[str, Any] = {"class": self._class_name, "limit": self._page_size, "include": "vector"}
+            if after:
+                params["after"] = after
+            resp = await self._client.get(
+                f"{self._base_url}/v1/objects", params=params, headers=self._headers, timeout=self._timeout,
+            )
+            if resp.status_code != 200:
+                raise RecallBenchmarkError(f"读取对象失败: HTTP {resp.status_code}")
+            body = resp.json()
+            page = body.get("objects") if isinstance(body, dict) else None
+            if not page:
+                return
+            yield page
+            after = page[-1].get("id") if isinstance(page[-1], dict) else None
+            if len(page) < self._page_size or not after:
+                return
+
+    async def _sample_queries(self) -> np.ndarray:
+        reservoir = VectorReservoir(self._query_count, seed=self._seed)
+        async for page in self._pages():
+            reservoir.add_page(page)
+        return reservoir.sample().copy()
+
+    async def _ground_truth(self, exact: ExactTopK, dim: int) -> AsyncIterator[Dict[str, Any]]:
+        """分块计算精确 top-k，块内矩阵运算在线程池中执行；每读完一页产出一条进度事件"""
+        block = np.empty((self._block_size, dim), dtype=np.float32)
+        block_ids: List[Optional[str]] = []
+        async for page in self._pages():
+            for obj in page:
+                vector = obj.get("vector") if isinstance(obj, dict) else None
+                if not isinstance(vector, list) or len(vector) != dim:
+                    continue
+                block[len(block_ids)] = vector
+                block_ids.append(obj.get("id"))
+                if len(block_ids) == self._block_size:
+                    await asyncio.to_thread(exact.add_block, block, block_ids)
+                    block_ids = []
+            self.scanned += len(page)
+            yield self._event("groundTruth", scanned=self.scanned)
+        if block_ids:
+            await asyncio.to_thread(exact.add_block, block[:len(block_ids)], block_ids)
+
+    async def _near_vector(self, vector: List[float]) -> Tuple[List[Optional[str]], float]:
+        query = (
+            f"{{ Get {{ {self._class_name}(nearVector: {{ vector: {json.dumps(vector)} }}, limit: {self._k}) "
+            f"{{ _additional {{ id distance }} }} }} }}"
+        )
+        started = time.perf_counter()
+        resp = await self._client.post(
+            f"{self._base_url}/v1/graphql",
+            headers={**self._headers, "Content-Type": "application/json"},
+            json={"query": query},
+            timeout=self._timeout,
+        )
+        took_ms = (time.perf_counter() - started) * 1000
+        if resp.status_code != 200:
+            raise RecallBenchmarkError(f"nearVector 查询失败: HTTP {resp.status_code}")
+        body = resp.json()
+        if not isinstance(body, dict):
+            raise RecallBenchmarkError("nearVector 查询失败: 返回内容不是 JSON 对象")
+        errors = body.get("errors")
+        if errors:
+            first = errors[0] if isinstance(errors, list) and errors else None
+            message = first.get("message", "") if isinstance(first, dict) else str(errors)
+            raise RecallBenchmarkError(f"nearVector 查询失败: {message}")
+        items = ((body.get("data") or {}).get("Get") or {}).get(self._class_name) or []
+        return [
+            (item.get("_additional") or {}).get("id") if isinstance(item, dict) else None
+            for item in items
+        ], took_ms
+
+    async def run(self) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            index_config = await self._index_config()
+            distance = index_config.get("distance") or DISTANCE_COSINE
+            yield self._event("config", distance=distance, vectorIndexConfig=index_config)
+
+            if self._queries:
+                queries = np.asarray(self._queries, dtype=np.float32)
+            else:
+                queries = await self._sample_queries()
+            if queries.ndim != 2 or queries.shape[0] == 0:
+                raise RecallBenchmarkError("没有可用的查询向量")
+            yield self._event("queries", count=int(queries.shape[0]), dimension=int(queries.shape[1]))
+
+            exact = ExactTopK(queries, self._k, distance)
+            async for event in self._ground_truth(exact, int(queries.shape[1])):
+                yield event
+            truth = exact.result()
+
+            semaphore = asyncio.Semaphore(self._concurrency)
+
+            async def search(idx: int) -> Tuple[int, List[Optional[str]], float]:
+                async with semaphore:
+                    ids, took_ms = await self._near_vector(queries[idx].tolist())
+                return idx, ids, took_ms
+
+            recalls: List[float] = [0.0] * len(truth)
+            latencies: List[float] = []
+            tasks = [asyncio.create_task(search(i)) for i in range(len(truth))]
+            try:
+                for finished in asyncio.as_completed(tasks):
+                    idx, ids, took_ms = await finished
+                    expected = set(truth[idx])
+                    recalls[idx] = len(expected.intersection(ids[:self._k])) / max(len(expected), 1)
+                    latencies.append(took_ms)
+                    if len(latencies) % 10 == 0 or len(latencies) == len(tasks):
+                        yield self._event("search", completed=len(latencies), total=len(tasks))
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+            recall = np.asarray(recalls, dtype=np.float64)
+            yield self._event(
+                "done",
+                k=self._k,
+                queries=len(truth),
+                scanned=self.scanned,
+                distance=distance,
+                recall={
+                    "mean": round(float(recall.mean()), 4),
+                    "min": round(float(recall.min()), 4),
+                    "p10": round(float(np.percentile(recall, 10)), 4),
+                    "perfect": int(np.count_nonzero(recall >= 1.0)),
+                },
+                latencyMs=summarize_latencies(latencies),
+                vectorIndexConfig=index_config,
+            )
+        except RecallBenchmarkError as e:
+            logger.error("召回率基准失败 class=%s 错误=%s", self._class_name, str(e))
+            yield self._event("error", message=str(e))
+        except httpx.TimeoutException:
+            logger.error("召回率基准超时 class=%s", self._class_name)
+            yield self._event("error", message="查询超时，请稍后重试")
+        except httpx.HTTPError as e:
+            logger.error("召回率基准连接错误 class=%s 错误=%s", self._class_name, str(e))
+            yield self._event("error", message=f"连接失败: {str(e)}")
@@ -0,0 +1,61 @@
+import logging
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from config.business_setting import RESULT_CACHE_CONFIG
+from utils.cache import TTLCache
+from utils.cache_events import on_class_changed
+from utils.http_client import ClusterKey
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_filters(filters: Iterable[Any], logic: str) -> Tuple[Tuple[Tuple[str, str, str], ...], str]:
+    """规范化过滤条件：And/Or 与顺序无关，排序后作为缓存键；单个条件时逻辑关系无意义"""
+    normalized = tuple(sorted((f.property, f.operator, f.value) for f in filters))
+    return normalized, (logic if len(normalized) > 1 else "And")
+
+
+class SearchResultCache:
+    """/objects/search 的结果缓存。
+
+    键由集群、className、规范化后的过滤条件/逻辑关系、limit 以及返回字段组成；
+    按 Weaviate 响应体字节数计入容量上限，LRU 淘汰，每个条目单独过期。
+    """
+
+    def __init__(self, config: Optional[Dict] = None) -> None:
+        config = RESULT_CACHE_CONFIG if config is None else config
+        self._cache = TTLCache(
+            ttl=config["TTL"],
+            max_bytes=config["MAX_BYTES"],
+            max_entries=config["MAX_ENTRIES"],
+        )
+
+    @staticmethod
+    def make_key(key: ClusterKey, class_name: str, *parts: Hashable) -> Tuple:
+        return (key, class_name) + parts
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._cache
+
+    def get(self, key: Tuple) -> Any:
+        return self._cache.get(key)
+
+    def set(self, key: Tuple, value: Any, size: Optional[int] = None) -> None:
+        self._cache.set(key, value, size)
+
+    def invalidate_class(self, key: ClusterKey, class_name: str) -> int:
+        removed = self._cache.invalidate(lambda k: k[0] == key and k[1] == class_name)
+        if removed:
+            logger.info("失效搜索结果缓存 url=%s://%s class=%s 条目数=%d", key[0], key[1], class_name, removed)
+        return removed
+
+    def invalidate_cluster(self, key: ClusterKey) -> int:
+        return self._cache.invalidate(lambda k: k[0] == key)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# 全局共享搜索结果缓存
+search_result_cache = SearchResultCache()
+on_class_changed(search_result_cache.invalidate_class)
@@ -0,0 +1,126 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.business_setting import SCHEMA_CACHE_CONFIG, SCHEMA_STATS_CONFIG
+from utils.cache import TTLCache
+from utils.cache_events import on_class_changed
+from utils.http_client import ClusterKey
+
+logger = logging.getLogger(__name__)
+
+# GraphQL 名称（class 名、属性名），拼接进 GraphQL 文档前用于校验
+GRAPHQL_NAME = re.compile(r"^[_A-Za-z][_0-9A-Za-z]*$")
+
+# 缓存条目类型
+_FULL = "full"
+_CLASS = "class"
+_SELECTION = "selection"
+
+
+class SchemaCache:
+    """按集群缓存 Weaviate schema。
+
+    - 完整 schema（/v1/schema）
+    - 单个 class 的 schema（/v1/schema/{className}），未命中时可从完整 schema 中派生
+    - 搜索用的属性列表与 GraphQL 选择串（由 class schema 预先计算）
+    """
+
+    def __init__(self, config: Optional[Dict] = None) -> None:
+        config = SCHEMA_CACHE_CONFIG if config is None else config
+        self._cache = TTLCache(
+            ttl=config["TTL"],
+            max_bytes=config["MAX_BYTES"],
+            max_entries=config["MAX_ENTRIES"],
+        )
+
+    def get_full(self, key: ClusterKey) -> Optional[Dict[str, Any]]:
+        return self._cache.get((key, _FULL, ""))
+
+    def set_full(self, key: ClusterKey, schema: Dict[str, Any], size: Optional[int] = None) -> None:
+        self._cache.set((key, _FULL, ""), schema, size)
+
+    def _peek_class(self, key: ClusterKey, class_name: str) -> Optional[Dict[str, Any]]:
+        """查找 class schema（未命中时从完整 schema 中派生），不计入命中统计"""
+        class_schema = self._cache.peek((key, _CLASS, class_name))
+        if class_schema is not None:
+            return class_schema
+        full = self._cache.peek((key, _FULL, ""))
+        if isinstance(full, dict):
+            for item in full.get("classes") or []:
+                if isinstance(item, dict) and item.get("class") == class_name:
+                    return item
+        return None
+
+    def get_class(self, key: ClusterKey, class_name: str) -> Optional[Dict[str, Any]]:
+        # 可能读取两个条目，但只记一次命中/未命中
+        class_schema = self._peek_class(key, class_name)
+        self._cache.record(class_schema is not None)
+        return class_schema
+
+    def set_class(self, key: ClusterKey, class_name: str, schema: Dict[str, Any], size: Optional[int] = None) -> None:
+        self._cache.set((key, _CLASS, class_name), schema, size)
+
+    def get_selection(self, key: ClusterKey, class_name: str) -> Optional[Tuple[List[str], str]]:
+        """返回缓存的 (属性名列表, 属性选择串)"""
+        selection = self._cache.peek((key, _SELECTION, class_name))
+        class_schema = self._peek_class(key, class_name) if selection is None else None
+        self._cache.record(selection is not None or class_schema is not None)
+        if selection is not None or class_schema is None:
+            return selection
+        return self.set_selection(key, class_name, class_schema)
+
+    def set_selection(self, key: ClusterKey, class_name: str, class_schema: Dict[str, Any]) -> Tuple[List[str], str]:
+        """根据 class schema 预计算属性列表与 GraphQL 选择串并缓存"""
+        raw_props = class_schema.get("properties", []) if isinstance(class_schema, dict) else []
+        properties = [p.get("name") for p in raw_props if isinstance(p, dict) and p.get("name")]
+        selection = (properties, " ".join(properties))
+        self._cache.set((key, _SELECTION, class_name), selection)
+        return selection
+
+    def invalidate(self, key: ClusterKey, class_name: Optional[str] = None) -> int:
+        """失效缓存：指定 class 时失效该 class 条目与完整 schema，否则失效整个集群"""
+        if class_name is None:
+            removed = self._cache.invalidate(lambda k: k[0] == key)
+        else:
+            removed = self._cache.invalidate(
+                lambda k: k[0] == key and (k[1] == _FULL or k[2] == class_name)
+            )
+        logger.info("失效 schema 缓存 url=%s://%s class=%s 条目数=%d", key[0], key[1], class_name or "*", removed)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+class ClassCountCache:
+    """按集群缓存各 class 的对象数量（GraphQL Aggregate meta count）"""
+
+    def __init__(self, config: Optional[Dict] = None) -> None:
+        config = SCHEMA_STATS_CONFIG if config is None else config
+        # 每个条目只是一个整数，按固定大小计入容量
+        self._cache = TTLCache(ttl=config["TTL"], max_bytes=64 * 1024 * 1024)
+
+    def get(self, key: ClusterKey, class_name: str) -> Optional[int]:
+        return self._cache.get((key, class_name))
+
+    def set(self, key: ClusterKey, class_name: str, count: int) -> None:
+        self._cache.set((key, class_name), count, size=64 + len(class_name))
+
+    def invalidate(self, key: ClusterKey, class_name: Optional[str] = None) -> int:
+        if class_name is None:
+            return self._cache.invalidate(lambda k: k[0] == key)
+        return self._cache.invalidate(lambda k: k == (key, class_name))
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+# 全局共享 schema 缓存
+schema_cache = SchemaCache()
+# 导入/删除可能改变 schema（自动 schema 新增属性），数据变更时失效对应 class
+on_class_changed(schema_cache.invalidate)
+
+# 全局共享 class 对象数量缓存
+class_count_cache = ClassCountCache()
+on_class_changed(class_count_cache.invalidate)
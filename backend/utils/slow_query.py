@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import tempfile
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from config.business_setting import SLOW_QUERY_CONFIG
+from config.settings import STORAGE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def _read_entries(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning("读取慢查询日志失败 文件=%s 错误=%s", path, str(e))
+        return []
+    return [item for item in data if isinstance(item, dict)] if isinstance(data, list) else []
+
+
+def _write_entries(path: str, entries: List[Dict[str, Any]]) -> None:
+    """先写临时文件再原子替换"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".slow-queries-", suffix=".json.tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SlowQueryLog:
+    """慢请求环形缓冲区，最多保留 `capacity` 条，持久化到 JSON 文件。
+
+    `record()` 为同步调用，只追加到内存并调度一次延迟写盘（多条记录合并为一次写入，
+    磁盘 IO 在线程池中执行）；首次读取时从文件恢复上次运行的记录。
+    """
+
+    def __init__(self, file_path: str, capacity: int, flush_delay: float = 1.0) -> None:
+        self._path = file_path
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max(capacity, 1))
+        self._flush_delay = flush_delay
+        self._flush_task: Optional[asyncio.Task] = None
+        self._loaded = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def file_path(self) -> str:
+        return self._path
+
+    @property
+    def capacity(self) -> int:
+        return self._entries.maxlen or 0
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        entries = await asyncio.to_thread(_read_entries, self._path)
+        if not self._loaded:
+            # 文件中的旧记录排在本次运行已产生的记录之前
+            current = list(self._entries)
+            self._entries.clear()
+            self._entries.extend(entries[-self.capacity:])
+            self._entries.extend(current)
+            self._loaded = True
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        entry = {"time": datetime.datetime.now().isoformat(timespec="milliseconds"), **entry}
+        self._entries.append(entry)
+        logger.warning(
+            "慢请求 %s %s 耗时=%.1fms 阶段=%s",
+            entry.get("method"), entry.get("path"), entry.get("totalMs", 0.0), entry.get("phases"),
+        )
+        if self._flush_task is None or self._flush_task.done():
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush())
+            except RuntimeError:
+                # 不在事件循环中（如脚本直接调用），等待下一次 flush
+                pass
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self._flush_delay)
+        await self.flush()
+
+    async def flush(self) -> None:
+        async with self._lock:
+            await self._ensure_loaded()
+            try:
+                await asyncio.to_thread(_write_entries, self._path, list(self._entries))
+            except OSError as e:
+                logger.error("写入慢查询日志失败 文件=%s 错误=%s", self._path, str(e))
+
+    async def list(self, limit: Optional[int] = None, route: Optional[str] = None) -> List[Dict[str, Any]]:
+        """按时间倒序返回记录，可按路由过滤"""
+        async with self._lock:
+            await self._ensure_loaded()
+            items = [item for item in reversed(self._entries) if route is None or item.get("route") == route]
+        return items[:limit] if limit else items
+
+    async def clear(self) -> int:
+        async with self._lock:
+            await self._ensure_loaded()
+            count = len(self._entries)
+            self._entries.clear()
+        await self.flush()
+        return count
+
+    async def close(self) -> None:
+        """取消待执行的延迟写盘并立即写入（在应用 lifespan 关闭阶段调用）"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._entries:
+            await self.flush()
+
+
+# 全局慢查询日志
+slow_query_log = SlowQueryLog(
+    os.path.join(STORAGE_CONFIG["LOG_DIR"], SLOW_QUERY_CONFIG["FILE_NAME"]),
+    SLOW_QUERY_CONFIG["CAPACITY"],
+)
@@ -0,0 +1,172 @@
+import functools
+import inspect
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response as StarletteResponse
+
+from config.business_setting import SLOW_QUERY_CONFIG
+from utils.slow_query import slow_query_log
+
+# 写入慢查询记录的请求字段（不包含 apiKey 等敏感信息）
+_SUMMARY_FIELDS = (
+    "id", "name", "address", "className", "classNames", "limit", "offset", "after", "pageSize",
+    "properties", "logic", "k", "queryCount", "sampleSize", "includeVector", "refresh",
+)
+
+
+class RequestTimings:
+    """单个请求内各阶段的累计耗时（毫秒），阶段名如 schema、graphql、parse、format、serialize"""
+
+    __slots__ = ("started", "phases", "notes")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.notes: Dict[str, str] = {}
+
+    def add(self, phase: str, duration_ms: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + duration_ms
+
+    def note(self, phase: str, description: str) -> None:
+        """附加说明（如 cache=hit），以 Server-Timing 的 desc 输出"""
+        self.notes[phase] = description
+        self.phases.setdefault(phase, 0.0)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        parts = []
+        for phase, duration in self.phases.items():
+            item = f"{phase};dur={duration:.2f}"
+            if phase in self.notes:
+                item += f';desc="{self.notes[phase]}"'
+            parts.append(item)
+        parts.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(parts)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """记录代码块耗时到当前请求的 `phase` 阶段；不在请求上下文中时只有一次计时开销"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - started) * 1000)
+
+
+def detach_timings() -> None:
+    """在后台任务开头调用：任务复制了请求的上下文，解除关联后其耗时不再计入该请求"""
+    _current_timings.set(None)
+
+
+def note_timing(phase: str, description: str) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.note(phase, description)
+
+
+def _timed_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """包装路由函数以统计其自身耗时；functools.wraps 保留签名，FastAPI 依赖解析不受影响"""
+
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        timings = _current_timings.get()
+        started = time.perf_counter()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            if timings is not None:
+                timings.add("endpoint", (time.perf_counter() - started) * 1000)
+
+    wrapper.__timed_endpoint__ = True
+    return wrapper
+
+
+async def _request_summary(request: Request) -> Dict[str, Any]:
+    """从已缓存的 JSON 请求体中提取少量非敏感字段"""
+    summary: Dict[str, Any] = {}
+    if "application/json" not in request.headers.get("content-type", ""):
+        return summary
+    try:
+        body = json.loads(await request.body() or b"{}")
+    except ValueError:
+        return summary
+    if isinstance(body, dict):
+        for field in _SUMMARY_FIELDS:
+            if body.get(field) is not None:
+                summary[field] = body[field]
+        if body.get("filters"):
+            summary["filters"] = len(body["filters"])
+        for field in ("vectors", "queries"):
+            if body.get(field):
+                summary[field] = len(body[field])
+    return summary
+
+
+class TimedRoute(APIRoute):
+    """按阶段统计请求耗时的路由类（`APIRouter(route_class=TimedRoute)`）。
+
+    - 每个请求在 contextvar 中持有一个 `RequestTimings`，业务代码用 `timed("graphql")` 等记录阶段耗时
+    - 路由函数之外的耗时（请求体校验、响应模型校验与序列化）记为 serialize 阶段
+    - 结果写入 `Server-Timing` 响应头；总耗时超过阈值的请求写入慢查询日志
+    流式响应的总耗时只统计到响应对象返回为止。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        # include_router 会用同一路由类重新创建路由，已包装的函数不再重复包装
+        if inspect.iscoroutinefunction(endpoint) and not getattr(endpoint, "__timed_endpoint__", False):
+            endpoint = _timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+        route_path = self.path
+
+        async def timed_handler(request: Request) -> StarletteResponse:
+            timings = RequestTimings()
+            token = _current_timings.set(timings)
+            try:
+                response = await handler(request)
+            finally:
+                _current_timings.reset(token)
+            total_ms = timings.elapsed_ms()
+            measured = sum(v for k, v in timings.phases.items() if k != "endpoint")
+            endpoint_ms = timings.phases.pop("endpoint", measured)
+            timings.add("app", max(endpoint_ms - measured, 0.0))
+            timings.add("serialize", max(total_ms - endpoint_ms, 0.0))
+            if SLOW_QUERY_CONFIG["SERVER_TIMING"]:
+                response.headers["Server-Timing"] = timings.server_timing(total_ms)
+                response.headers["Timing-Allow-Origin"] = "*"
+            if total_ms >= SLOW_QUERY_CONFIG["THRESHOLD_MS"]:
+                slow_query_log.record({
+                    "method": request.method,
+                    "route": route_path,
+                    "path": request.url.path,
+                    "status": response.status_code,
+                    "totalMs": round(total_ms, 3),
+                    "phases": {k: round(v, 3) for k, v in timings.phases.items()},
+                    "notes": dict(timings.notes),
+                    "request": await _request_summary(request),
+                })
+            return response
+
+        return timed_handler
@@ -0,0 +1,82 @@
+import binascii
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response as StarletteResponse
+
+# 向量编码方式
+VECTOR_ENCODING_FLOAT = "float"      # JSON 浮点数组（默认）
+VECTOR_ENCODING_BASE64 = "base64"    # 小端 float32 字节的 base64 字符串
+VECTOR_ENCODING_BINARY = "float32"   # 小端 float32 原始字节（仅 MessagePack 响应）
+
+MSGPACK_MEDIA_TYPES = ("application/x-msgpack", "application/msgpack", "application/vnd.msgpack")
+
+# numpy 与 msgpack 在首次编码时才导入，缩短服务启动时间
+if TYPE_CHECKING:
+    import numpy as np
+
+_FLOAT32_LE = "<f4"
+_FLOAT32_SIZE = 4
+
+
+class MsgPackResponse(StarletteResponse):
+    """MessagePack 响应，bytes 以 bin 类型写出"""
+
+    media_type = "application/x-msgpack"
+
+    def render(self, content: Any) -> bytes:
+        import msgpack
+
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def wants_msgpack(request: Request) -> bool:
+    """根据 Accept 头判断客户端是否希望返回 MessagePack"""
+    accept = request.headers.get("accept", "").lower()
+    return any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def pack_vectors(vectors: List[Any]) -> List[Optional[bytes]]:
+    """把一页向量批量转换为小端 float32 字节。
+
+    相同维度的向量一次性转换为二维数组再按行切片，避免逐个元素的 Python 循环；
+    非数组（如 None）保持为 None。
+    """
+    import numpy as np
+
+    packed: List[Optional[bytes]] = [None] * len(vectors)
+    by_dim: Dict[int, List[int]] = {}
+    for idx, vector in enumerate(vectors):
+        if isinstance(vector, list) and vector:
+            by_dim.setdefault(len(vector), []).append(idx)
+    for indexes in by_dim.values():
+        matrix = np.asarray([vectors[i] for i in indexes], dtype=_FLOAT32_LE)
+        raw = memoryview(matrix.tobytes())
+        row_bytes = matrix.shape[1] * _FLOAT32_SIZE
+        for row, idx in enumerate(indexes):
+            packed[idx] = bytes(raw[row * row_bytes:(row + 1) * row_bytes])
+    return packed
+
+
+def unpack_vector(data: bytes) -> "np.ndarray":
+    """把 float32 字节还原为 numpy 数组（不复制）"""
+    import numpy as np
+
+    return np.frombuffer(data, dtype=_FLOAT32_LE)
+
+
+def encode_object_vectors(objects: List[Any], encoding: str, key: str = "vector") -> None:
+    """原地把对象列表中 `key` 字段的向量转换为指定编码"""
+    if encoding == VECTOR_ENCODING_FLOAT:
+        return
+    holders = [obj for obj in objects if isinstance(obj, dict) and isinstance(obj.get(key), list)]
+    if not holders:
+        return
+    packed = pack_vectors([obj[key] for obj in holders])
+    for obj, data in zip(holders, packed):
+        if data is None:
+            continue
+        if encoding == VECTOR_ENCODING_BASE64:
+            obj[key] = binascii.b2a_base64(data, newline=False).decode("ascii")
+        else:
+            obj[key] = data
@@ -0,0 +1,166 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# 方差低于该阈值的维度视为“塌缩”
+COLLAPSED_VARIANCE_EPS = 1e-8
+# 范数低于该阈值的向量视为零向量
+ZERO_NORM_EPS = 1e-12
+
+PROJECTION_PCA = "pca"
+PROJECTION_RANDOM = "random"
+
+
+class VectorReservoir:
+    """对向量流做蓄水池抽样（Algorithm R），样本保存在预分配的 float32 数组中。
+
+    - 维度由第一个有效向量确定，之后维度不一致的向量计入 `mismatched` 并跳过
+    - 内存占用固定为 `sample_size × 维度 × 4` 字节，与扫描的对象总数无关
+    - 同时统计全部扫描向量中的零向量数量
+    """
+
+    def __init__(self, sample_size: int, seed: Optional[int] = None) -> None:
+        self.sample_size = sample_size
+        self._rng = np.random.default_rng(seed)
+        self._data: Optional[np.ndarray] = None
+        self._ids: List[Optional[str]] = [None] * sample_size
+        self.seen = 0          # 参与抽样的有效向量数
+        self.missing = 0       # 没有向量的对象数
+        self.mismatched = 0    # 维度不一致的向量数
+        self.zero_vectors = 0  # 扫描到的零向量数
+
+    @property
+    def dimension(self) -> int:
+        return 0 if self._data is None else self._data.shape[1]
+
+    @property
+    def count(self) -> int:
+        return min(self.seen, self.sample_size)
+
+    def sample(self) -> np.ndarray:
+        """返回当前样本（视图，不复制）"""
+        if self._data is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._data[:self.count]
+
+    def sample_ids(self) -> List[Optional[str]]:
+        return self._ids[:self.count]
+
+    def add_page(self, objects: List[Dict[str, Any]]) -> None:
+        """加入一页 /v1/objects 返回的对象（需包含 vector 字段）"""
+        vectors: List[Any] = []
+        ids: List[Optional[str]] = []
+        for obj in objects:
+            vector = obj.get("vector") if isinstance(obj, dict) else None
+            if not isinstance(vector, list) or not vector:
+                self.missing += 1
+                continue
+            if self._data is None:
+                self._data = np.empty((self.sample_size, len(vector)), dtype=np.float32)
+            if len(vector) != self._data.shape[1]:
+                self.mismatched += 1
+                continue
+            vectors.append(vector)
+            ids.append(obj.get("id"))
+        if not vectors:
+            return
+
+        page = np.asarray(vectors, dtype=np.float32)
+        self.zero_vectors += int(np.count_nonzero(np.linalg.norm(page, axis=1) <= ZERO_NORM_EPS))
+
+        # 蓄水池未满的部分直接顺序写入
+        start = self.seen
+        fill = max(0, min(len(page), self.sample_size - start))
+        if fill:
+            self._data[start:start + fill] = page[:fill]
+            self._ids[start:start + fill] = ids[:fill]
+
+        # 其余向量第 t 个（从 0 计）以 k/(t+1) 的概率替换随机位置
+        if fill < len(page):
+            positions = np.arange(start + fill, start + len(page))
+            slots = self._rng.integers(0, positions + 1)
+            accepted = np.nonzero(slots < self.sample_size)[0]
+            if accepted.size:
+                # 同一位置被多次选中时以最后一次为准
+                targets = slots[accepted][::-1]
+                _, first = np.unique(targets, return_index=True)
+                chosen = accepted[::-1][first]
+                self._data[slots[chosen]] = page[fill + chosen]
+                for offset in chosen.tolist():
+                    self._ids[int(slots[offset])] = ids[fill + offset]
+        self.seen += len(page)
+
+
+def _round_list(values: np.ndarray, digits: int = 6) -> List[float]:
+    return np.round(values.astype(np.float64), digits).tolist()
+
+
+def _pca_2d(centered: np.ndarray, rng: np.random.Generator, iterations: int = 4) -> tuple:
+    """随机子空间迭代求前两个主成分，复杂度 O(n·d) 而不是完整 SVD 的 O(n·d²)"""
+    n, d = centered.shape
+    width = min(d, 6)
+    basis = rng.standard_normal((d, width)).astype(np.float32)
+    for _ in range(iterations):
+        basis, _ = np.linalg.qr(centered.T @ (centered @ basis))
+    _, singular, vt = np.linalg.svd(centered @ basis, full_matrices=False)
+    components = basis @ vt[:2].T
+    if components.shape[1] < 2:
+        components = np.pad(components, ((0, 0), (0, 2 - components.shape[1])))
+        singular = np.pad(singular, (0, 2 - len(singular)))
+    # 与 np.var 保持一致按 n 归一化
+    return centered @ components, (singular[:2] ** 2) / n
+
+
+def compute_vector_stats(
+    matrix: np.ndarray,
+    ids: List[Optional[str]],
+    bins: int = 30,
+    projection: str = PROJECTION_PCA,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """对样本矩阵（n × d，float32）计算范数分布、逐维均值/方差与二维投影"""
+    n = matrix.shape[0]
+    if n == 0:
+        return {"count": 0, "dimension": 0}
+    d = matrix.shape[1]
+    rng = np.random.default_rng(seed)
+
+    norms = np.linalg.norm(matrix, axis=1)
+    counts, edges = np.histogram(norms, bins=bins)
+    mean = matrix.mean(axis=0, dtype=np.float64)
+    variance = matrix.var(axis=0, dtype=np.float64)
+    collapsed = np.nonzero(variance < COLLAPSED_VARIANCE_EPS)[0]
+
+    centered = matrix - mean.astype(np.float32)
+    result: Dict[str, Any] = {
+        "count": n,
+        "dimension": d,
+        "zeroVectors": int(np.count_nonzero(norms <= ZERO_NORM_EPS)),
+        "norm": {
+            "min": float(norms.min()),
+            "max": float(norms.max()),
+            "mean": float(norms.mean()),
+            "std": float(norms.std()),
+            "histogram": {"edges": _round_list(edges), "counts": counts.tolist()},
+        },
+        "dimensions": {
+            "mean": _round_list(mean),
+            "variance": _round_list(variance),
+            "collapsed": collapsed.tolist(),
+        },
+    }
+
+    total_variance = float(variance.sum())
+    if n >= 2 and projection == PROJECTION_PCA:
+        points, explained = _pca_2d(centered, rng)
+        ratio = explained / total_variance if total_variance > 0 else np.zeros(2)
+        projection_info = {"method": PROJECTION_PCA, "explainedVarianceRatio": _round_list(ratio)}
+    else:
+        # 高斯随机投影（Johnson-Lindenstrauss），无需迭代
+        components = rng.standard_normal((d, 2)).astype(np.float32) / np.sqrt(2.0)
+        points = centered @ components
+        projection_info = {"method": PROJECTION_RANDOM}
+    projection_info["ids"] = ids
+    projection_info["points"] = np.round(points.astype(np.float64), 5).tolist()
+    result["projection"] = projection_info
+    return result